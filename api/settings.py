@@ -84,6 +84,8 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
+    # query counts, N+1 detection and budgets, see QUERY_INSTRUMENTATION_ENABLED
+    "apps.core.query_budget_middleware.QueryInstrumentationMiddleware",
     # cross domain
     "corsheaders.middleware.CorsMiddleware",
     # "api.restrict_origin_middleware.RestrictOriginMiddleware",
@@ -285,6 +287,12 @@ else:
         "https://internal-api.techbychoice.org",
     ]
 
+# Per request query logging and Server-Timing headers
+QUERY_INSTRUMENTATION_ENABLED = os.getenv("QUERY_INSTRUMENTATION_ENABLED", str(DEBUG)) == 'True'
+# Raise instead of warn when a view goes over its @query_budget, enabled for tests in tests/conftest.py
+QUERY_BUDGET_ENFORCED = os.getenv("QUERY_BUDGET_ENFORCED") == 'True'
+QUERY_N_PLUS_ONE_THRESHOLD = 5
+
 # Allow cookies
 SESSION_COOKIE_SAMESITE = None
 SESSION_COOKIE_SECURE = True
@@ -333,6 +341,26 @@ CELERY_BEAT_SCHEDULE = {
         "task": "apps.core.tasks.send_batch_onboarding_email_reminder_task",
         "schedule": crontab(hour="9", minute="0", day_of_week="mon-fri"),
     },
+    "refresh-app-stats": {
+        "task": "apps.core.tasks.refresh_app_stats_task",
+        "schedule": crontab(minute="*/10"),
+    },
+    "rebuild-mentor-directory": {
+        "task": "apps.mentorship.tasks.rebuild_mentor_directory_task",
+        "schedule": crontab(hour="3", minute="0"),
+    },
+    "rebuild-job-recommendations": {
+        "task": "apps.company.tasks.rebuild_job_recommendations_task",
+        "schedule": crontab(hour="4", minute="0"),
+    },
+    "refresh-changed-job-recommendations": {
+        "task": "apps.company.tasks.refresh_changed_job_recommendations_task",
+        "schedule": crontab(minute="*/5"),
+    },
+    "refresh-company-reviews": {
+        "task": "apps.company.tasks.refresh_company_reviews_task",
+        "schedule": crontab(minute="15"),
+    },
 }
 
 # Redis
@@ -365,6 +393,13 @@ JWT_SECRET_KEY = os.getenv("JWT_SECRET_KEY")
 JWT_ALGORITHM = "HS256"
 TOKEN_EXPIRATION = timedelta(days=7)
 
+# Open Doors signs its review webhook calls with this secret
+OPEN_DOORS_WEBHOOK_SECRET = os.getenv("OPEN_DOORS_WEBHOOK_SECRET")
+# Bearer token background tasks call Open Doors with, when there is no member request to pass on
+OPEN_DOORS_SERVICE_TOKEN = os.getenv("OPEN_DOORS_SERVICE_TOKEN")
+# Bearer token the precomputed job matches are requested from Talent Choice with
+TALENT_CHOICE_SERVICE_TOKEN = os.getenv("TALENT_CHOICE_SERVICE_TOKEN")
+
 # Ensure you don't run collectstatic during deployment if not necessary
 DISABLE_COLLECTSTATIC = 1
 
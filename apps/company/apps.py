@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class CompanyConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "apps.company"
+
+    def ready(self):
+        import apps.company.signals
@@ -0,0 +1,105 @@
+"""
+Set-based expiration of stale jobs.
+
+Active jobs posted more than JOB_EXPIRATION_DAYS ago are expired with one UPDATE
+per range of JOB_EXPIRATION_CHUNK_SIZE ids, each in its own short transaction, so
+tens of thousands of imported jobs expire well within CELERY_TASK_TIME_LIMIT and
+without holding locks on the whole table.
+
+Bulk updates skip the signals that keep the job match index in sync, so the index
+rows of the expired jobs are deactivated with one more UPDATE per chunk and the
+index version is bumped once. That drops the jobs from the in-process match index
+and makes the precomputed Talent Choice matches stale. The recommendations of the
+members they were recommended to are rescored by
+refresh_changed_job_recommendations_task, which picks up the changed index rows.
+"""
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Min, Max
+from django.utils import timezone
+
+from apps.company.job_match_index import JOB_MATCH_INDEX_CACHE_NAMESPACE, JOB_MATCH_INDEX_CACHE_ID
+from apps.company.models import Job, JobMatchIndex
+from utils.cache_utils import bump_cache_version
+from utils.logging_helper import get_logger
+
+logger = get_logger(__name__)
+
+JOB_EXPIRATION_DAYS = getattr(settings, "JOB_EXPIRATION_DAYS", 90)
+JOB_EXPIRATION_CHUNK_SIZE = getattr(settings, "JOB_EXPIRATION_CHUNK_SIZE", 5000)
+JOB_EXPIRATION_METRICS = ["runs", "expired"]
+JOB_EXPIRATION_LAST_RUN_KEY = "job_expiration_last_run"
+
+
+def _increment_expiration_metric(name, amount=1):
+    key = f"job_expiration_{name}"
+    if not cache.add(key, amount, None):
+        try:
+            cache.incr(key, amount)
+        except ValueError:
+            cache.set(key, amount, None)
+
+
+def get_job_expiration_metrics():
+    """
+    Counts of the job expiration runs since the counters were last reset.
+
+    Returns:
+        dict: runs and expired jobs, and the stats of the last run, dry runs excluded.
+    """
+    values = cache.get_many([f"job_expiration_{name}" for name in JOB_EXPIRATION_METRICS])
+    metrics = {name: values.get(f"job_expiration_{name}", 0) for name in JOB_EXPIRATION_METRICS}
+    metrics["last_run"] = cache.get(JOB_EXPIRATION_LAST_RUN_KEY)
+    return metrics
+
+
+def expire_old_jobs(max_age_days=JOB_EXPIRATION_DAYS, chunk_size=JOB_EXPIRATION_CHUNK_SIZE, dry_run=False):
+    """
+    Expire the active jobs created more than `max_age_days` ago.
+
+    Args:
+        max_age_days (int): Age from which an active job expires.
+        chunk_size (int): Width of the id ranges updated per statement.
+        dry_run (bool): Only count the jobs that would expire.
+
+    Returns:
+        dict: Number of jobs expired (or that would be on a dry run), of chunks
+            updated, the cutoff, whether it was a dry run and how long it took.
+    """
+    started_at = time.monotonic()
+    now = timezone.now()
+    cutoff = now - timedelta(days=max_age_days)
+    stale_jobs = Job.objects.filter(status=Job.ACTIVE, created_at__lt=cutoff)
+
+    stats = {"expired": 0, "chunks": 0, "cutoff": cutoff.isoformat(), "dry_run": dry_run}
+    if dry_run:
+        stats["expired"] = stale_jobs.count()
+    else:
+        bounds = stale_jobs.aggregate(first=Min("id"), last=Max("id"))
+        if bounds["first"] is not None:
+            for start in range(bounds["first"], bounds["last"] + 1, chunk_size):
+                id_range = {"id__gte": start, "id__lt": start + chunk_size}
+                with transaction.atomic():
+                    expired = stale_jobs.filter(**id_range).update(status=Job.EXPIRED, updated_at=now)
+                    if expired:
+                        JobMatchIndex.objects.filter(
+                            job_id__gte=start, job_id__lt=start + chunk_size, is_active=True,
+                            job__status=Job.EXPIRED,
+                        ).update(is_active=False, updated_at=now)
+                stats["expired"] += expired
+                stats["chunks"] += 1
+
+        if stats["expired"]:
+            bump_cache_version(JOB_MATCH_INDEX_CACHE_NAMESPACE, JOB_MATCH_INDEX_CACHE_ID)
+        _increment_expiration_metric("runs")
+        _increment_expiration_metric("expired", stats["expired"])
+
+    stats["duration_seconds"] = round(time.monotonic() - started_at, 2)
+    if not dry_run:
+        cache.set(JOB_EXPIRATION_LAST_RUN_KEY, stats, None)
+    logger.info(f"Job expiration finished: {stats}")
+    return stats
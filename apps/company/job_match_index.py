@@ -0,0 +1,193 @@
+"""
+Precomputed job match index.
+
+Every job has a JobMatchIndex row holding its skill, department, role and level ids.
+Each process keeps those rows as integer bitsets (bit n set = id n present), so
+matching a member against every active job is a single pass of AND + popcount
+instead of GROUP BY queries over the M2M tables.
+
+Rows are refreshed per job by the signals in apps/company/signals.py. Every refresh
+bumps a shared version in the cache; processes that see a new version pull only the
+rows updated since their last sync.
+"""
+import threading
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Max
+
+from apps.company.models import Job, JobMatchIndex
+from utils.cache_utils import get_cache_version, bump_cache_version
+from utils.logging_helper import get_logger
+
+logger = get_logger(__name__)
+
+JOB_MATCH_INDEX_CACHE_NAMESPACE = "job_match_index"
+JOB_MATCH_INDEX_CACHE_ID = "all"
+# Re-read rows this far behind the last sync to pick up transactions that committed late
+SYNC_OVERLAP = timedelta(minutes=1)
+REFRESH_BATCH_SIZE = 1000
+
+
+def to_bitset(ids):
+    bits = 0
+    for obj_id in ids:
+        if obj_id is not None:
+            bits |= 1 << int(obj_id)
+    return bits
+
+
+def refresh_job_match_index(job_ids):
+    """
+    Recompute the match index rows of the given jobs.
+
+    Args:
+        job_ids (Iterable[int]): Ids of the jobs that changed. Ids of deleted jobs are ignored.
+
+    Returns:
+        int: Number of rows written.
+    """
+    job_ids = list(set(job_ids))
+    written = 0
+    for start in range(0, len(job_ids), REFRESH_BATCH_SIZE):
+        written += _refresh_batch(job_ids[start:start + REFRESH_BATCH_SIZE])
+
+    if job_ids:
+        bump_cache_version(JOB_MATCH_INDEX_CACHE_NAMESPACE, JOB_MATCH_INDEX_CACHE_ID)
+    return written
+
+
+def _refresh_batch(job_ids):
+    jobs = Job.objects.filter(id__in=job_ids).values_list("id", "status", "role_id", "level_id")
+    entries = {
+        job_id: JobMatchIndex(
+            job_id=job_id,
+            is_active=job_status == Job.ACTIVE,
+            role_id=role_id,
+            level_id=level_id,
+            skills=[],
+            nice_to_have_skills=[],
+            departments=[],
+        )
+        for job_id, job_status, role_id, level_id in jobs
+    }
+
+    through_tables = (
+        ("skills", Job.skills.through, "skill_id"),
+        ("nice_to_have_skills", Job.nice_to_have_skills.through, "skill_id"),
+        ("departments", Job.department.through, "department_id"),
+    )
+    for field_name, through, related_field in through_tables:
+        for job_id, related_id in through.objects.filter(job_id__in=entries).values_list("job_id", related_field):
+            getattr(entries[job_id], field_name).append(related_id)
+
+    with transaction.atomic():
+        JobMatchIndex.objects.bulk_create(
+            entries.values(),
+            update_conflicts=True,
+            unique_fields=["job"],
+            update_fields=["is_active", "role_id", "level_id", "skills", "nice_to_have_skills", "departments",
+                           "updated_at"],
+        )
+    return len(entries)
+
+
+def remove_from_job_match_index(job_ids):
+    JobMatchIndex.objects.filter(job_id__in=job_ids).delete()
+    bump_cache_version(JOB_MATCH_INDEX_CACHE_NAMESPACE, JOB_MATCH_INDEX_CACHE_ID)
+
+
+def rebuild_job_match_index():
+    """
+    Rebuild the whole index from the jobs table.
+
+    Returns:
+        int: Number of rows written.
+    """
+    JobMatchIndex.objects.exclude(job__in=Job.objects.all()).delete()
+    written = refresh_job_match_index(Job.objects.values_list("id", flat=True))
+    logger.info(f"Rebuilt job match index with {written} jobs")
+    return written
+
+
+class _LocalJobMatchIndex:
+    """Process-local bitsets of every active job, synced from the JobMatchIndex table."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.version = None
+        self.synced_at = None
+        # job_id -> (skills, nice_to_have_skills, departments, role_id, level_id)
+        self.entries = {}
+
+    def sync(self):
+        version = get_cache_version(JOB_MATCH_INDEX_CACHE_NAMESPACE, JOB_MATCH_INDEX_CACHE_ID)
+        if version == self.version:
+            return
+
+        with self.lock:
+            if version == self.version:
+                return
+
+            rows = JobMatchIndex.objects.all()
+            if self.synced_at is not None:
+                rows = rows.filter(updated_at__gte=self.synced_at - SYNC_OVERLAP)
+            else:
+                self.entries = {}
+
+            latest = rows.aggregate(latest=Max("updated_at"))["latest"]
+            for row in rows.iterator():
+                if row.is_active:
+                    self.entries[row.job_id] = (
+                        to_bitset(row.skills),
+                        to_bitset(row.nice_to_have_skills),
+                        to_bitset(row.departments),
+                        row.role_id,
+                        row.level_id,
+                    )
+                else:
+                    self.entries.pop(row.job_id, None)
+
+            # Rows removed since the last sync leave no trace, drop them as well
+            if self.synced_at is not None and len(self.entries) != JobMatchIndex.objects.filter(
+                    is_active=True).count():
+                active_ids = set(JobMatchIndex.objects.filter(is_active=True).values_list("job_id", flat=True))
+                self.entries = {job_id: entry for job_id, entry in self.entries.items() if job_id in active_ids}
+
+            self.synced_at = latest or self.synced_at
+            self.version = version
+
+    def score(self, skill_ids=(), role_ids=(), department_ids=(), level_id=None):
+        """
+        Score every active job against a member in one pass.
+
+        A job scores one point per shared skill (required or nice to have), per
+        shared department, for a matching role and for a matching level.
+
+        Returns:
+            list[tuple[int, int]]: (job_id, score) of every job scoring above zero,
+            best first and ties broken by job id.
+        """
+        self.sync()
+        skills = to_bitset(skill_ids)
+        departments = to_bitset(department_ids)
+        role_ids = set(role_ids)
+        level_id = int(level_id) if level_id else None
+
+        scored = []
+        for job_id, (job_skills, job_nice_skills, job_departments, role_id, job_level_id) in self.entries.items():
+            score = (
+                    (job_skills & skills).bit_count()
+                    + (job_nice_skills & skills).bit_count()
+                    + (job_departments & departments).bit_count()
+                    + (role_id in role_ids)
+                    + (level_id is not None and job_level_id == level_id)
+            )
+            if score:
+                scored.append((job_id, score))
+
+        scored.sort(key=lambda item: (-item[1], item[0]))
+        return scored
+
+
+job_match_index = _LocalJobMatchIndex()
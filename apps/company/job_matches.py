@@ -0,0 +1,182 @@
+"""
+Precomputed Talent Choice job matches.
+
+The Talent Choice matcher ranks a page of locally matched jobs against the talent
+profile of a member. It is only called from compute_job_matches_task, never in the
+request path. Its results are cached per user, page and page size, under keys that
+hold the version of the member's match profile and of the job match index, so a
+profile change or any job change makes them stale without deleting anything.
+
+get_all_jobs serves a cached page when there is one, and otherwise the locally
+ranked page while the task computes it.
+"""
+import json
+import os
+
+import requests
+from django.conf import settings
+from django.core.cache import cache
+from django.core.paginator import Paginator, EmptyPage
+
+from apps.company.job_match_index import job_match_index, JOB_MATCH_INDEX_CACHE_NAMESPACE, JOB_MATCH_INDEX_CACHE_ID
+from apps.company.models import Job
+from apps.company.serializers import JobFeedSerializer
+from apps.core.serializers_member import FullTalentProfileSerializer
+from apps.member.models import MemberProfile
+from utils.cache_utils import get_cache_version, bump_cache_version
+from utils.logging_helper import get_logger
+
+logger = get_logger(__name__)
+
+JOB_MATCHES_CACHE_NAMESPACE = "job_matches"
+JOB_MATCHES_CACHE_TIMEOUT = getattr(settings, "JOB_MATCHES_CACHE_TIMEOUT", 60 * 60 * 24)
+# Pages computed ahead of the one requested
+JOB_MATCHES_PRECOMPUTED_PAGES = getattr(settings, "JOB_MATCHES_PRECOMPUTED_PAGES", 3)
+# Members who looked at their matches this recently get them recomputed when their profile changes
+JOB_MATCHES_ACTIVE_TIMEOUT = 60 * 60 * 24 * 14
+TALENT_CHOICE_MATCH_TIMEOUT = getattr(settings, "TALENT_CHOICE_MATCH_TIMEOUT", (3.05, 30))
+DEFAULT_PAGE_SIZE = 15
+
+
+def filter_and_paginate_jobs(user_profile, talent_profile, page=1, page_size=DEFAULT_PAGE_SIZE):
+    """
+    Match jobs against the user profile and paginate the results.
+
+    Jobs are scored in one pass over the precomputed match index, best match first.
+    """
+    department = talent_profile.data["department"]
+    role = talent_profile.data["role"]
+    tech_journey = talent_profile.data["tech_journey"]
+    skills = talent_profile.data["skills"]
+
+    # Check if all profile data is empty or None
+    if not any([department, role, tech_journey, skills]):
+        logger.info("User profile is empty, cannot filter by jobs")
+        return None, None
+
+    scored_jobs = job_match_index.score(
+        skill_ids=skills, role_ids=role, department_ids=department, level_id=tech_journey
+    )
+
+    # Paginate the matched ids, then load only the jobs of the requested page. Bulk status updates
+    # deactivate their index rows too, so the status filter only catches a job closed mid-request
+    paginator = Paginator([job_id for job_id, _ in scored_jobs], page_size)
+    current_page = paginator.page(page)
+    jobs_by_id = JobFeedSerializer.setup_eager_loading(
+        Job.objects.filter(id__in=current_page.object_list, status=Job.ACTIVE)
+    ).in_bulk()
+    current_page.object_list = [jobs_by_id[job_id] for job_id in current_page.object_list if job_id in jobs_by_id]
+
+    return current_page, paginator
+
+
+def job_matches_key(user_id, page, page_size):
+    """Cache key of a page of matches, for the current versions of the member's profile and of the jobs."""
+    profile_version = get_cache_version(JOB_MATCHES_CACHE_NAMESPACE, user_id)
+    jobs_version = get_cache_version(JOB_MATCH_INDEX_CACHE_NAMESPACE, JOB_MATCH_INDEX_CACHE_ID)
+    return f"{JOB_MATCHES_CACHE_NAMESPACE}_{user_id}_v{profile_version}_{jobs_version}_p{page}_{page_size}"
+
+
+def get_job_matches(user_id, page=1, page_size=DEFAULT_PAGE_SIZE):
+    """
+    The precomputed matches of a page, marking the member as one whose matches are kept up to date.
+
+    Returns:
+        list | None: The jobs ranked by Talent Choice, None when they aren't computed for the current versions.
+    """
+    cache.set(f"{JOB_MATCHES_CACHE_NAMESPACE}_active_{user_id}", True, JOB_MATCHES_ACTIVE_TIMEOUT)
+    return cache.get(job_matches_key(user_id, page, page_size))
+
+
+def is_job_matches_user_active(user_id):
+    return bool(cache.get(f"{JOB_MATCHES_CACHE_NAMESPACE}_active_{user_id}"))
+
+
+def invalidate_job_matches(user_id):
+    """Make the precomputed matches of a member stale, e.g. after their skills changed."""
+    bump_cache_version(JOB_MATCHES_CACHE_NAMESPACE, user_id)
+
+
+def _service_auth_header():
+    token = getattr(settings, "TALENT_CHOICE_SERVICE_TOKEN", None)
+    return f"Bearer {token}" if token else None
+
+
+def request_talent_choice_matches(talent_profile, jobs, page, total_pages):
+    """
+    Rank a page of jobs against a talent profile with the Talent Choice matcher.
+
+    Called from a background task, so it authenticates with TALENT_CHOICE_SERVICE_TOKEN
+    rather than the member's own token.
+
+    Raises:
+        requests.exceptions.RequestException: If the request fails or times out.
+    """
+    data_dump = {
+        "user_profile": talent_profile,
+        "department": talent_profile["department"],
+        "user_role": talent_profile["role"],
+        "user_level": talent_profile["tech_journey"],
+        "user_skills": talent_profile["skills"],
+        "header_token": _service_auth_header(),
+        "filtered_jobs": jobs,
+        "page": page,
+        "total_pages": total_pages,
+    }
+    response = requests.post(
+        f"{os.getenv('IT_API_URL')}api/v1/matches/jobs/",
+        data=json.dumps(data_dump),
+        headers={'Content-Type': 'application/json'},
+        timeout=TALENT_CHOICE_MATCH_TIMEOUT,
+    )
+    response.raise_for_status()
+    return response.json()
+
+
+def compute_job_matches(user_id, pages, page_size=DEFAULT_PAGE_SIZE):
+    """
+    Rank the given pages of a member's matches with Talent Choice and cache them.
+
+    Pages already cached for the current versions are skipped. Stops at the last
+    page of matches, or at the first failed request.
+
+    Args:
+        user_id (int): Member to compute the matches of.
+        pages (Iterable[int]): Page numbers to compute.
+        page_size (int): Jobs per page.
+
+    Returns:
+        int: Number of pages computed.
+    """
+    user_profile = FullTalentProfileSerializer.setup_eager_loading(
+        MemberProfile.objects.filter(user_id=user_id)
+    ).first()
+    if user_profile is None:
+        return 0
+    talent_profile = FullTalentProfileSerializer(user_profile)
+
+    computed = 0
+    for page in pages:
+        cache_key = job_matches_key(user_id, page, page_size)
+        if cache.get(cache_key) is not None:
+            continue
+        try:
+            current_page, paginator = filter_and_paginate_jobs(user_profile, talent_profile, page, page_size)
+        except EmptyPage:
+            break
+        if not current_page:
+            break
+
+        try:
+            matches = request_talent_choice_matches(
+                talent_profile.data, JobFeedSerializer(current_page, many=True).data, page, paginator.num_pages
+            )
+        except requests.exceptions.RequestException as error:
+            logger.error(f"Talent Choice match request failed for user {user_id} page {page}: {error}")
+            break
+
+        cache.set(cache_key, matches, JOB_MATCHES_CACHE_TIMEOUT)
+        computed += 1
+
+    logger.info(f"Computed {computed} pages of job matches for user {user_id}")
+    return computed
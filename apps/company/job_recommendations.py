@@ -0,0 +1,318 @@
+"""
+Precomputed job recommendations.
+
+JobRecommendation keeps the best JOB_RECOMMENDATIONS_PER_MEMBER active jobs of every
+active member with their score and the reasons behind it, so feeds read the top jobs
+of a member from the (member, -score) index instead of scoring every job per request.
+
+Active jobs are held in per-process sparse matrices (one row per job, one column per
+skill, department, role or level in use), built from the job match index and rebuilt
+when its version changes. Scoring a batch of members against every job is then a few
+sparse matrix products, and only the jobs a member shares something with are stored.
+Scores are the ones the job match index gives: one point per shared skill, required
+or nice to have, per shared department, for the job's role and for the job's level.
+
+Every member is rescored nightly by rebuild_job_recommendations_task. In between,
+refresh_changed_job_recommendations_task rescores the members affected by jobs
+published, closed or edited since its last run, and apps/member/signals.py queues
+refresh_member_recommendations_task for a member whose profile changed.
+"""
+import threading
+from datetime import timedelta
+
+import numpy as np
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from scipy import sparse
+
+from apps.company.job_match_index import JOB_MATCH_INDEX_CACHE_NAMESPACE, JOB_MATCH_INDEX_CACHE_ID
+from apps.company.models import Job, JobMatchIndex, JobRecommendation
+from apps.member.models import MemberProfile
+from utils.cache_utils import get_cache_version
+from utils.logging_helper import get_logger
+
+logger = get_logger(__name__)
+
+JOB_RECOMMENDATIONS_PER_MEMBER = getattr(settings, "JOB_RECOMMENDATIONS_PER_MEMBER", 50)
+JOB_RECOMMENDATIONS_BATCH_SIZE = 500
+JOB_RECOMMENDATIONS_SYNCED_AT_KEY = "job_recommendations_synced_at"
+# Re-read match index rows this far behind the last run to pick up transactions that committed late
+SYNC_OVERLAP = timedelta(minutes=1)
+MEMBER_M2M_FIELDS = (("skills", "skill_id"), ("role", "roles_id"), ("department", "department_id"))
+
+
+def _parse_level(level):
+    try:
+        return int(level)
+    except (TypeError, ValueError):
+        return -1
+
+
+def _one_hot(rows_of_ids, columns):
+    """Sparse 0/1 matrix with a row per list of ids and a column per id in `columns`."""
+    indptr = [0]
+    indices = []
+    for ids in rows_of_ids:
+        indices.extend(columns[related_id] for related_id in ids if related_id in columns)
+        indptr.append(len(indices))
+    return sparse.csr_matrix((np.ones(len(indices), dtype=np.int32), indices, indptr),
+                             shape=(len(rows_of_ids), len(columns)))
+
+
+def get_active_members(user_ids=None):
+    members = MemberProfile.objects.filter(user__is_active=True)
+    if user_ids is not None:
+        members = members.filter(user_id__in=list(user_ids))
+    return members
+
+
+def _get_member_features(user_ids):
+    """{user_id: {"skills": set, "role": set, "department": set, "level": int}} of the given active members."""
+    features = {
+        user_id: {"skills": set(), "role": set(), "department": set(), "level": _parse_level(tech_journey)}
+        for user_id, tech_journey in get_active_members(user_ids).values_list("user_id", "tech_journey")
+    }
+    for field_name, related_field in MEMBER_M2M_FIELDS:
+        through = getattr(MemberProfile, field_name).through
+        rows = through.objects.filter(memberprofile__user_id__in=list(features)).values_list(
+            "memberprofile__user_id", related_field
+        )
+        for user_id, related_id in rows:
+            features[user_id][field_name].add(related_id)
+    return features
+
+
+class JobRecommendationEngine:
+    """Process-local matrices of every active job, rebuilt when the job match index changes."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.version = None
+        self.job_ids = np.zeros(0, dtype=np.int64)
+        self.jobs = []
+
+    def sync(self):
+        version = get_cache_version(JOB_MATCH_INDEX_CACHE_NAMESPACE, JOB_MATCH_INDEX_CACHE_ID)
+        if version == self.version:
+            return
+
+        with self.lock:
+            if version != self.version:
+                self._build()
+                self.version = version
+
+    def _build(self):
+        # (job_id, skills, nice_to_have_skills, departments, role_id, level_id)
+        self.jobs = [
+            (job_id, set(skills), set(nice_to_have_skills), set(departments), role_id, level_id)
+            for job_id, skills, nice_to_have_skills, departments, role_id, level_id in
+            JobMatchIndex.objects.filter(is_active=True).order_by("job_id").values_list(
+                "job_id", "skills", "nice_to_have_skills", "departments", "role_id", "level_id"
+            )
+        ]
+        self.job_ids = np.array([job[0] for job in self.jobs], dtype=np.int64)
+
+        self.skill_columns = {}
+        self.department_columns = {}
+        self.role_columns = {}
+        self.level_columns = {}
+        for _, skills, nice_to_have_skills, departments, role_id, level_id in self.jobs:
+            for skill_id in skills | nice_to_have_skills:
+                self.skill_columns.setdefault(skill_id, len(self.skill_columns))
+            for department_id in departments:
+                self.department_columns.setdefault(department_id, len(self.department_columns))
+            if role_id is not None:
+                self.role_columns.setdefault(role_id, len(self.role_columns))
+            if level_id is not None:
+                self.level_columns.setdefault(level_id, len(self.level_columns))
+
+        # A skill that is both required and nice to have counts twice, as in the match index
+        self.skills = (_one_hot([job[1] for job in self.jobs], self.skill_columns)
+                       + _one_hot([job[2] for job in self.jobs], self.skill_columns)).T.tocsr()
+        self.departments = _one_hot([job[3] for job in self.jobs], self.department_columns).T.tocsr()
+        self.roles = _one_hot([[job[4]] for job in self.jobs], self.role_columns).T.tocsr()
+        self.levels = _one_hot([[job[5]] for job in self.jobs], self.level_columns).T.tocsr()
+        logger.info(f"Built job recommendation matrices for {len(self.jobs)} jobs")
+
+    def score(self, members):
+        """
+        Score members against every active job.
+
+        Args:
+            members (list[dict]): Features of the members, as returned by _get_member_features.
+
+        Returns:
+            sparse.csr_matrix: Scores, one row per member and one column per job of `job_ids`,
+                holding only the jobs scoring above zero.
+        """
+        scores = (
+                _one_hot([member["skills"] for member in members], self.skill_columns) @ self.skills
+                + _one_hot([member["department"] for member in members], self.department_columns) @ self.departments
+                + _one_hot([member["role"] for member in members], self.role_columns) @ self.roles
+                + _one_hot([[member["level"]] for member in members], self.level_columns) @ self.levels
+        )
+        scores.eliminate_zeros()
+        return scores
+
+    def recommend(self, user_id, member, scores, limit):
+        """
+        JobRecommendation rows of a member's best `limit` jobs, best first and ties broken by job id.
+
+        Args:
+            scores (sparse.csr_matrix): The member's row of the scores.
+        """
+        columns, values = scores.indices, scores.data
+        order = np.lexsort((self.job_ids[columns], -values))[:limit]
+
+        recommendations = []
+        for column, score in zip(columns[order], values[order]):
+            job_id, skills, nice_to_have_skills, departments, role_id, level_id = self.jobs[column]
+            recommendations.append(JobRecommendation(
+                member_id=user_id,
+                job_id=job_id,
+                score=int(score),
+                reasons={
+                    "skills": sorted(member["skills"] & skills),
+                    "nice_to_have_skills": sorted(member["skills"] & nice_to_have_skills),
+                    "departments": sorted(member["department"] & departments),
+                    "role": role_id in member["role"],
+                    "level": level_id is not None and level_id == member["level"],
+                },
+            ))
+        return recommendations
+
+
+job_recommendation_engine = JobRecommendationEngine()
+
+
+def refresh_member_recommendations(user_ids=None, limit=JOB_RECOMMENDATIONS_PER_MEMBER,
+                                   batch_size=JOB_RECOMMENDATIONS_BATCH_SIZE):
+    """
+    Rescore members and replace their recommendations.
+
+    Args:
+        user_ids (Iterable[int], optional): Members to rescore, every active member by default.
+            Given members that are no longer active lose their recommendations.
+        limit (int): Recommendations kept per member.
+        batch_size (int): Members scored at once.
+
+    Returns:
+        int: Number of recommendations written.
+    """
+    job_recommendation_engine.sync()
+    if user_ids is None:
+        user_ids = get_active_members().order_by("user_id").values_list("user_id", flat=True)
+    user_ids = list(user_ids)
+
+    written = 0
+    for start in range(0, len(user_ids), batch_size):
+        batch = user_ids[start:start + batch_size]
+        features = _get_member_features(batch)
+        recommendations = []
+        if features and len(job_recommendation_engine.job_ids):
+            members = list(features.values())
+            scores = job_recommendation_engine.score(members)
+            for row, (user_id, member) in enumerate(features.items()):
+                recommendations += job_recommendation_engine.recommend(user_id, member, scores[row], limit)
+
+        with transaction.atomic():
+            JobRecommendation.objects.filter(member_id__in=batch).delete()
+            JobRecommendation.objects.bulk_create(recommendations)
+        written += len(recommendations)
+
+    return written
+
+
+def get_members_affected_by_jobs(job_ids):
+    """
+    Members whose recommendations may change with the given jobs.
+
+    Returns:
+        set: Ids of the members recommended one of the jobs, and of the active members
+            sharing a skill, department or role with one of the active jobs.
+    """
+    user_ids = set(JobRecommendation.objects.filter(job_id__in=job_ids).values_list("member_id", flat=True))
+
+    skill_ids, department_ids, role_ids = set(), set(), set()
+    for skills, nice_to_have_skills, departments, role_id in JobMatchIndex.objects.filter(
+            job_id__in=job_ids, is_active=True).values_list("skills", "nice_to_have_skills", "departments", "role_id"):
+        skill_ids.update(skills, nice_to_have_skills)
+        department_ids.update(departments)
+        if role_id is not None:
+            role_ids.add(role_id)
+
+    overlap = Q(skills__in=skill_ids) | Q(department__in=department_ids) | Q(role__in=role_ids)
+    if skill_ids or department_ids or role_ids:
+        user_ids.update(get_active_members().filter(overlap).values_list("user_id", flat=True).distinct())
+    return user_ids
+
+
+def refresh_changed_job_recommendations():
+    """
+    Rescore the members affected by the jobs whose match index changed since the last run.
+
+    Does nothing until rebuild_job_recommendations has run once, since there is no
+    baseline to update before that.
+
+    Returns:
+        int: Number of members rescored.
+    """
+    synced_at = cache.get(JOB_RECOMMENDATIONS_SYNCED_AT_KEY)
+    if synced_at is None:
+        return 0
+
+    started_at = timezone.now()
+    job_ids = list(JobMatchIndex.objects.filter(updated_at__gte=synced_at - SYNC_OVERLAP).values_list(
+        "job_id", flat=True))
+    user_ids = get_members_affected_by_jobs(job_ids) if job_ids else set()
+    if user_ids:
+        refresh_member_recommendations(sorted(user_ids))
+    cache.set(JOB_RECOMMENDATIONS_SYNCED_AT_KEY, started_at, None)
+
+    logger.info(f"Rescored the recommendations of {len(user_ids)} members for {len(job_ids)} changed jobs")
+    return len(user_ids)
+
+
+def rebuild_job_recommendations():
+    """
+    Rescore every active member and drop the recommendations of the others.
+
+    Returns:
+        int: Number of recommendations written.
+    """
+    started_at = timezone.now()
+    JobRecommendation.objects.exclude(member_id__in=get_active_members().values("user_id")).delete()
+    written = refresh_member_recommendations()
+    cache.set(JOB_RECOMMENDATIONS_SYNCED_AT_KEY, started_at, None)
+    logger.info(f"Rebuilt job recommendations, {written} written")
+    return written
+
+
+def get_recommended_jobs(user_id, limit=JOB_RECOMMENDATIONS_PER_MEMBER, jobs=None):
+    """
+    The best active jobs of a member, best first.
+
+    Args:
+        user_id (int): Member to get the jobs of.
+        limit (int): Most jobs returned.
+        jobs (QuerySet, optional): Queryset the jobs are loaded from, e.g. with eager loading set up.
+
+    Returns:
+        list[Job]: The jobs, each with its `recommendation_score` and `recommendation_reasons`.
+    """
+    recommendations = list(JobRecommendation.objects.filter(member_id=user_id, job__status=Job.ACTIVE).order_by(
+        "-score", "job_id").values_list("job_id", "score", "reasons")[:limit])
+    jobs_by_id = (jobs if jobs is not None else Job.objects.all()).in_bulk(
+        [job_id for job_id, _, _ in recommendations])
+
+    recommended_jobs = []
+    for job_id, score, reasons in recommendations:
+        if job_id in jobs_by_id:
+            job = jobs_by_id[job_id]
+            job.recommendation_score = score
+            job.recommendation_reasons = reasons
+            recommended_jobs.append(job)
+    return recommended_jobs
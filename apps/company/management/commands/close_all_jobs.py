@@ -1,10 +1,19 @@
 from django.core.management.base import BaseCommand
+from django.db import transaction
 from django.utils import timezone
-from apps.company.models import Job
+
+from apps.company.job_match_index import JOB_MATCH_INDEX_CACHE_NAMESPACE, JOB_MATCH_INDEX_CACHE_ID
+from apps.company.models import Job, JobMatchIndex
+from utils.cache_utils import bump_cache_version
 
 class Command(BaseCommand):
     help = 'Marks all jobs as expired in the database'
 
     def handle(self, *args, **options):
-        jobs_updated = Job.objects.update(status='job_expired', updated_at=timezone.now())
-        self.stdout.write(self.style.SUCCESS(f'Successfully closed {jobs_updated} jobs'))
\ No newline at end of file
+        now = timezone.now()
+        with transaction.atomic():
+            jobs_updated = Job.objects.update(status='job_expired', updated_at=now)
+            # Bulk updates skip the signals that keep the match index in sync
+            JobMatchIndex.objects.filter(is_active=True).update(is_active=False, updated_at=now)
+        bump_cache_version(JOB_MATCH_INDEX_CACHE_NAMESPACE, JOB_MATCH_INDEX_CACHE_ID)
+        self.stdout.write(self.style.SUCCESS(f'Successfully closed {jobs_updated} jobs'))
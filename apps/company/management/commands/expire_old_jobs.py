@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from apps.company.job_expiration import expire_old_jobs, JOB_EXPIRATION_DAYS, JOB_EXPIRATION_CHUNK_SIZE
+
+
+class Command(BaseCommand):
+    help = 'Expires the active jobs posted more than JOB_EXPIRATION_DAYS ago'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=JOB_EXPIRATION_DAYS,
+                            help='Age in days from which an active job expires')
+        parser.add_argument('--chunk-size', type=int, default=JOB_EXPIRATION_CHUNK_SIZE,
+                            help='Width of the job id ranges updated per statement')
+        parser.add_argument('--dry-run', action='store_true', help='Only count the jobs that would expire')
+
+    def handle(self, *args, **options):
+        stats = expire_old_jobs(max_age_days=options['days'], chunk_size=options['chunk_size'],
+                                dry_run=options['dry_run'])
+        verb = 'Would expire' if options['dry_run'] else 'Expired'
+        self.stdout.write(self.style.SUCCESS(
+            f"{verb} {stats['expired']} jobs posted before {stats['cutoff']} in {stats['duration_seconds']}s"
+        ))
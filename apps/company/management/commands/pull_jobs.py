@@ -1,17 +1,36 @@
 import datetime
 import json
-import spacy
-import re
+import multiprocessing
+import os
+from collections import deque
+from itertools import islice
 
+import spacy
 from django.core.management import BaseCommand
-from django.db import IntegrityError
-from fuzzywuzzy import process
+from django.db import transaction
 
+from apps.company.job_match_index import refresh_job_match_index
 from apps.company.models import Industries, Roles, CompanyProfile, SalaryRange, Job, Skill, Certs
-from apps.core.models import CustomUser
+from apps.company.name_resolver import role_resolver, industry_resolver, refresh_name_resolver
+from apps.company.skill_matcher import SkillMatcher
+from apps.core.reference_data import invalidate_reference_data
+from utils.stream_utils import iter_json_records, ImportCheckpoint
+
+# Skills are matched on tokens only, none of the trained components are used
+UNUSED_PIPELINE_COMPONENTS = ["tok2vec", "tagger", "parser", "attribute_ruler", "lemmatizer", "ner", "senter"]
+
+_nlp = None
+# Skill matcher of a parsing worker process, built once by _init_parse_worker
+_worker_skill_matcher = None
+
+
+def get_nlp():
+    """Load the spaCy model on first use instead of at import."""
+    global _nlp
+    if _nlp is None:
+        _nlp = spacy.load("en_core_web_sm", exclude=UNUSED_PIPELINE_COMPONENTS)
+    return _nlp
 
-# Load the spaCy model
-nlp = spacy.load("en_core_web_sm")
 
 def parse_salary(salary):
     print(f"Parsing salary: {salary}")
@@ -22,195 +41,346 @@ def parse_salary(salary):
     return int(parts[0]), int(parts[1])
 
 
-def match_closest(query, choices):
-    closest_match = process.extractOne(query, choices)
-    return closest_match[0] if closest_match else query
+def match_closest(query, resolver):
+    closest_match = resolver.resolve(query)
+    return closest_match[1] if closest_match else query
 
 
 def clean_employment_type(employment_type):
     return employment_type.lower().replace('-', ' ')
 
 
-def get_or_create_industry(industry_name, existing_industries):
-    print(f"Industry {industry_name}")
-    closest_match = match_closest(industry_name, existing_industries)
-    print(f"Closest match: {closest_match}")
-
-    if closest_match:
-        print("Already exists")
-        industry = Industries.objects.get(name=closest_match)
-        print("Pulled")
-    else:
-        print("Creating industry")
-        industry = Industries.objects.create(name=industry_name)
-
-    return industry
-
-def get_or_create_role(role_name, common_roles):
-    role_name = match_closest(role_name, common_roles)
-    role, created = Roles.objects.get_or_create(name=role_name)
-    return role
-
-
-def extract_skills(description, skills_list, certs_list):
-    # Define a list of common skills for initial matching
-    skills = skills_list
-    certs = certs_list
-
-    # Process the text using spaCy
-    doc = nlp(description)
-
-    # Initialize sets for the different types of skills
-    required_skills = set()
-    nice_to_have_skills = set()
-    certs_skills = set()
-
-    # Extract skills based on predefined list
-    for token in doc:
-        if token.text.lower() in [skill.lower() for skill in skills]:
-            required_skills.add(token.text)
-        if token.text.lower() in [cert.lower() for cert in certs]:
-            certs_skills.add(token.text)
-
-    # Extract skills from bullet points or requirement sections
-    lines = description.split('\n')
-    for line in lines:
-        line = line.strip()
-        if re.match(r'•', line) or 'required skills' in line.lower() or 'preferred skills' in line.lower() or 'certifications' in line.lower():
-            for skill in skills:
-                if re.search(r'\b' + re.escape(skill) + r'\b', line, re.IGNORECASE):
-                    if 'nice to have' in line.lower() or 'preferred' in line.lower():
-                        nice_to_have_skills.add(skill)
-                    else:
-                        required_skills.add(skill)
-            for cert in certs:
-                if re.search(r'\b' + re.escape(cert) + r'\b', line, re.IGNORECASE):
-                    certs_skills.add(cert)
+def extract_skills(doc, skill_matcher):
+    required_skills, nice_to_have_skills, certs_skills = skill_matcher.extract(doc)
 
     print(f"Extracted required skills: {len(required_skills)}, nice to have skills: {len(nice_to_have_skills)}, certs: {len(certs_skills)}")
-    return list(required_skills), list(nice_to_have_skills), list(certs_skills)
-
-
-def add_skills_to_db(extracted_skills, model):
-    print(f"Extracting {model} skills: {extracted_skills}")
-    skills = []
-    for skill_name in extracted_skills:
-        print(f"Skill name: {skill_name}")
-        skill, created = model.objects.get_or_create(name=skill_name)
-        if created:
-            print(f"Created new {model.__name__}: {skill_name}")
-        skills.append(skill)
-    return skills
-
-def extract_role(title, common_roles):
-    role_name = match_closest(title, common_roles)
+    return required_skills, nice_to_have_skills, certs_skills
+
+
+def _init_parse_worker(skills, certs):
+    global _worker_skill_matcher
+    _worker_skill_matcher = SkillMatcher(get_nlp(), skills, certs)
+
+
+def _extract_batch(descriptions, skill_matcher=None):
+    """
+    Tokenize descriptions and match their skills and certs.
+
+    Only the matched names are returned, so a worker sends back a few small tuples
+    instead of pickling every Doc.
+
+    Returns:
+        list[tuple]: (required_skills, nice_to_have_skills, certs) of each description.
+    """
+    skill_matcher = skill_matcher or _worker_skill_matcher
+    return [extract_skills(doc, skill_matcher) for doc in get_nlp().pipe(descriptions)]
+
+
+def extract_role(title):
+    role_name = match_closest(title, role_resolver)
     return role_name
 
 
-def process_job_data(job_data, common_roles, common_skills, common_certs, existing_industries):
-    print("get ready")
-    if Job.objects.filter(external_id=job_data["id"]).exists():
-        print("Job already exists")
-        return
-    created_date = datetime.datetime.strptime(job_data["created"], '%Y-%m-%d %H:%M:%S')
-    print(job_data["id"])
-    if created_date < datetime.datetime(2024, 5, 1):
-        print("skipping job")
-        return
-    print("check company")
-
-    company_profiles = CompanyProfile.objects.filter(company_name=job_data["company_name"])
-    if company_profiles.exists():
-        company_profile = company_profiles.first()
-    else:
-        company_profile = CompanyProfile.objects.create(
-            company_name=job_data["company_name"],
-            company_url=job_data["company_url"],
-            is_unclaimed_account=True,
-            coresignal_id=job_data["company_id"]
+def first_salary_range(salary_ranges, predicate):
+    """In-memory equivalent of SalaryRange.objects.filter(range__gte/lte=...).first()."""
+    return next((range_id for range_id, salary_range in salary_ranges if predicate(salary_range)), None)
+
+
+class NameLookup:
+    """
+    name -> id map of a lookup model, loaded once and grown in bulk as jobs need new rows.
+
+    Args:
+        model (Model): The lookup model, e.g. Skill.
+        name_field (str): The field names are matched on.
+    """
+
+    def __init__(self, model, name_field="name"):
+        self.model = model
+        self.name_field = name_field
+        self.ids = {}
+        for obj_id, name in model.objects.order_by("-id").values_list("id", name_field):
+            # Keep the oldest row when names are duplicated, like .first() did
+            self.ids[name] = obj_id
+
+    def names(self):
+        return list(self.ids)
+
+    def ensure(self, names, defaults=None):
+        """
+        Create the rows missing for the given names in one query.
+
+        Args:
+            names (Iterable[str]): Names that must exist.
+            defaults (dict, optional): {name: {field: value}} of extra fields for new rows.
+        """
+        missing = {name for name in names if name and name not in self.ids}
+        if not missing:
+            return
+
+        self.model.objects.bulk_create([
+            self.model(**{self.name_field: name, **(defaults or {}).get(name, {})})
+            for name in missing
+        ])
+        for obj_id, name in self.model.objects.filter(**{f"{self.name_field}__in": missing}).order_by(
+                "-id").values_list("id", self.name_field):
+            self.ids.setdefault(name, obj_id)
+        # bulk_create skips the signals that let other processes resolve to the new names
+        # and that invalidate the cached dropdown lists
+        if self.model in (Roles, Industries):
+            transaction.on_commit(lambda: refresh_name_resolver(self.model))
+        transaction.on_commit(lambda: invalidate_reference_data(self.model))
+        print(f"Created {len(missing)} {self.model.__name__}")
+
+
+class JobIngestionPipeline:
+    """
+    Turns batches of Coresignal job postings into jobs with a handful of bulk queries.
+
+    Everything a job is matched against (existing external ids, companies, industries,
+    roles, skills, certs and salary ranges) is loaded into memory once. Each batch then
+    creates its missing lookup rows, jobs and M2M rows in bulk inside one transaction.
+    """
+
+    def __init__(self):
+        self.existing_external_ids = set(
+            Job.objects.exclude(external_id__isnull=True).values_list("external_id", flat=True)
         )
-    print(f"Company Profile: {company_profile}")
-    industry = get_or_create_industry(job_data["job_industries_collection"][0]["job_industry_list"]["industry"], existing_industries)
-    if industry:
-        print(f"industry found {industry}")
-        print(f"Adding to profile")
-        company_profile.industries.add(industry)
-        company_profile.save()
-        print(f"Saved to profile")
-
-    min_salary, max_salary = parse_salary(job_data["salary"])
-    print("done")
-    min_salary_range = SalaryRange.objects.filter(range__gte=min_salary).first()
-    print("done ===")
-    max_salary_range = SalaryRange.objects.filter(range__lte=max_salary).first()
-    print("done ***")
-
-    print("ROLE (((")
-    role_name = extract_role(job_data["title"], common_roles)
-    role = get_or_create_role(role_name, common_roles)
-    print("ROLE found ^^^")
-    print("SKILLS search %%%")
-
-    required_skills, nice_to_have_skills, certs_skills = extract_skills(job_data["description"], common_skills, common_certs)
-    print("Adding SKILLS ###")
-
-    required_skills_objs = add_skills_to_db(required_skills, Skill)
-    nice_to_have_skills_objs = add_skills_to_db(nice_to_have_skills, Skill)
-    certs_objs = add_skills_to_db(certs_skills, Skill)
-    print("SKILLS found $$$")
-
-    job = Job.objects.create(
-        external_id=job_data["id"],
-        job_title=job_data["title"],
-        external_description=job_data["description"],
-        job_type=clean_employment_type(job_data["employment_type"]),
-        location=job_data["location"],
-        url=job_data["url"],
-        min_compensation=min_salary_range,
-        max_compensation=max_salary_range,
-        parent_company=company_profile,
-        role=role,
-        status='active'
-    )
-
-    for skill in required_skills_objs:
-        job.skills.add(skill)
-    for skill in nice_to_have_skills_objs:
-        job.nice_to_have_skills.add(skill)
-    for cert in certs_objs:
-        job.certs.add(cert)
-
-        job.save()
-        print("job saved {}".format(job.id))
+        self.companies = NameLookup(CompanyProfile, name_field="company_name")
+        self.industries = NameLookup(Industries)
+        self.roles = NameLookup(Roles)
+        self.skills = NameLookup(Skill)
+        self.certs = NameLookup(Certs)
+        self.lookups = [self.companies, self.industries, self.roles, self.skills, self.certs]
+        self.salary_ranges = list(SalaryRange.objects.order_by("id").values_list("id", "range"))
+
+        # Skills are matched against what existed before the run, as they always were
+        self.skill_matcher = SkillMatcher(get_nlp(), self.skills.names(), self.certs.names())
+
+    def should_ingest(self, job_data):
+        """Skip postings we already have (or saw earlier in the run) and old postings."""
+        external_id = str(job_data["id"])
+        if external_id in self.existing_external_ids:
+            print("Job already exists")
+            return False
+        created_date = datetime.datetime.strptime(job_data["created"], '%Y-%m-%d %H:%M:%S')
+        if created_date < datetime.datetime(2024, 5, 1):
+            print("skipping job")
+            return False
+        self.existing_external_ids.add(external_id)
+        return True
+
+    def parse(self, job_records, workers=1, batch_size=64):
+        """
+        Extract the skills and certs of the postings worth ingesting.
+
+        Descriptions are tokenized and matched in batches of `batch_size`, across
+        `workers` processes when more than one. Workers only get the descriptions and
+        send back the matched names, this process keeps the postings, their order and
+        every database write. At most two batches per worker are in flight, so the
+        file is still read lazily.
+
+        Args:
+            job_records (Iterable[tuple]): (job_data, offset) pairs, as read by iter_json_records.
+            workers (int): Number of processes matching descriptions.
+            batch_size (int): Descriptions sent to a process at a time.
+
+        Yields:
+            tuple: (job_data, (required_skills, nice_to_have_skills, certs), offset)
+        """
+        postings = ((job_data, offset) for job_data, offset in job_records if self.should_ingest(job_data))
+        batches = iter(lambda: list(islice(postings, batch_size)), [])
+
+        def descriptions(batch):
+            return [job_data["description"] or "" for job_data, _ in batch]
+
+        def parsed(batch, extracted):
+            for (job_data, offset), skills in zip(batch, extracted):
+                yield job_data, skills, offset
+
+        if workers <= 1:
+            for batch in batches:
+                yield from parsed(batch, _extract_batch(descriptions(batch), self.skill_matcher))
+            return
+
+        # Workers are forked with the loaded model, they never touch the database
+        context = multiprocessing.get_context("fork")
+        with context.Pool(workers, initializer=_init_parse_worker,
+                          initargs=(self.skills.names(), self.certs.names())) as pool:
+            pending = deque()
+            for batch in batches:
+                pending.append((batch, pool.apply_async(_extract_batch, (descriptions(batch),))))
+                if len(pending) >= workers * 2:
+                    batch, result = pending.popleft()
+                    yield from parsed(batch, result.get())
+            while pending:
+                batch, result = pending.popleft()
+                yield from parsed(batch, result.get())
+
+    def prepare(self, job_data, skills):
+        """
+        Resolve everything a parsed posting needs that doesn't touch the database.
+
+        Args:
+            skills (tuple): (required_skills, nice_to_have_skills, certs) names from parse().
+
+        Returns:
+            dict: The prepared posting.
+        """
+        min_salary, max_salary = parse_salary(job_data["salary"])
+        required_skills, nice_to_have_skills, certs_skills = skills
+        return {
+            "data": job_data,
+            "external_id": str(job_data["id"]),
+            "industry": match_closest(job_data["job_industries_collection"][0]["job_industry_list"]["industry"],
+                                      industry_resolver),
+            "role": extract_role(job_data["title"]),
+            "min_compensation_id": first_salary_range(self.salary_ranges, lambda r: r >= str(min_salary)),
+            "max_compensation_id": first_salary_range(self.salary_ranges, lambda r: r <= str(max_salary)),
+            "skills": required_skills,
+            "nice_to_have_skills": nice_to_have_skills,
+            "certs": certs_skills,
+        }
+
+    def ingest(self, parsed_postings):
+        """
+        Store one batch of parsed postings.
+
+        Args:
+            parsed_postings (list[tuple]): (job_data, skills, offset) tuples from parse().
+
+        Returns:
+            int: Number of jobs created.
+        """
+        prepared = [self.prepare(job_data, skills) for job_data, skills, _ in parsed_postings]
+        if not prepared:
+            return 0
+
+        known_ids = [(lookup, dict(lookup.ids)) for lookup in self.lookups]
+        try:
+            job_count = self._store(prepared)
+        except Exception:
+            # Forget the rows and ids of the rolled back batch so a retry recreates them
+            for lookup, ids in known_ids:
+                lookup.ids = ids
+            self.existing_external_ids.difference_update(job["external_id"] for job in prepared)
+            raise
+        return job_count
+
+    def _store(self, prepared):
+        with transaction.atomic():
+            self.companies.ensure(
+                [job["data"]["company_name"] for job in prepared],
+                defaults={
+                    job["data"]["company_name"]: {
+                        "company_url": job["data"]["company_url"],
+                        "is_unclaimed_account": True,
+                        "coresignal_id": job["data"]["company_id"],
+                    }
+                    for job in reversed(prepared)
+                },
+            )
+            self.industries.ensure(job["industry"] for job in prepared)
+            self.roles.ensure(job["role"] for job in prepared)
+            self.skills.ensure(
+                skill for job in prepared for skill in job["skills"] + job["nice_to_have_skills"]
+            )
+            self.certs.ensure(cert for job in prepared for cert in job["certs"])
+
+            CompanyProfile.industries.through.objects.bulk_create([
+                CompanyProfile.industries.through(
+                    companyprofile_id=self.companies.ids[job["data"]["company_name"]],
+                    industries_id=self.industries.ids[job["industry"]],
+                )
+                for job in prepared
+            ], ignore_conflicts=True)
+
+            Job.objects.bulk_create([
+                Job(
+                    external_id=job["external_id"],
+                    job_title=job["data"]["title"],
+                    external_description=job["data"]["description"],
+                    job_type=clean_employment_type(job["data"]["employment_type"]),
+                    location=job["data"]["location"],
+                    url=job["data"]["url"],
+                    min_compensation_id=job["min_compensation_id"],
+                    max_compensation_id=job["max_compensation_id"],
+                    parent_company_id=self.companies.ids[job["data"]["company_name"]],
+                    role_id=self.roles.ids[job["role"]],
+                    status=Job.ACTIVE,
+                )
+                for job in prepared
+            ])
+            job_ids = dict(Job.objects.filter(external_id__in=[job["external_id"] for job in prepared]).values_list(
+                "external_id", "id"))
+
+            for field_name, lookup, related_field in (
+                    ("skills", self.skills, "skill_id"),
+                    ("nice_to_have_skills", self.skills, "skill_id"),
+                    ("certs", self.certs, "certs_id"),
+            ):
+                through = getattr(Job, field_name).through
+                through.objects.bulk_create([
+                    through(job_id=job_ids[job["external_id"]], **{related_field: lookup.ids[name]})
+                    for job in prepared
+                    for name in set(job[field_name])
+                ], ignore_conflicts=True)
+
+            # bulk_create skips the signals that keep the match index current
+            transaction.on_commit(lambda: refresh_job_match_index(job_ids.values()))
+
+        return len(prepared)
 
 
 class Command(BaseCommand):
     help = 'Processes job data and stores it in the database'
 
     def add_arguments(self, parser):
-        parser.add_argument('json_file', type=str, help='The JSON file containing job data')
+        parser.add_argument('json_file', type=str, help='The JSON array or NDJSON file containing job data')
+        parser.add_argument('--batch-size', type=int, default=500, help='Number of jobs stored per transaction')
+        parser.add_argument('--workers', type=int, default=1, help='Number of processes matching descriptions')
+        parser.add_argument('--parse-batch-size', type=int, default=64,
+                            help='Number of descriptions sent to a matching process at a time')
+        parser.add_argument('--checkpoint', type=str, default=None,
+                            help='File recording how far the import got, an interrupted run resumes from it')
 
     def handle(self, *args, **kwargs):
         json_file = kwargs['json_file']
+        batch_size = kwargs['batch_size']
 
-        try:
-            with open(json_file, 'r') as file:
-                job_data_list = json.load(file)
-        except FileNotFoundError:
+        if not os.path.exists(json_file):
             self.stdout.write(self.style.ERROR(f'File "{json_file}" not found'))
             return
-        except json.JSONDecodeError:
-            self.stdout.write(self.style.ERROR(f'File "{json_file}" is not a valid JSON file'))
-            return
 
-        # Pull common roles, skills, certs, and industries once at the top
-        common_roles = list(Roles.objects.values_list('name', flat=True))
-        common_skills = list(Skill.objects.values_list('name', flat=True))
-        common_certs = list(Certs.objects.values_list('name', flat=True))
-        existing_industries = list(Industries.objects.values_list('name', flat=True))
-
-        for job_data in job_data_list:
-            process_job_data(job_data, common_roles, common_skills, common_certs, existing_industries)
-            self.stdout.write(self.style.SUCCESS(f'Successfully processed job data for job ID {job_data["id"]}'))
+        checkpoint = ImportCheckpoint(kwargs['checkpoint'], json_file) if kwargs['checkpoint'] else None
+        start_offset = checkpoint.load() if checkpoint else 0
+        if start_offset:
+            self.stdout.write(f'Resuming "{json_file}" from byte {start_offset}')
+
+        pipeline = JobIngestionPipeline()
+        parsed_postings = pipeline.parse(iter_json_records(json_file, start_offset), workers=kwargs['workers'],
+                                         batch_size=kwargs['parse_batch_size'])
+        created = 0
+        processed = 0
+        failed = False
+        try:
+            # Matching runs ahead in the workers while this process writes one batch at a time
+            while batch := list(islice(parsed_postings, batch_size)):
+                processed += len(batch)
+                try:
+                    created += pipeline.ingest(batch)
+                except Exception as e:
+                    failed = True
+                    self.stdout.write(self.style.ERROR(f'Failed to store {len(batch)} jobs: {e}'))
+                    continue
+                # Once a batch failed the checkpoint stays before it, so a rerun retries it
+                if checkpoint and not failed:
+                    checkpoint.save(batch[-1][2])
+                self.stdout.write(self.style.SUCCESS(f'Processed {processed} new jobs so far'))
+        except json.JSONDecodeError as e:
+            self.stdout.write(self.style.ERROR(f'File "{json_file}" is not a valid JSON file: {e}'))
+            return
 
-        self.stdout.write(self.style.SUCCESS('Successfully processed all job data'))
+        if checkpoint and not failed:
+            checkpoint.clear()
+        self.stdout.write(self.style.SUCCESS(f'Successfully processed all job data, {created} jobs created'))
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from apps.company.job_match_index import rebuild_job_match_index
+
+
+class Command(BaseCommand):
+    help = 'Rebuilds the precomputed job match index from the jobs table'
+
+    def handle(self, *args, **options):
+        jobs_indexed = rebuild_job_match_index()
+        self.stdout.write(self.style.SUCCESS(f'Successfully indexed {jobs_indexed} jobs'))
@@ -0,0 +1,30 @@
+# Generated by Django 4.2.30 on 2026-10-16 22:50
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('company', '0044_alter_companyprofile_unclaimed_account_creator'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='JobMatchIndex',
+            fields=[
+                ('job', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='match_index', serialize=False, to='company.job')),
+                ('is_active', models.BooleanField(default=False)),
+                ('skills', models.JSONField(blank=True, default=list)),
+                ('nice_to_have_skills', models.JSONField(blank=True, default=list)),
+                ('departments', models.JSONField(blank=True, default=list)),
+                ('role_id', models.BigIntegerField(blank=True, null=True)),
+                ('level_id', models.BigIntegerField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['updated_at'], name='company_job_updated_367abe_idx')],
+            },
+        ),
+    ]
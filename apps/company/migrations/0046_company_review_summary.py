@@ -0,0 +1,27 @@
+# Generated by Django 4.2.30 on 2026-10-16 23:33
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('company', '0045_job_match_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CompanyReviewSummary',
+            fields=[
+                ('company', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='review_summary', serialize=False, to='company.companyprofile')),
+                ('reviews', models.JSONField(blank=True, default=list)),
+                ('review_count', models.PositiveIntegerField(default=0)),
+                ('average_rating', models.FloatField(blank=True, null=True)),
+                ('refreshed_at', models.DateTimeField()),
+            ],
+            options={
+                'indexes': [models.Index(fields=['refreshed_at'], name='company_com_refresh_1daeff_idx')],
+            },
+        ),
+    ]
@@ -343,6 +343,7 @@ class Job(models.Model):
     PAUSE = "pause"
     DRAFT = "draft"
     CLOSED = "closed"
+    EXPIRED = "job_expired"
 
     STATUS_CHOICE = (
         (DRAFT, "Draft"),
@@ -350,7 +351,7 @@ class Job(models.Model):
         (ACTIVE, "Active"),
         (PENDING, "Pending"),
         (CLOSED, "Closed"),
-        ("job_expired", "Job Expired"),
+        (EXPIRED, "Job Expired"),
         ("company_details_needed", "Company Details Needed"),
         ("job_details_needed", "Job Details Needed"),
         ("rejected_bad_company", "Rejected Bad Company"),
@@ -453,3 +454,77 @@ class Job(models.Model):
 
     def __str__(self):
         return self.job_title + " at " + self.parent_company.company_name
+
+
+class JobMatchIndex(models.Model):
+    """
+    Denormalized match features of a job, one row per job.
+
+    Kept in sync by apps/company/signals.py and loaded into the in-memory
+    bitsets of apps/company/job_match_index.py.
+    """
+    job = models.OneToOneField(Job, on_delete=models.CASCADE, primary_key=True, related_name="match_index")
+    is_active = models.BooleanField(default=False)
+    skills = models.JSONField(default=list, blank=True)
+    nice_to_have_skills = models.JSONField(default=list, blank=True)
+    departments = models.JSONField(default=list, blank=True)
+    role_id = models.BigIntegerField(null=True, blank=True)
+    level_id = models.BigIntegerField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['updated_at']),
+        ]
+
+    def __str__(self):
+        return f"Match index for job {self.job_id}"
+
+
+class CompanyReviewSummary(models.Model):
+    """
+    Local copy of the Open Doors reviews of a company, one row per company.
+
+    Kept up to date by refresh_company_reviews_task and the Open Doors review
+    webhook, so company pages read their reviews without calling Open Doors.
+    """
+    company = models.OneToOneField(CompanyProfile, on_delete=models.CASCADE, primary_key=True,
+                                   related_name="review_summary")
+    reviews = models.JSONField(default=list, blank=True)
+    review_count = models.PositiveIntegerField(default=0)
+    average_rating = models.FloatField(null=True, blank=True)
+    refreshed_at = models.DateTimeField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['refreshed_at']),
+        ]
+
+    def __str__(self):
+        return f"Review summary for company {self.company_id}"
+
+
+class JobRecommendation(models.Model):
+    """
+    One of the best matching active jobs of a member, with its match score.
+
+    Filled by apps/company/job_recommendations.py, feeds read the top jobs of a
+    member from the (member, -score) index.
+    """
+    member = models.ForeignKey(CustomUser, on_delete=models.CASCADE, related_name="job_recommendations")
+    job = models.ForeignKey(Job, on_delete=models.CASCADE, related_name="recommendations")
+    score = models.PositiveIntegerField()
+    # Ids of the shared skills and departments, and whether the role and level match
+    reasons = models.JSONField(default=dict, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['member', 'job'], name='unique_job_recommendation'),
+        ]
+        indexes = [
+            models.Index(fields=['member', '-score', 'job'], name='job_recommendation_top'),
+        ]
+
+    def __str__(self):
+        return f"Job {self.job_id} for member {self.member_id}"
@@ -0,0 +1,129 @@
+"""
+Fuzzy resolution of free text to canonical Roles and Industries.
+
+Each resolver indexes the canonical names by character trigram. A query is only
+scored with fuzzywuzzy against the few names sharing the most trigrams with it,
+rather than the whole table, and resolved queries are remembered in an LRU.
+
+Resolvers rebuild when the version bumped by the signals in apps/company/signals.py
+changes, so names added in another process are picked up.
+"""
+import threading
+from collections import Counter, OrderedDict, defaultdict
+
+from fuzzywuzzy import process
+
+from apps.company.models import Roles, Industries
+from utils.cache_utils import get_cache_version, bump_cache_version
+
+NAME_RESOLVER_CACHE_NAMESPACE = "name_resolver"
+# How many of the names sharing the most trigrams are scored
+CANDIDATE_LIMIT = 50
+LRU_SIZE = 10000
+
+
+def normalize_name(name):
+    return " ".join(str(name).lower().split())
+
+
+def trigrams(name):
+    padded = f"  {normalize_name(name)} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def refresh_name_resolver(model):
+    bump_cache_version(NAME_RESOLVER_CACHE_NAMESPACE, model._meta.label_lower)
+
+
+class NameResolver:
+    """
+    Args:
+        model (Model): The model holding the canonical names, e.g. Roles.
+        name_field (str): The field holding the name.
+    """
+
+    def __init__(self, model, name_field="name"):
+        self.model = model
+        self.name_field = name_field
+        self.lock = threading.Lock()
+        self.version = None
+        self.names = []
+        self.ids = []
+        self.exact = {}
+        self.index = defaultdict(list)
+        self.memo = OrderedDict()
+
+    def sync(self):
+        version = get_cache_version(NAME_RESOLVER_CACHE_NAMESPACE, self.model._meta.label_lower)
+        if version == self.version:
+            return
+
+        with self.lock:
+            if version == self.version:
+                return
+            rows = list(self.model.objects.exclude(**{f"{self.name_field}__isnull": True}).order_by("id").values_list(
+                "id", self.name_field))
+            self.ids = [obj_id for obj_id, _ in rows]
+            self.names = [name for _, name in rows]
+            self.exact = {}
+            self.index = defaultdict(list)
+            for position, name in enumerate(self.names):
+                self.exact.setdefault(normalize_name(name), position)
+                for trigram in trigrams(name):
+                    self.index[trigram].append(position)
+            self.memo = OrderedDict()
+            self.version = version
+
+    def _best_match(self, query):
+        """(id, name, score) of the closest canonical name, or None when there are no names."""
+        position = self.exact.get(normalize_name(query))
+        if position is not None:
+            return self.ids[position], self.names[position], 100
+
+        shared = Counter()
+        for trigram in trigrams(query):
+            shared.update(self.index.get(trigram, ()))
+        # Scored in id order, so ties go to the oldest name like a full scan would
+        candidates = sorted(position for position, _ in shared.most_common(CANDIDATE_LIMIT)) or range(len(self.names))
+
+        match = process.extractOne(query, {position: self.names[position] for position in candidates})
+        if match is None:
+            return None
+        name, score, position = match
+        return self.ids[position], name, score
+
+    def resolve(self, query, min_score=0):
+        """
+        Resolve free text to the closest canonical name.
+
+        Args:
+            query (str): The text to resolve, e.g. a job title.
+            min_score (int, optional): Minimum fuzzywuzzy score (0-100) for a match to count.
+
+        Returns:
+            tuple | None: (id, name) of the closest name, or None if nothing scores at least min_score.
+        """
+        self.sync()
+        if not query:
+            return None
+
+        with self.lock:
+            match = self.memo.get(query, False)
+            if match is not False:
+                self.memo.move_to_end(query)
+
+        if match is False:
+            match = self._best_match(query)
+            with self.lock:
+                self.memo[query] = match
+                if len(self.memo) > LRU_SIZE:
+                    self.memo.popitem(last=False)
+
+        if match is None or match[2] < min_score:
+            return None
+        obj_id, name, _ = match
+        return obj_id, name
+
+
+role_resolver = NameResolver(Roles)
+industry_resolver = NameResolver(Industries)
@@ -2,6 +2,7 @@ import datetime
 from fuzzywuzzy import process
 
 from models import Industries, Roles, CompanyProfile, SalaryRange, Job
+from name_resolver import role_resolver, industry_resolver
 
 
 def parse_salary(salary):
@@ -11,9 +12,9 @@ def parse_salary(salary):
     return int(parts[0]), int(parts[1])
 
 
-def match_closest(query, choices):
-    closest_match = process.extractOne(query, choices)
-    return closest_match[0] if closest_match else query
+def match_closest(query, resolver):
+    closest_match = resolver.resolve(query)
+    return closest_match[1] if closest_match else query
 
 
 def clean_employment_type(employment_type):
@@ -22,13 +23,13 @@ def clean_employment_type(employment_type):
 
 def get_or_create_industry(industry_name):
     industry, created = Industries.objects.get_or_create(
-        name=match_closest(industry_name, Industries.objects.values_list('name', flat=True)))
+        name=match_closest(industry_name, industry_resolver))
     return industry
 
 
 def get_or_create_role(role_name):
     role, created = Roles.objects.get_or_create(
-        name=match_closest(role_name, Roles.objects.values_list('name', flat=True)))
+        name=match_closest(role_name, role_resolver))
     return role
 
 
@@ -0,0 +1,151 @@
+"""
+Local store of the Open Doors company reviews.
+
+Company pages, the batched reviews endpoint and CompanyProfileSerializer read the
+reviews from CompanyReviewSummary with one query. A company without a summary yet
+is fetched from Open Doors once and stored. refresh_company_reviews_task refreshes
+the stored summaries in bulk, and the Open Doors webhook stores the reviews of a
+company as soon as one is submitted.
+"""
+import hashlib
+import hmac
+
+from django.conf import settings
+from django.utils import timezone
+
+from apps.company.models import CompanyProfile, CompanyReviewSummary
+from utils.company_utils import fetch_company_reviews
+from utils.fanout_utils import fan_out, FanOutCall
+from utils.logging_helper import get_logger
+
+logger = get_logger(__name__)
+
+REVIEW_FIELDS = ["reviews", "review_count", "average_rating", "refreshed_at"]
+REVIEW_FETCH_BATCH_SIZE = 50
+
+
+def is_valid_webhook_signature(body, signature):
+    """
+    Check the X-Open-Doors-Signature header of a webhook call.
+
+    Args:
+        body (bytes): Raw body of the request.
+        signature (str): The header, "sha256=" and the hex HMAC-SHA256 of the body keyed with OPEN_DOORS_WEBHOOK_SECRET.
+
+    Returns:
+        bool: Whether the body was signed with the secret. Always False when no secret is configured.
+    """
+    secret = getattr(settings, "OPEN_DOORS_WEBHOOK_SECRET", None)
+    if not secret or not signature:
+        return False
+    expected = hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+    return hmac.compare_digest(f"sha256={expected}", signature)
+
+
+def summarize_reviews(reviews):
+    """
+    Rating aggregates of a list of Open Doors reviews.
+
+    Returns:
+        tuple: Number of reviews, and the average of their numeric `rating`s or None when none has one.
+            (0, None) when the payload isn't a list of reviews.
+    """
+    if not isinstance(reviews, list):
+        return 0, None
+    ratings = [review["rating"] for review in reviews
+               if isinstance(review, dict) and isinstance(review.get("rating"), (int, float))]
+    return len(reviews), (sum(ratings) / len(ratings) if ratings else None)
+
+
+def store_company_reviews(reviews_by_company):
+    """
+    Create or replace the review summaries of the given companies.
+
+    Args:
+        reviews_by_company (dict): Mapping of company id to its reviews as returned by Open Doors,
+            stored as they are.
+    """
+    now = timezone.now()
+    summaries = []
+    for company_id, reviews in reviews_by_company.items():
+        review_count, average_rating = summarize_reviews(reviews)
+        summaries.append(CompanyReviewSummary(company_id=company_id, reviews=reviews, review_count=review_count,
+                                              average_rating=average_rating, refreshed_at=now))
+    if summaries:
+        CompanyReviewSummary.objects.bulk_create(summaries, update_conflicts=True, unique_fields=["company"],
+                                                 update_fields=REVIEW_FIELDS)
+
+
+def _service_auth_header():
+    token = getattr(settings, "OPEN_DOORS_SERVICE_TOKEN", None)
+    return f"Bearer {token}" if token else None
+
+
+def fetch_reviews(company_ids, auth_header=None, timeout=3):
+    """
+    Fetch the reviews of several companies from Open Doors concurrently.
+
+    Returns:
+        dict: Mapping of company id to its reviews, without the companies whose fetch failed.
+    """
+    fetched = fan_out({
+        company_id: FanOutCall(fetch_company_reviews, company_id, auth_header, timeout=timeout)
+        for company_id in company_ids
+    })
+    return {company_id: reviews for company_id, reviews in fetched.items() if reviews is not None}
+
+
+def get_company_reviews(company_ids, auth_header=None, timeout=3):
+    """
+    Get the reviews of several companies at once.
+
+    Stored summaries are read with one query, companies without one are fetched from
+    Open Doors concurrently and stored.
+
+    Args:
+        company_ids (Iterable[int]): Companies to get the reviews of.
+        auth_header (str, optional): Authorization header passed to Open Doors.
+        timeout (float): Seconds the fetches may take in total.
+
+    Returns:
+        dict: Mapping of company id to its reviews, an empty list for unknown companies
+            and those whose reviews could not be fetched.
+    """
+    company_ids = list(dict.fromkeys(company_ids))
+    stored = dict(CompanyProfile.objects.filter(id__in=company_ids).values_list("id", "review_summary__reviews"))
+    reviews = {company_id: stored.get(company_id) or [] for company_id in company_ids}
+
+    missing = [company_id for company_id in company_ids if company_id in stored and stored[company_id] is None]
+    if missing:
+        fetched = fetch_reviews(missing, auth_header, timeout=timeout)
+        store_company_reviews(fetched)
+        reviews.update(fetched)
+
+    return reviews
+
+
+def refresh_review_summaries(company_ids=None, batch_size=REVIEW_FETCH_BATCH_SIZE):
+    """
+    Refetch and store the reviews of the given companies.
+
+    Args:
+        company_ids (Iterable[int], optional): Companies to refresh, those with a stored summary by default.
+        batch_size (int): Companies fetched concurrently.
+
+    Returns:
+        dict: Counts of summaries refreshed and failed fetches, which keep their stored reviews.
+    """
+    if company_ids is None:
+        company_ids = CompanyReviewSummary.objects.order_by("refreshed_at").values_list("company_id", flat=True)
+    company_ids = list(company_ids)
+
+    stats = {"refreshed": 0, "errors": 0}
+    for start in range(0, len(company_ids), batch_size):
+        batch = company_ids[start:start + batch_size]
+        fetched = fetch_reviews(batch, _service_auth_header())
+        store_company_reviews(fetched)
+        stats["refreshed"] += len(fetched)
+        stats["errors"] += len(batch) - len(fetched)
+
+    logger.info(f"Company review summaries refreshed: {stats}")
+    return stats
@@ -1,6 +1,3 @@
-import os
-
-import requests
 from rest_framework import serializers
 
 from apps.company.models import (
@@ -11,6 +8,7 @@ from apps.company.models import (
     Roles,
     SalaryRange, Industries,
 )
+from apps.company.reviews import get_company_reviews
 from apps.core.models import CustomUser, UserProfile
 
 
@@ -132,15 +130,12 @@ class CompanyProfileSerializer(serializers.ModelSerializer):
         return JobSimpleSerializer(jobs, many=True).data
 
     def get_reviews(self, obj):
-        reviews_url = f'{os.getenv("OD_API_URL")}api/reviews/company/{obj.id}/'
-        try:
-            response = requests.get(reviews_url, timeout=3)  # Set a reasonable timeout
-            response.raise_for_status()
-            return response.json()
-        except requests.exceptions.RequestException as e:
-            # Handle exceptions or log them
-            print(f"error {str(e)}")
-            return []
+        # Views that already loaded the reviews of several companies pass them in
+        company_reviews = self.context.get("company_reviews", {})
+        if obj.id in company_reviews:
+            return company_reviews[obj.id]
+
+        return get_company_reviews([obj.id])[obj.id]
 
 
 class SalaryRangeSerializer(serializers.ModelSerializer):
@@ -202,6 +197,38 @@ class JobSerializer(serializers.ModelSerializer):
         ]
 
 
+class CompanyCardSerializer(serializers.ModelSerializer):
+    """
+    Compact company for job feeds. Reads only the company row and its prefetched
+    industries, no jobs and no reviews, which come from the company reviews endpoint.
+    """
+    industries = IndustriesSerializer(read_only=True, many=True)
+
+    class Meta:
+        model = CompanyProfile
+        fields = ("id", "company_name", "company_url", "logo", "logo_url", "company_size", "is_startup",
+                  "location", "city", "state", "industries")
+
+
+class JobFeedSerializer(JobSerializer):
+    """
+    JobSerializer for lists of jobs, with the parent company as a CompanyCardSerializer.
+
+    Load the jobs with setup_eager_loading so a page costs the same few queries
+    whatever its size.
+    """
+    parent_company = CompanyCardSerializer(read_only=True)
+
+    class Meta(JobSerializer.Meta):
+        pass
+
+    @staticmethod
+    def setup_eager_loading(queryset):
+        return queryset.select_related(
+            "role", "parent_company", "min_compensation", "max_compensation"
+        ).prefetch_related("department", "skills", "created_by", "parent_company__industries")
+
+
 class JobSimpleSerializer(serializers.ModelSerializer):
     department = DepartmentSerializer(many=True, read_only=True)
     skills = SkillSerializer(many=True, read_only=True)
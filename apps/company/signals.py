@@ -0,0 +1,48 @@
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete, m2m_changed
+from django.dispatch import receiver
+
+from .job_match_index import refresh_job_match_index, remove_from_job_match_index
+from .models import Job, Roles, Industries
+from .name_resolver import refresh_name_resolver
+
+
+@receiver(post_save, sender=Job)
+def refresh_job_match_index_on_save(sender, instance, **kwargs):
+    transaction.on_commit(lambda: refresh_job_match_index([instance.id]))
+
+
+@receiver(post_delete, sender=Job)
+def refresh_job_match_index_on_delete(sender, instance, **kwargs):
+    transaction.on_commit(lambda: remove_from_job_match_index([instance.id]))
+
+
+@receiver(m2m_changed, sender=Job.skills.through)
+@receiver(m2m_changed, sender=Job.nice_to_have_skills.through)
+@receiver(m2m_changed, sender=Job.department.through)
+def refresh_job_match_index_on_m2m_change(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ("post_add", "post_remove", "pre_clear"):
+        return
+
+    if not reverse:
+        job_ids = [instance.id]
+    elif action == "pre_clear":
+        # e.g. skill.job_set.clear(), collect the jobs before their rows are gone
+        related_field = next(
+            field.name for field in sender._meta.get_fields()
+            if field.is_relation and field.related_model is type(instance)
+        )
+        job_ids = list(sender.objects.filter(**{related_field: instance}).values_list("job_id", flat=True))
+    else:
+        job_ids = list(pk_set or ())
+
+    if job_ids:
+        transaction.on_commit(lambda: refresh_job_match_index(job_ids))
+
+
+@receiver(post_save, sender=Roles)
+@receiver(post_save, sender=Industries)
+@receiver(post_delete, sender=Roles)
+@receiver(post_delete, sender=Industries)
+def refresh_name_resolver_on_change(sender, **kwargs):
+    transaction.on_commit(lambda: refresh_name_resolver(sender))
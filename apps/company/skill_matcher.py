@@ -0,0 +1,87 @@
+"""
+Compiled skill and cert matcher for job descriptions.
+
+All Skill and Certs names are compiled once per run into a spaCy PhraseMatcher
+(a hash trie over lowercased tokens), so a description is scanned once no matter
+how many names there are, and multi-word names like "Machine Learning" match too.
+"""
+from bisect import bisect_right
+
+from spacy.matcher import PhraseMatcher
+
+SKILL_LABEL = "SKILL"
+CERT_LABEL = "CERT"
+SECTION_MARKERS = ("required skills", "preferred skills", "certifications")
+NICE_TO_HAVE_MARKERS = ("nice to have", "preferred")
+
+
+class SkillMatcher:
+    """
+    Args:
+        nlp (Language): The spaCy pipeline descriptions are parsed with.
+        skills (Iterable[str]): Canonical Skill names.
+        certs (Iterable[str]): Canonical Certs names.
+    """
+
+    def __init__(self, nlp, skills, certs):
+        self.matcher = PhraseMatcher(nlp.vocab, attr="LOWER")
+        self.canonical_names = {}
+
+        for label, names in ((SKILL_LABEL, skills), (CERT_LABEL, certs)):
+            names = [name for name in names if name and name.strip()]
+            patterns = []
+            for name, pattern in zip(names, nlp.tokenizer.pipe(names)):
+                key = (label, self._normalize(pattern))
+                # First name wins when names only differ by case
+                if key not in self.canonical_names:
+                    self.canonical_names[key] = name
+                    patterns.append(pattern)
+            self.matcher.add(label, patterns)
+
+        self.skill_label = nlp.vocab.strings[SKILL_LABEL]
+
+    @staticmethod
+    def _normalize(tokens):
+        # What the matcher compares, independent of the whitespace between tokens
+        return " ".join(token.lower_ for token in tokens)
+
+    @staticmethod
+    def _nice_to_have_lines(text):
+        """Start offsets of every line and whether that line lists nice to have skills."""
+        starts, nice_to_have = [], []
+        offset = 0
+        for line in text.split("\n"):
+            stripped = line.strip().lower()
+            is_section = stripped.startswith("•") or any(marker in stripped for marker in SECTION_MARKERS)
+            starts.append(offset)
+            nice_to_have.append(is_section and any(marker in stripped for marker in NICE_TO_HAVE_MARKERS))
+            offset += len(line) + 1
+        return starts, nice_to_have
+
+    def extract(self, doc):
+        """
+        Find every skill and cert in a parsed description in one pass.
+
+        A skill only mentioned on nice to have or preferred bullet lines is nice to
+        have, any other mention makes it required.
+
+        Args:
+            doc (Doc): The parsed description.
+
+        Returns:
+            tuple[list[str], list[str], list[str]]: Canonical names of the required skills,
+            nice to have skills and certs.
+        """
+        line_starts, nice_to_have_lines = self._nice_to_have_lines(doc.text)
+        required_skills, nice_to_have_skills, certs = set(), set(), set()
+
+        for match_id, start, end in self.matcher(doc):
+            span = doc[start:end]
+            if match_id == self.skill_label:
+                name = self.canonical_names[(SKILL_LABEL, self._normalize(span))]
+                line = bisect_right(line_starts, span.start_char) - 1
+                (nice_to_have_skills if nice_to_have_lines[line] else required_skills).add(name)
+            else:
+                certs.add(self.canonical_names[(CERT_LABEL, self._normalize(span))])
+
+        return sorted(required_skills), sorted(nice_to_have_skills - required_skills), sorted(certs)
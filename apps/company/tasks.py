@@ -1,27 +1,72 @@
 import logging
-from datetime import timedelta
 
-from django.utils import timezone
+from django.core.cache import cache
 
-from apps.company.models import Job
+from apps.company.job_expiration import expire_old_jobs
+from apps.company.job_matches import (
+    compute_job_matches,
+    job_matches_key,
+    DEFAULT_PAGE_SIZE,
+    JOB_MATCHES_PRECOMPUTED_PAGES,
+)
+from apps.company.job_recommendations import (
+    rebuild_job_recommendations,
+    refresh_changed_job_recommendations,
+    refresh_member_recommendations,
+)
+from apps.company.reviews import refresh_review_summaries
 from api.celery_config import app
 
 # Create a logger instance for the tasks
 logger = logging.getLogger(__name__)
 
+# A queued match computation isn't queued again for this long
+JOB_MATCHES_PENDING_TIMEOUT = 60 * 5
+
+
+@app.task
+def close_old_jobs(dry_run=False):
+    """Expire the active jobs posted more than JOB_EXPIRATION_DAYS ago."""
+    return expire_old_jobs(dry_run=dry_run)
+
+
+@app.task
+def refresh_company_reviews_task(company_ids=None):
+    """Refetch the Open Doors reviews of the given companies, or of every company with a stored summary."""
+    return refresh_review_summaries(company_ids)
+
+
+def queue_job_matches(user_id, page=1, page_size=DEFAULT_PAGE_SIZE):
+    """
+    Queue the computation of a member's matches, from the given page on.
+
+    Queued once per page and version of the matches until it runs or
+    JOB_MATCHES_PENDING_TIMEOUT passes, so repeated misses don't pile up tasks.
+    """
+    if cache.add(f"{job_matches_key(user_id, page, page_size)}_pending", True, JOB_MATCHES_PENDING_TIMEOUT):
+        compute_job_matches_task.delay(
+            user_id, list(range(page, page + JOB_MATCHES_PRECOMPUTED_PAGES)), page_size
+        )
+
+
+@app.task
+def compute_job_matches_task(user_id, pages, page_size=DEFAULT_PAGE_SIZE):
+    return compute_job_matches(user_id, pages, page_size)
+
+
+@app.task
+def rebuild_job_recommendations_task():
+    """Rescore the job recommendations of every active member."""
+    return rebuild_job_recommendations()
+
+
+@app.task
+def refresh_member_recommendations_task(user_ids):
+    """Rescore the job recommendations of the given members, e.g. after their profile changed."""
+    return refresh_member_recommendations(user_ids)
+
 
 @app.task
-def close_old_jobs():
-    three_months_ago = timezone.now() - timedelta(days=90)
-    jobs = Job.objects.filter(status="active", created_at__gte=three_months_ago)
-
-    if jobs:
-        print(f"We have {jobs.len} jobs that we'll expire today")
-        for job in jobs:
-            job.status = "job_expired"
-            print(
-                f"Marked {jobs.job_title} from {jobs.parent_company.company_name} as expired."
-            )
-        return True
-    else:
-        print(f"We don't have any jobs to expire today.")
+def refresh_changed_job_recommendations_task():
+    """Rescore the members affected by the jobs published, closed or edited since the last run."""
+    return refresh_changed_job_recommendations()
@@ -1,10 +1,13 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 from .views_jobs import JobViewSet
+from .views_jobs_match import JobMatchView
 
 router = DefaultRouter()
 router.register(r"jobs", JobViewSet, basename="jobs")
 
 urlpatterns = [
+    # Before the router, whose job detail route would take "recommendations" as a job id
+    path("new/jobs/recommendations/", JobMatchView.as_view(), name="job-recommendations"),
     path("new/", include(router.urls))
 ]
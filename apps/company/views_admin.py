@@ -8,9 +8,10 @@ from rest_framework.response import Response
 
 from utils.emails import send_dynamic_email
 from utils.helper import paginate_items, CustomPagination
+from utils.pagination_utils import KeysetPagination, is_keyset_request
 from utils.slack import post_message
 from .models import CompanyProfile, Department, Skill, Job
-from .serializers import JobReferralSerializer, JobSerializer
+from .serializers import JobReferralSerializer, JobSerializer, JobFeedSerializer
 from rest_framework.decorators import action
 
 from ..member.models import MemberProfile
@@ -265,17 +266,22 @@ class JobViewSet(viewsets.ViewSet):
         """
         Retrieve all job postings.
         """
-        # Initialize the paginator
-        paginator = CustomPagination()
+        # Initialize the paginators, infinite scroll clients ask for cursor pages, one cursor per list
+        if is_keyset_request(request, cursor_query_params=("cursor", "posted_cursor")):
+            paginator = KeysetPagination(ordering=("-created_at", "-id"))
+            posted_paginator = KeysetPagination(ordering=("-created_at", "-id"), cursor_query_param="posted_cursor")
+        else:
+            paginator = CustomPagination()
+            posted_paginator = CustomPagination()
 
         # Get and paginate all active jobs
-        all_active_jobs = Job.objects.all()
+        all_active_jobs = JobFeedSerializer.setup_eager_loading(Job.objects.all())
 
-        paginated_active_jobs = paginate_items(all_active_jobs, request, paginator, JobSerializer)
+        paginated_active_jobs = paginate_items(all_active_jobs, request, paginator, JobFeedSerializer)
 
         # Get and paginate jobs posted by the user
-        user_posted_jobs = Job.objects.filter(created_by=request.user)
-        paginated_posted_jobs = paginate_items(user_posted_jobs, request, paginator, JobSerializer)
+        user_posted_jobs = JobFeedSerializer.setup_eager_loading(Job.objects.filter(created_by=request.user))
+        paginated_posted_jobs = paginate_items(user_posted_jobs, request, posted_paginator, JobFeedSerializer)
 
         # Combine data from both queries
         data = {
@@ -326,7 +332,9 @@ class JobViewSet(viewsets.ViewSet):
             )
         ).order_by("-score")
 
-        matching_jobs_serialized = JobSerializer(matching_jobs, many=True).data
+        matching_jobs_serialized = JobFeedSerializer(
+            JobFeedSerializer.setup_eager_loading(matching_jobs), many=True
+        ).data
 
         # Render the results in a template
         return Response(
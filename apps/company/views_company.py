@@ -1,25 +1,38 @@
 import logging
 import os
 
-import requests
+from django.conf import settings
 from django.db import transaction
 from django.utils import timezone
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import status
 from rest_framework.decorators import action
 from rest_framework.pagination import PageNumberPagination
-from rest_framework.permissions import IsAdminUser
+from rest_framework.permissions import AllowAny, IsAdminUser
 from rest_framework.response import Response
 from rest_framework.viewsets import ViewSet
 
 from apps.company.filters import CompanyProfileFilter
 from apps.company.models import CompanyProfile, Job
+from apps.company.reviews import get_company_reviews, is_valid_webhook_signature, store_company_reviews
+from apps.company.tasks import refresh_company_reviews_task
 from apps.company.serializers import CompanyProfileSerializer, JobSimpleSerializer
-from utils.company_utils import pull_company_info
+from utils.company_utils import pull_company_info, fetch_company_reviews, fetch_talent_choice_details
+from utils.fanout_utils import fan_out, FanOutCall
+from utils.pagination_utils import KeysetPagination, is_keyset_request
 
 logger = logging.getLogger(__name__)
 
 REVIEWS_URL = os.getenv("OD_API_URL")
+COMPANY_ENRICHMENT_TIMEOUT = getattr(settings, "COMPANY_ENRICHMENT_TIMEOUT", 8)
+COMPANY_REVIEWS_TIMEOUT = getattr(settings, "COMPANY_REVIEWS_TIMEOUT", 3)
+TALENT_CHOICE_TIMEOUT = getattr(settings, "TALENT_CHOICE_TIMEOUT", 5)
+COMPANY_REVIEWS_BATCH_LIMIT = 50
+
+
+def _pull_company_info_by_id(company_id):
+    """Enrich a company from its own copy of the row, the fan-out thread may outlive its deadline."""
+    return pull_company_info(CompanyProfile.objects.get(id=company_id))
 
 
 class CompanyView(ViewSet):
@@ -29,9 +42,8 @@ class CompanyView(ViewSet):
         This view returns a single company profile
         identified by the `company_id` passed in the URL.
         """
-        talent_choice_jobs = {}
         try:
-            company_data = CompanyProfile.objects.get(id=pk)
+            company_data = CompanyProfile.objects.select_related("review_summary").get(id=pk)
 
         except CompanyProfile.DoesNotExist:
             return Response(
@@ -39,57 +51,43 @@ class CompanyView(ViewSet):
                 status=status.HTTP_404_NOT_FOUND
             )
 
+        # Call every upstream at once so the slowest one bounds the latency, not their sum
+        header_token = request.headers.get("Authorization", None)
+        calls = {}
+        # Reviews come from the local summary, Open Doors is only called for a company without one yet
+        review_summary = getattr(company_data, "review_summary", None)
+        if review_summary is None:
+            calls["reviews"] = FanOutCall(fetch_company_reviews, company_data.id, header_token,
+                                          timeout=COMPANY_REVIEWS_TIMEOUT)
         # Pull missing company data if not saved
         if not company_data.mission:
-            updated = pull_company_info(company_data)
-            if updated:
+            calls["enrichment"] = FanOutCall(_pull_company_info_by_id, company_data.id, default=False,
+                                             timeout=COMPANY_ENRICHMENT_TIMEOUT)
+        # Make an external request to get talent choice data
+        if company_data.talent_choice_account:
+            calls["talent_choice"] = FanOutCall(fetch_talent_choice_details, pk, default={},
+                                                timeout=TALENT_CHOICE_TIMEOUT)
+        results = fan_out(calls)
+
+        if "enrichment" in calls:
+            if results["enrichment"]:
                 company_data.refresh_from_db()
             else:
                 logger.warning(f"Failed to update company info for company ID: {pk}")
 
-        serializer_data = CompanyProfileSerializer(company_data).data
+        if review_summary is not None:
+            reviews = review_summary.reviews
+        elif results["reviews"] is not None:
+            reviews = results["reviews"]
+            store_company_reviews({company_data.id: reviews})
+        else:
+            reviews = []
+        talent_choice_jobs = results.get("talent_choice", {})
+        serializer_data = CompanyProfileSerializer(
+            company_data, context={"company_reviews": {company_data.id: reviews}}
+        ).data
         job_list = Job.objects.filter(parent_company=pk, status="active")
         serializer_job_list = JobSimpleSerializer(job_list, many=True).data
-        # Make an external request to get company reviews
-        header_token = request.headers.get("Authorization", None)
-        try:
-            response = requests.get(f'{os.getenv("OD_API_URL")}api/reviews/company/{pk}/',
-                                    headers={'Authorization': header_token}, verify=False)
-            print(f"Status Code: {response.status_code}")
-            print(f"Response Content: {response.content}")
-            response.raise_for_status()
-            reviews = response.json()
-        except requests.exceptions.HTTPError as http_err:
-            reviews = []
-            print("HTTP error occurred", http_err)
-            # return Response(
-            #     {"status": False, "error": f"Could not pull company info for company ID: {pk}"},
-            #     status=status.HTTP_400_BAD_REQUEST
-            # )
-        except Exception as e:
-            reviews = []
-            print(f"Exception occurred: {e}")
-            # return Response(
-            #     {"status": False, "error": f"An unexpected error occurred: {e}"},
-            #     status=status.HTTP_500_INTERNAL_SERVER_ERROR
-            # )
-        # Make an external request to get talent choice data
-        if company_data.talent_choice_account:
-            try:
-                response = requests.get(f'{os.environ["TC_API_URL"]}core/api/company/details/?company_id={pk}',
-                                        verify=False)
-                response.raise_for_status()
-                talent_choice_jobs = response.json()
-            except requests.exceptions.HTTPError as http_err:
-                return Response(
-                    {"status": False, "error": f"HTTP error occurred: {http_err}"},
-                    status=status.HTTP_500_INTERNAL_SERVER_ERROR
-                )
-            except Exception as e:
-                return Response(
-                    {"status": False, "error": f"An unexpected error occurred: {e}"},
-                    status=status.HTTP_500_INTERNAL_SERVER_ERROR
-                )
 
         # Return response with company profile data and reviews
         return Response(
@@ -103,6 +101,58 @@ class CompanyView(ViewSet):
             status=status.HTTP_200_OK
         )
 
+    @action(detail=False, methods=["get"], url_path="reviews")
+    def reviews(self, request):
+        """
+        Return the reviews of up to COMPANY_REVIEWS_BATCH_LIMIT companies given as ?ids=1,2,3.
+
+        Job feeds only carry compact company cards, clients load the reviews of the
+        companies on screen with one call here.
+        """
+        try:
+            company_ids = [int(company_id) for company_id in request.query_params.get("ids", "").split(",")
+                           if company_id.strip()]
+        except ValueError:
+            return Response({"status": False, "error": "ids must be a comma separated list of company ids."},
+                            status=status.HTTP_400_BAD_REQUEST)
+        if not company_ids or len(company_ids) > COMPANY_REVIEWS_BATCH_LIMIT:
+            return Response({"status": False,
+                             "error": f"Pass between 1 and {COMPANY_REVIEWS_BATCH_LIMIT} company ids."},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        reviews = get_company_reviews(company_ids, request.headers.get("Authorization", None),
+                                      timeout=COMPANY_REVIEWS_TIMEOUT)
+        return Response({"status": True, "reviews": {str(company_id): company_reviews
+                                                     for company_id, company_reviews in reviews.items()}})
+
+    @action(detail=False, methods=["post"], url_path="reviews/webhook", permission_classes=[AllowAny],
+            authentication_classes=[])
+    def reviews_webhook(self, request):
+        """
+        Called by Open Doors when a review is submitted, with {"company_id": 1, "reviews": [...]}.
+
+        The body is signed with OPEN_DOORS_WEBHOOK_SECRET in the X-Open-Doors-Signature
+        header. The reviews replace the stored ones, when they're left out they're
+        refetched in the background.
+        """
+        if not is_valid_webhook_signature(request.body, request.headers.get("X-Open-Doors-Signature")):
+            return Response({"status": False, "error": "Invalid signature."}, status=status.HTTP_403_FORBIDDEN)
+
+        try:
+            company_id = int(request.data.get("company_id"))
+        except (TypeError, ValueError):
+            return Response({"status": False, "error": "company_id must be an integer."},
+                            status=status.HTTP_400_BAD_REQUEST)
+        if not CompanyProfile.objects.filter(id=company_id).exists():
+            return Response({"status": False, "error": "Company not found."}, status=status.HTTP_404_NOT_FOUND)
+
+        reviews = request.data.get("reviews")
+        if isinstance(reviews, list):
+            store_company_reviews({company_id: reviews})
+        else:
+            transaction.on_commit(lambda: refresh_company_reviews_task.delay([company_id]))
+        return Response({"status": True}, status=status.HTTP_202_ACCEPTED)
+
     def get_name(self, request, pk=None):
         """
         This view returns a single company profile
@@ -134,9 +184,13 @@ class CompanyView(ViewSet):
         """
         This view returns a paginated and filterable list of all company profiles.
         """
-        paginator = PageNumberPagination()
-        paginator.page_size = request.query_params.get('page_size', 10)
-        paginator.page_size_query_param = 'page_size'
+        if is_keyset_request(request):
+            # Cursor pages for infinite scroll, no COUNT or OFFSET
+            paginator = KeysetPagination(ordering=("created_at", "id"))
+        else:
+            paginator = PageNumberPagination()
+            paginator.page_size = request.query_params.get('page_size', 10)
+            paginator.page_size_query_param = 'page_size'
 
         try:
             company_data = CompanyProfile.active_objects.all()
@@ -150,7 +204,12 @@ class CompanyView(ViewSet):
                                     status=status.HTTP_404_NOT_FOUND)
 
                 result_page = paginator.paginate_queryset(filtered_data.qs, request)
-                serializer = CompanyProfileSerializer(result_page, many=True, context={'request': request})
+                company_reviews = get_company_reviews([company.id for company in result_page],
+                                                      request.headers.get("Authorization", None),
+                                                      timeout=COMPANY_REVIEWS_TIMEOUT)
+                serializer = CompanyProfileSerializer(
+                    result_page, many=True, context={'request': request, 'company_reviews': company_reviews}
+                )
                 return paginator.get_paginated_response(serializer.data)
             else:
                 return Response({"status": False, "error": "No companies found."},
@@ -1,13 +1,7 @@
-import json
 import logging
-import operator
 import os
-from functools import reduce
 
-import requests
 from django.core.cache import cache
-from django.core.paginator import Paginator
-from django.db.models import Q, Count
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.pagination import PageNumberPagination
@@ -15,8 +9,12 @@ from rest_framework.response import Response
 
 from utils.emails import send_dynamic_email
 from utils.slack import post_message
+from .job_match_index import job_match_index
+from .job_matches import filter_and_paginate_jobs, get_job_matches
+from .job_recommendations import get_recommended_jobs
 from .models import CompanyProfile, Department, Skill, Job
-from .serializers import JobReferralSerializer, JobSerializer
+from .serializers import JobReferralSerializer, JobSerializer, JobFeedSerializer
+from .tasks import queue_job_matches
 from ..core.serializers_member import FullTalentProfileSerializer
 from ..member.models import MemberProfile
 
@@ -31,50 +29,6 @@ class JobPagination(PageNumberPagination):
     max_page_size = 15
 
 
-def filter_and_paginate_jobs(user_profile, talent_profile, page=1, page_size=15):
-    """
-    Filter jobs based on user profile and paginate the results.
-    """
-    department = talent_profile.data["department"]
-    role = talent_profile.data["role"]
-    tech_journey = talent_profile.data["tech_journey"]
-    skills = talent_profile.data["skills"]
-
-    # Check if all profile data is empty or None
-    if not any([department, role, tech_journey, skills]):
-        logger.info("User profile is empty, cannot filter by jobs")
-        return None, None, "No profile data provided"
-
-    # Build the filter conditions
-    filter_conditions = []
-
-    if department:
-        filter_conditions.append(Q(department=department[0]))
-    if role:
-        filter_conditions.append(Q(role=role[0]))
-    if tech_journey:
-        filter_conditions.append(Q(level=tech_journey))
-    if skills:
-        filter_conditions.append(Q(skills__id__in=skills) |
-                                 Q(nice_to_have_skills__id__in=skills))
-
-    # Combine all conditions with OR
-    combined_filter = reduce(operator.or_, filter_conditions) if filter_conditions else Q()
-
-    # Apply the filter to the queryset
-    filtered_jobs = Job.objects.filter(status="active").filter(combined_filter).select_related(
-        'parent_company', 'role'
-    ).distinct().only(
-        "id", "parent_company", "role", "department", "min_compensation", "max_compensation", "location"
-    )
-
-    # Paginate the results
-    paginator = Paginator(filtered_jobs.order_by('id'), page_size)
-    current_page = paginator.page(page)
-
-    return current_page, paginator
-
-
 class JobViewSet(viewsets.ViewSet):
     @action(detail=False, methods=["post"], url_path="create-referral")
     def create_job_referral(self, request):
@@ -357,8 +311,6 @@ class JobViewSet(viewsets.ViewSet):
         """
         logger.info("Starting get_all_jobs function")
 
-        url = f"{os.getenv('IT_API_URL')}api/v1/matches/jobs/"
-        header_token = request.headers.get("Authorization", None)
         page = int(request.query_params.get('page', 1))
         page_size = int(request.query_params.get('page_size', 15))
 
@@ -370,8 +322,8 @@ class JobViewSet(viewsets.ViewSet):
             return Response({"error": "User profile not found"}, status=status.HTTP_404_NOT_FOUND)
 
         print("Pulling jobs you created")
-        user_posted_jobs = Job.objects.filter(created_by=request.user)
-        user_posted_jobs_serializer = JobSerializer(user_posted_jobs, many=True)
+        user_posted_jobs = JobFeedSerializer.setup_eager_loading(Job.objects.filter(created_by=request.user))
+        user_posted_jobs_serializer = JobFeedSerializer(user_posted_jobs, many=True)
         print("DONE: Pulling jobs you created")
 
         print("Pulling talent profile")
@@ -382,46 +334,14 @@ class JobViewSet(viewsets.ViewSet):
             return Response(data={"status": False, "error": True,
                                   "message": "We can't do a job match. Please update your profile to view jobs for you."},
                             status=status.HTTP_200_OK)
-        filtered_jobs_serializer = JobSerializer(current_page, many=True)
-
-        cache_key = f"job_matches_{request.user.id}"
-        cached_data = cache.get(cache_key)
-        print(f"cached data {cache_key}")
 
-        if cached_data:
-            logger.info(f"Cache hit for user {request.user.id}. Using cached job matches.")
-            filtered_jobs_list = cached_data
-        else:
-            data_dump = {
-                "user_profile": serializer.data,
-                "department": serializer.data["department"],
-                "user_role": serializer.data["role"],
-                "user_level": serializer.data["tech_journey"],
-                "user_skills": serializer.data["skills"],
-                "header_token": header_token,
-                "filtered_jobs": filtered_jobs_serializer.data,
-                "page": page,
-                "total_pages": paginator.num_pages,
-            }
-
-            try:
-                logger.info(f"Sending POST request to {url}")
-                response = requests.post(
-                    url,
-                    data=json.dumps(data_dump),
-                    headers={'Content-Type': 'application/json'},
-                )
-                response.raise_for_status()  # Raises an HTTPError for bad responses
-
-                response_json = response.json()
-                logger.info(f"Received response with {len(response_json)} jobs")
-
-                filtered_jobs_list = response_json
-                # Cache the result
-                cache.set(cache_key, filtered_jobs_list, timeout=3600)  # Cache for 1 hour
-            except requests.exceptions.RequestException as error:
-                logger.error(f"Error in API request: {error}")
-                return Response({"message": "API request error"}, status=status.HTTP_400_BAD_REQUEST)
+        # Talent Choice rankings are computed off the request path, serve the local ranking until they're ready
+        filtered_jobs_list = get_job_matches(request.user.id, page, page_size)
+        matches_pending = filtered_jobs_list is None
+        if matches_pending:
+            logger.info(f"No precomputed job matches for user {request.user.id} page {page}, queueing them")
+            queue_job_matches(request.user.id, page, page_size)
+            filtered_jobs_list = JobFeedSerializer(current_page, many=True).data
 
         if len(filtered_jobs_list) > 0:
             data = {
@@ -431,6 +351,7 @@ class JobViewSet(viewsets.ViewSet):
                 "total_pages": paginator.num_pages,
                 "has_next": current_page.has_next(),
                 "has_previous": current_page.has_previous(),
+                "matches_pending": matches_pending,
                 "status": True
             }
             return Response(data)
@@ -443,6 +364,7 @@ class JobViewSet(viewsets.ViewSet):
                 "total_pages": paginator.num_pages,
                 "has_next": current_page.has_next(),
                 "has_previous": current_page.has_previous(),
+                "matches_pending": matches_pending,
                 "status": False
             }
 
@@ -464,8 +386,13 @@ class JobViewSet(viewsets.ViewSet):
         except MemberProfile.DoesNotExist:
             return Response({"error": "User profile not found"}, status=status.HTTP_404_NOT_FOUND)
 
-        current_page, paginator = filter_and_paginate_jobs(user_profile, page, page_size)
-        filtered_jobs_serializer = JobSerializer(current_page, many=True)
+        current_page, paginator = filter_and_paginate_jobs(
+            user_profile, FullTalentProfileSerializer(user_profile), page, page_size
+        )
+        if not current_page:
+            return Response({"error": "Please update your profile to view jobs for you."},
+                            status=status.HTTP_400_BAD_REQUEST)
+        filtered_jobs_serializer = JobFeedSerializer(current_page, many=True)
 
         data = {
             "jobs": filtered_jobs_serializer.data,
@@ -497,11 +424,15 @@ class JobViewSet(viewsets.ViewSet):
                 logger.info(f"Cache hit for user {user_id}")
                 return Response(cached_result, status=status.HTTP_200_OK)
 
-            talent_profile = MemberProfile.objects.select_related('user').prefetch_related(
-                'skills', 'role', 'department'
-            ).get(user_id=user_id)
-
-            matching_job = self._find_best_match(talent_profile)
+            # Precomputed by apps/company/job_recommendations.py, scored here for members without any yet
+            recommended_jobs = get_recommended_jobs(user_id, limit=1)
+            if recommended_jobs:
+                matching_job = recommended_jobs[0]
+            else:
+                talent_profile = MemberProfile.objects.select_related('user').prefetch_related(
+                    'skills', 'role', 'department'
+                ).get(user_id=user_id)
+                matching_job = self._find_best_match(talent_profile)
 
             if matching_job:
                 result = {
@@ -541,18 +472,13 @@ class JobViewSet(viewsets.ViewSet):
         Returns:
             Job: The best matching job or None if no match is found.
         """
-        talent_skills = talent_profile.skills.values_list('id', flat=True)
-        talent_roles = talent_profile.role.values_list('id', flat=True)
-        talent_departments = talent_profile.department.values_list('id', flat=True)
-
-        return Job.objects.filter(status='active').annotate(
-            score=(
-                    Count('skills', filter=Q(skills__in=talent_skills)) +
-                    Count('role', filter=Q(role__in=talent_roles)) +
-                    Count('department', filter=Q(department__in=talent_departments))
-            )
-        ).filter(
-            Q(skills__in=talent_skills) |
-            Q(role__in=talent_roles) |
-            Q(department__in=talent_departments)
-        ).order_by('-score').first()
+        scored_jobs = job_match_index.score(
+            skill_ids=[skill.id for skill in talent_profile.skills.all()],
+            role_ids=[role.id for role in talent_profile.role.all()],
+            department_ids=[department.id for department in talent_profile.department.all()],
+        )
+
+        # The index can briefly lag bulk status updates, skip anything no longer active
+        top_job_ids = [job_id for job_id, _ in scored_jobs[:10]]
+        jobs_by_id = Job.objects.filter(id__in=top_job_ids, status='active').in_bulk()
+        return next((jobs_by_id[job_id] for job_id in top_job_ids if job_id in jobs_by_id), None)
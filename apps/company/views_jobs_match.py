@@ -1,30 +1,32 @@
-from rest_framework.response import Response
 from rest_framework import status
-from django.views import View
-from rest_framework.decorators import action
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from apps.company.job_recommendations import get_recommended_jobs, JOB_RECOMMENDATIONS_PER_MEMBER
+from apps.company.models import Job
+from apps.company.serializers import JobFeedSerializer
 
-from apps.company.models import Job, CompanyProfile, Skill, Roles
-from apps.member.models import MemberProfile
 
+class JobMatchView(APIView):
+    query_budget = {"GET": 6}
 
-class JobMatchView(View):
     def get(self, request, *args, **kwargs):
-        # Get the MemberProfile instance
-        print(f"Headers: {request.headers}")
-        talent_profile = MemberProfile.objects.get(user=request.user.id)
+        """
+        Return the best matching active jobs of the member, best first, up to ?limit=.
 
-        # Extract skills, roles, and departments
-        talent_skills = talent_profile.skills.all()
-        talent_roles = talent_profile.role.all()
-        talent_departments = talent_profile.department.all()
+        Jobs come from the precomputed recommendations, each with its match score and
+        the skills, departments, role and level it matched on.
+        """
+        try:
+            limit = max(1, min(int(request.query_params.get("limit", 10)), JOB_RECOMMENDATIONS_PER_MEMBER))
+        except ValueError:
+            return Response({"status": False, "error": "limit must be a number."}, status=status.HTTP_400_BAD_REQUEST)
 
-        # Filter Job instances based on the MemberProfile's preferences
-        matching_jobs = Job.objects.filter(
-            skills__in=talent_skills,
-            role__in=talent_roles,
-            department__in=talent_departments,
-        ).distinct()
+        jobs = get_recommended_jobs(request.user.id, limit=limit,
+                                    jobs=JobFeedSerializer.setup_eager_loading(Job.objects.all()))
+        jobs_data = JobFeedSerializer(jobs, many=True).data
+        for job, job_data in zip(jobs, jobs_data):
+            job_data["score"] = job.recommendation_score
+            job_data["reasons"] = job.recommendation_reasons
 
-        return Response(
-            {"status": True, "jobs": matching_jobs}, status=status.HTTP_200_OK
-        )
+        return Response({"status": True, "jobs": jobs_data}, status=status.HTTP_200_OK)
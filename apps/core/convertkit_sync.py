@@ -0,0 +1,251 @@
+"""
+Bulk ConvertKit tag sync.
+
+The tags every member should have are computed for all users with one query per
+tag source instead of one task per user. They are diffed against a snapshot of
+the tags ConvertKit already has, read once by paging through each tag's
+subscriptions and kept per email in the cache. Only the differences are pushed.
+
+Every rebuild writes a new generation of the snapshot, so emails ConvertKit no
+longer lists under any tag read as having none, whatever an earlier generation held.
+"""
+import hashlib
+
+from django.core.cache import cache
+
+from apps.core.models import CustomUser, UserProfile, EmailTags
+from apps.member.models import MemberProfile
+from utils.cache_utils import bump_cache_version
+from utils.convertkit_service import ConvertKitService
+from utils.logging_helper import get_logger
+
+logger = get_logger(__name__)
+
+MANAGED_TAG_CATEGORIES = [
+    'identity',
+    'notification',
+    'skill',
+    'department',
+    'role'
+]
+MEMBER_TAG_FIELDS = ['skills', 'role', 'department']
+IDENTITY_TAG_FIELDS = [
+    'identity_sexuality',
+    'identity_gender',
+    'identity_ethic',
+    'identity_pronouns',
+]
+NOTIFICATION_TAG_FIELDS = [
+    'marketing_monthly_newsletter',
+    'marketing_events',
+    'marketing_jobs',
+    'marketing_org_updates',
+    'marketing_identity_based_programing',
+]
+# UserProfile field -> tag added when it is set
+FLAG_TAGS = {
+    'disability': 'Disability',
+    'care_giver': 'Caregiver',
+    'veteran_status': 'Veteran',
+}
+
+TAG_SNAPSHOT_CACHE_NAMESPACE = "convertkit_tag_snapshot"
+# Holds the generation of the last complete snapshot
+TAG_SNAPSHOT_COMPLETE_KEY = "convertkit_tag_snapshot_complete"
+TAG_SNAPSHOT_TIMEOUT = 60 * 60 * 24
+
+
+def get_managed_tags():
+    return set(EmailTags.objects.filter(type__in=MANAGED_TAG_CATEGORIES).values_list('name', flat=True))
+
+
+def get_tag_ids():
+    """Map of lowercased tag name to ConvertKit tag id, oldest tag first like name__iexact=...first()."""
+    tag_ids = {}
+    for name, tag_id in EmailTags.objects.order_by('-id').values_list('name', 'convert_tag_kit_id'):
+        tag_ids[name.lower()] = tag_id
+    return tag_ids
+
+
+def _related_names(owner, field_name, user_ids):
+    """(user_id, related name) rows of one of owner's M2M fields."""
+    through = getattr(owner, field_name).through
+    owner_field = next(field.name for field in through._meta.get_fields()
+                       if field.is_relation and field.related_model is owner)
+    related_field = next(field.name for field in through._meta.get_fields()
+                         if field.is_relation and field.related_model is not owner)
+    rows = through.objects.all()
+    if user_ids is not None:
+        rows = rows.filter(**{f'{owner_field}__user_id__in': user_ids})
+    return rows.values_list(f'{owner_field}__user_id', f'{related_field}__name')
+
+
+def get_desired_tags(user_ids=None, managed_tags=None):
+    """
+    Compute the tags each user should have, with one query per tag source.
+
+    Only users with both a UserProfile and a MemberProfile get tags.
+
+    Args:
+        user_ids (list[int], optional): Users to compute the tags of, all users by default.
+        managed_tags (set[str], optional): Names of the managed tags, loaded when not given.
+
+    Returns:
+        dict: Mapping of user id to the set of tag names the user should have.
+    """
+    if managed_tags is None:
+        managed_tags = get_managed_tags()
+
+    profiles = UserProfile.objects.filter(
+        user_id__in=MemberProfile.objects.values('user_id')
+    ).values_list('user_id', *FLAG_TAGS, *NOTIFICATION_TAG_FIELDS)
+    if user_ids is not None:
+        profiles = profiles.filter(user_id__in=user_ids)
+
+    desired = {}
+    for user_id, *values in profiles:
+        flags = dict(zip(list(FLAG_TAGS) + NOTIFICATION_TAG_FIELDS, values))
+        tags = desired[user_id] = set()
+        tags.update(tag for field, tag in FLAG_TAGS.items() if flags[field])
+        tags.update(field for field in NOTIFICATION_TAG_FIELDS if flags[field])
+
+    sources = [(MemberProfile, field) for field in MEMBER_TAG_FIELDS]
+    sources += [(UserProfile, field) for field in IDENTITY_TAG_FIELDS]
+    for owner, field_name in sources:
+        for user_id, name in _related_names(owner, field_name, user_ids):
+            if user_id in desired and name in managed_tags:
+                desired[user_id].add(name)
+
+    return desired
+
+
+def _snapshot_key(email, generation):
+    return f"convertkit_tags_{hashlib.md5(email.lower().encode()).hexdigest()}_v{generation}"
+
+
+def save_subscriber_tags(email, tags):
+    """Record the tags a subscriber has in ConvertKit in the current snapshot, if there is one."""
+    generation = cache.get(TAG_SNAPSHOT_COMPLETE_KEY)
+    if generation is not None:
+        cache.set(_snapshot_key(email, generation), set(tags), TAG_SNAPSHOT_TIMEOUT)
+
+
+def load_subscriber_tags(emails):
+    """
+    Get the snapshot of the tags of the given subscribers.
+
+    Returns:
+        dict | None: Mapping of email to its set of tag names, or None without a complete snapshot.
+    """
+    generation = cache.get(TAG_SNAPSHOT_COMPLETE_KEY)
+    if generation is None:
+        return None
+    keys = {_snapshot_key(email, generation): email for email in emails}
+    cached = cache.get_many(list(keys))
+    # Subscribers missing from a complete snapshot have none of the snapshot's tags
+    return {email: cached.get(key, set()) for key, email in keys.items()}
+
+
+def rebuild_tag_snapshot(convertkit_service, tag_names):
+    """
+    Read which subscribers have each of the given tags from ConvertKit.
+
+    Args:
+        convertkit_service (ConvertKitService): Client used for the calls.
+        tag_names (dict): Mapping of ConvertKit tag id to tag name.
+
+    Returns:
+        int: Number of subscribers holding at least one of the tags.
+    """
+    generation = bump_cache_version(TAG_SNAPSHOT_CACHE_NAMESPACE, "all")
+    snapshot = {}
+    for tag_id, tag_name in tag_names.items():
+        for email in convertkit_service.list_tag_subscriber_emails(tag_id):
+            snapshot.setdefault(email.lower(), set()).add(tag_name)
+
+    cache.set_many({_snapshot_key(email, generation): tags for email, tags in snapshot.items()},
+                   TAG_SNAPSHOT_TIMEOUT)
+    # Readers switch to the new generation only once it is complete
+    cache.set(TAG_SNAPSHOT_COMPLETE_KEY, generation, TAG_SNAPSHOT_TIMEOUT)
+    logger.info(f"Rebuilt ConvertKit tag snapshot of {len(tag_names)} tags and {len(snapshot)} subscribers")
+    return len(snapshot)
+
+
+def diff_tags(desired, current, managed_tags, tag_ids):
+    """
+    Work out the tag changes a subscriber needs.
+
+    Returns:
+        tuple[set, set]: Names of the tags to add and to remove.
+    """
+    removable = managed_tags | set(NOTIFICATION_TAG_FIELDS)
+    add_tags = {tag for tag in desired - current if tag.lower() in tag_ids}
+    remove_tags = {tag for tag in (current & removable) - desired if tag.lower() in tag_ids}
+    return add_tags, remove_tags
+
+
+def sync_all_convertkit_tags(refresh_snapshot=False, dry_run=False, convertkit_service=None):
+    """
+    Bring the ConvertKit tags of every member in line with their profiles.
+
+    Args:
+        refresh_snapshot (bool): Re-read the tags from ConvertKit even if a snapshot is cached.
+        dry_run (bool): Only count the changes, don't push them.
+        convertkit_service (ConvertKitService, optional): Client to use.
+
+    Returns:
+        dict: Counts of users updated, tags added and removed, and failed calls.
+    """
+    convertkit_service = convertkit_service or ConvertKitService()
+    managed_tags = get_managed_tags()
+    tag_ids = get_tag_ids()
+
+    # Every tag a sync may add or remove, as it is named in EmailTags
+    synced_tags = managed_tags | set(NOTIFICATION_TAG_FIELDS) | set(FLAG_TAGS.values())
+    tag_names = {tag_ids[tag.lower()]: tag for tag in synced_tags if tag.lower() in tag_ids}
+
+    desired_tags = get_desired_tags(managed_tags=managed_tags)
+    emails = dict(CustomUser.objects.filter(id__in=list(desired_tags)).values_list('id', 'email'))
+
+    current_tags = None if refresh_snapshot else load_subscriber_tags(emails.values())
+    if current_tags is None:
+        rebuild_tag_snapshot(convertkit_service, tag_names)
+        current_tags = load_subscriber_tags(emails.values())
+
+    stats = {'users_updated': 0, 'tags_added': 0, 'tags_removed': 0, 'errors': 0}
+    for user_id, desired in desired_tags.items():
+        email = emails[user_id]
+        current = current_tags.get(email, set())
+        add_tags, remove_tags = diff_tags(desired, current, managed_tags, tag_ids)
+        if not add_tags and not remove_tags:
+            continue
+
+        stats['users_updated'] += 1
+        if dry_run:
+            stats['tags_added'] += len(add_tags)
+            stats['tags_removed'] += len(remove_tags)
+            continue
+
+        tags = set(current)
+        for tag in add_tags:
+            try:
+                convertkit_service.add_tag(email, tag_ids[tag.lower()])
+            except Exception as e:
+                stats['errors'] += 1
+                logger.error(f"Error adding tag {tag} for user {user_id}: {str(e)}")
+                continue
+            stats['tags_added'] += 1
+            tags.add(tag)
+        for tag in remove_tags:
+            try:
+                convertkit_service.remove_tag(email, tag_ids[tag.lower()])
+            except Exception as e:
+                stats['errors'] += 1
+                logger.error(f"Error removing tag {tag} for user {user_id}: {str(e)}")
+                continue
+            stats['tags_removed'] += 1
+            tags.discard(tag)
+        save_subscriber_tags(email, tags)
+
+    logger.info(f"ConvertKit tag sync finished: {stats}")
+    return stats
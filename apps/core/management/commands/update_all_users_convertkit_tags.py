@@ -1,5 +1,6 @@
 from django.core.management.base import BaseCommand
 
+from apps.core.convertkit_sync import sync_all_convertkit_tags
 from apps.core.models import CustomUser
 from apps.core.tasks import update_convertkit_tags_task
 
@@ -7,7 +8,23 @@ from apps.core.tasks import update_convertkit_tags_task
 class Command(BaseCommand):
     help = 'Queue ConvertKit tag updates for all users'
 
+    def add_arguments(self, parser):
+        parser.add_argument('--batch', action='store_true',
+                            help='Sync every user in this process, pushing only the tags that changed')
+        parser.add_argument('--refresh-snapshot', action='store_true',
+                            help='With --batch, re-read the current tags from ConvertKit instead of the cache')
+        parser.add_argument('--dry-run', action='store_true', help='With --batch, only report the changes')
+
     def handle(self, *args, **options):
+        if options['batch']:
+            stats = sync_all_convertkit_tags(refresh_snapshot=options['refresh_snapshot'],
+                                             dry_run=options['dry_run'])
+            self.stdout.write(self.style.SUCCESS(
+                f"Synced ConvertKit tags: {stats['users_updated']} users updated, {stats['tags_added']} tags added, "
+                f"{stats['tags_removed']} tags removed, {stats['errors']} errors"
+            ))
+            return
+
         users = CustomUser.objects.all()
         total_users = users.count()
 
@@ -0,0 +1,143 @@
+import json
+import re
+import time
+from collections import Counter
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+
+from utils.logging_helper import get_logger
+
+logger = get_logger(__name__)
+
+# Collapse "IN (%s, %s, ...)" so lookups of different sizes share a fingerprint
+_IN_LIST = re.compile(r'\bIN \((?:%s|\?)(?:, (?:%s|\?))*\)', re.IGNORECASE)
+_LITERAL = re.compile(r"'[^']*'|\b\d+\b")
+_WHITESPACE = re.compile(r'\s+')
+
+
+class QueryBudgetExceeded(Exception):
+    pass
+
+
+def query_budget(max_queries):
+    """
+    Declare how many queries a view may run per request.
+
+    Works on function views, including @api_view ones when applied above it. Class
+    based views set a `query_budget` attribute instead.
+
+    Args:
+        max_queries (int | dict): Most queries a request to the view may run, or a
+            {method: max_queries} dict to only budget some methods.
+    """
+
+    def decorator(view_func):
+        view_func.query_budget = max_queries
+        return view_func
+
+    return decorator
+
+
+def fingerprint(sql):
+    """The SQL with its literals and IN list lengths normalized, so repeats of one query match."""
+    sql = _IN_LIST.sub('IN (...)', sql)
+    sql = _LITERAL.sub('?', sql)
+    return _WHITESPACE.sub(' ', sql).strip()
+
+
+class QueryRecorder:
+    """Execute wrapper keeping the fingerprint and duration of every query run."""
+
+    def __init__(self):
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append((fingerprint(sql), time.perf_counter() - start))
+
+    @property
+    def count(self):
+        return len(self.queries)
+
+    @property
+    def duration(self):
+        return sum(duration for _, duration in self.queries)
+
+    def duplicates(self):
+        """{fingerprint: times run} of the queries run more than once, most repeated first."""
+        counts = Counter(sql for sql, _ in self.queries)
+        return {sql: count for sql, count in counts.most_common() if count > 1}
+
+
+class QueryInstrumentationMiddleware:
+    """
+    Middleware recording the queries every request runs.
+
+    Enabled by QUERY_INSTRUMENTATION_ENABLED. Each request gets a structured log line
+    with its query count, DB time and repeated query fingerprints, and Server-Timing
+    headers. A query fingerprint repeated QUERY_N_PLUS_ONE_THRESHOLD times is logged
+    as a likely N+1.
+
+    Views declare a budget with @query_budget or a `query_budget` attribute. Going
+    over it logs a warning, or raises QueryBudgetExceeded when QUERY_BUDGET_ENFORCED
+    is set, as it is in the test suite.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not getattr(settings, "QUERY_INSTRUMENTATION_ENABLED", False):
+            return self.get_response(request)
+
+        recorder = QueryRecorder()
+        start = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(recorder))
+            response = self.get_response(request)
+        total = time.perf_counter() - start
+
+        duplicates = recorder.duplicates()
+        response['Server-Timing'] = (
+            f'db;dur={recorder.duration * 1000:.1f};desc="{recorder.count} queries", '
+            f'app;dur={total * 1000:.1f}'
+        )
+        logger.info(json.dumps({
+            'event': 'request_queries',
+            'method': request.method,
+            'path': request.path,
+            'view': getattr(request.resolver_match, 'view_name', None),
+            'status': response.status_code,
+            'queries': recorder.count,
+            'db_ms': round(recorder.duration * 1000, 1),
+            'total_ms': round(total * 1000, 1),
+            'duplicate_queries': sum(duplicates.values()) - len(duplicates),
+        }))
+
+        threshold = getattr(settings, "QUERY_N_PLUS_ONE_THRESHOLD", 5)
+        for sql, count in duplicates.items():
+            if count >= threshold:
+                logger.warning(f"Possible N+1 on {request.path}: query run {count} times: {sql[:300]}")
+
+        budget = getattr(request, 'query_budget', None)
+        if isinstance(budget, dict):
+            budget = budget.get(request.method)
+        if budget is not None and recorder.count > budget:
+            message = f"{request.method} {request.path} ran {recorder.count} queries, over its budget of {budget}"
+            if getattr(settings, "QUERY_BUDGET_ENFORCED", False):
+                raise QueryBudgetExceeded(message)
+            logger.warning(message)
+
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        budget = getattr(view_func, 'query_budget', None)
+        if budget is None:
+            budget = getattr(getattr(view_func, 'cls', getattr(view_func, 'view_class', None)), 'query_budget', None)
+        request.query_budget = budget
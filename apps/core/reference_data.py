@@ -0,0 +1,104 @@
+"""
+Reference data served by the dropdown details endpoint.
+
+Every field group is cached on its own with a content hash, under a version that
+the signals in apps/core/signals.py bump when one of the group's models changes.
+The endpoint combines the hashes of the requested groups into an ETag so clients
+can revalidate with If-None-Match instead of downloading the lists again.
+"""
+import hashlib
+import json
+
+from django.conf import settings
+from django.core.cache import cache
+
+from apps.company.models import (
+    Roles,
+    CompanyProfile,
+    CAREER_JOURNEY,
+    Skill,
+    Department,
+    Industries,
+    CompanyTypes,
+    SalaryRange, COMPANY_SIZE, ON_SITE_REMOTE, Certs,
+)
+from apps.core.models import (
+    PronounsIdentities,
+    GenderIdentities,
+    SexualIdentities,
+    EthicIdentities,
+    CommunityNeeds,
+    UserProfile,
+)
+from utils.cache_utils import get_cache_version, bump_cache_version
+
+REFERENCE_DATA_CACHE_NAMESPACE = "reference_data"
+REFERENCE_DATA_CACHE_TIMEOUT = getattr(settings, "REFERENCE_DATA_CACHE_TIMEOUT", 60 * 60 * 24)
+
+# field -> (loader, models the loader reads)
+REFERENCE_DATA_FIELDS = {
+    "pronouns": (lambda: list(PronounsIdentities.objects.values("name", "id")), [PronounsIdentities]),
+    "job_roles": (lambda: list(Roles.objects.order_by("name").values("name", "id")), [Roles]),
+    "years_of_experience": (
+        lambda: [{"value": code, "label": description} for code, description in CAREER_JOURNEY], []
+    ),
+    "companies": (
+        lambda: list(CompanyProfile.objects.order_by("company_name").values("company_name", "id", "logo",
+                                                                             "company_url")),
+        [CompanyProfile],
+    ),
+    "job_skills": (lambda: list(Skill.objects.order_by("name").values("name", "id")), [Skill]),
+    "certs": (lambda: list(Certs.objects.order_by("name").values("name", "id")), [Certs]),
+    "job_departments": (lambda: list(Department.objects.order_by("name").values("name", "id")), [Department]),
+    "job_industries": (lambda: list(Industries.objects.order_by("name").values("name", "id")), [Industries]),
+    "company_types": (lambda: list(CompanyTypes.objects.order_by("name").values("name", "id")), [CompanyTypes]),
+    "gender": (lambda: list(GenderIdentities.objects.order_by("name").values("name", "id")), [GenderIdentities]),
+    "sexuality": (lambda: list(SexualIdentities.objects.order_by("name").values("name", "id")), [SexualIdentities]),
+    "ethic": (lambda: list(EthicIdentities.objects.order_by("name").values("name", "id")), [EthicIdentities]),
+    "job_salary_range": (lambda: list(SalaryRange.objects.values("range", "id")), [SalaryRange]),
+    "community_needs": (lambda: list(CommunityNeeds.objects.values("name", "id")), [CommunityNeeds]),
+    "how_connected": (lambda: UserProfile.HOW_CONNECTION_MADE, []),
+    "company_size": (lambda: COMPANY_SIZE, []),
+    "on_site_remote": (lambda: ON_SITE_REMOTE, []),
+}
+
+# The full company list is only sent when asked for, the companies endpoint pages through it
+DEFAULT_FIELDS = [field for field in REFERENCE_DATA_FIELDS if field != "companies"]
+
+# model -> fields to invalidate when one of its rows changes
+FIELDS_BY_MODEL = {}
+for _field, (_, _models) in REFERENCE_DATA_FIELDS.items():
+    for _model in _models:
+        FIELDS_BY_MODEL.setdefault(_model, []).append(_field)
+
+
+def get_reference_data(field):
+    """
+    Get the cached data of a reference data field, loading it on a miss.
+
+    Args:
+        field (str): A REFERENCE_DATA_FIELDS key.
+
+    Returns:
+        tuple: (data, content hash)
+    """
+    cache_key = f"{REFERENCE_DATA_CACHE_NAMESPACE}_{field}_v{get_cache_version(REFERENCE_DATA_CACHE_NAMESPACE, field)}"
+    cached = cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    loader, _ = REFERENCE_DATA_FIELDS[field]
+    data = loader()
+    content_hash = hashlib.md5(json.dumps(data, sort_keys=True, default=str).encode()).hexdigest()
+    cache.set(cache_key, (data, content_hash), REFERENCE_DATA_CACHE_TIMEOUT)
+    return data, content_hash
+
+
+def get_reference_data_etag(fields, hashes):
+    combined = ",".join(f"{field}:{content_hash}" for field, content_hash in zip(fields, hashes))
+    return f'"{hashlib.md5(combined.encode()).hexdigest()}"'
+
+
+def invalidate_reference_data(model):
+    for field in FIELDS_BY_MODEL.get(model, []):
+        bump_cache_version(REFERENCE_DATA_CACHE_NAMESPACE, field)
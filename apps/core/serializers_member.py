@@ -1,6 +1,8 @@
+from django.db.models import Prefetch
 from rest_framework import serializers
 from .models import CustomUser, UserProfile
-from .util import get_current_company_data
+from .util import get_current_company_data, serialize_company_data
+from ..company.models import CompanyProfile
 from ..member.models import MemberProfile
 
 
@@ -144,6 +146,13 @@ class ReadOnlyTalentProfileSerializer(serializers.ModelSerializer):
 
 
 class FullTalentProfileSerializer(serializers.ModelSerializer):
+    """
+    A member with their talent profile, user profile and current company.
+
+    Lists should load their members with setup_eager_loading, the profiles and
+    company are then read from the select_related and prefetch caches instead of
+    being queried per member.
+    """
     user = ReadOnlyCustomUserSerializer(read_only=True)
     talent_profile = serializers.SerializerMethodField(read_only=True)
     user_profile = serializers.SerializerMethodField(read_only=True)
@@ -153,13 +162,39 @@ class FullTalentProfileSerializer(serializers.ModelSerializer):
         model = MemberProfile
         fields = "__all__"
 
+    @staticmethod
+    def setup_eager_loading(queryset):
+        """Load everything the serializer reads for a page of members in a fixed number of queries."""
+        return queryset.select_related("user", "user__userprofile").prefetch_related(
+            "skills",
+            "department",
+            "role",
+            "industries",
+            "company_types",
+            "user__userprofile__identity_sexuality",
+            "user__userprofile__identity_gender",
+            "user__userprofile__identity_ethic",
+            "user__userprofile__identity_pronouns",
+            "user__userprofile__member_spotlight",
+            Prefetch(
+                "user__company_current_employees",
+                queryset=CompanyProfile.objects.prefetch_related("industries").order_by("id"),
+                to_attr="current_companies",
+            ),
+        )
+
     def get_talent_profile(self, obj):
-        talent_profile = MemberProfile.objects.filter(user=obj.user).first()
-        return ReadOnlyTalentProfileSerializer(talent_profile).data if talent_profile else None
+        # The member profile of obj.user is obj itself
+        return ReadOnlyTalentProfileSerializer(obj).data
 
     def get_user_profile(self, obj):
-        user_profile = UserProfile.objects.filter(user=obj.user).first()
-        return ReadOnlyUserProfileSerializer(user_profile).data if user_profile else None
-
-    def get_company_details(selfself, obj):
+        try:
+            user_profile = obj.user.userprofile
+        except UserProfile.DoesNotExist:
+            return None
+        return ReadOnlyUserProfileSerializer(user_profile).data
+
+    def get_company_details(self, obj):
+        if hasattr(obj.user, "current_companies"):
+            return serialize_company_data(obj.user.current_companies[0]) if obj.user.current_companies else None
         return get_current_company_data(user=obj.user)
@@ -1,10 +1,17 @@
 from django.db import transaction
-from django.db.models.signals import post_save, post_init
+from django.db.models.signals import post_save, post_delete, m2m_changed
 from django.dispatch import receiver
 
-from apps.core.tasks import update_convertkit_tags_task
+from apps.core.reference_data import FIELDS_BY_MODEL, invalidate_reference_data
+from apps.core.tasks import queue_convertkit_tags_update
+from utils.cache_utils import bump_cache_version, USER_DATA_CACHE_NAMESPACE
 from .models import CustomUser, UserProfile
+from ..company.models import CompanyProfile
 from ..member.models import MemberProfile
+from ..mentorship.models import MentorshipProgramProfile, MenteeProfile, MentorRoster, MentorProfile
+
+# Models whose rows belong to exactly one user and feed the user details snapshot
+USER_OWNED_MODELS = (UserProfile, MemberProfile, MentorshipProgramProfile, MenteeProfile, MentorProfile)
 
 
 @receiver(post_save, sender=CustomUser)
@@ -17,4 +24,83 @@ def create_user_profile(sender, instance, created, **kwargs):
 @receiver(post_save, sender=UserProfile)
 def queue_update_convertkit_tags(sender, instance, created, **kwargs):
     # Queue the task to update ConvertKit tags
-    transaction.on_commit(lambda: update_convertkit_tags_task.delay(instance.user.id))
+    transaction.on_commit(lambda: queue_convertkit_tags_update(instance.user_id))
+
+
+def invalidate_user_data(*user_ids):
+    """Bump the snapshot version of every given user once the transaction commits."""
+    user_ids = {user_id for user_id in user_ids if user_id}
+    if user_ids:
+        transaction.on_commit(
+            lambda: [bump_cache_version(USER_DATA_CACHE_NAMESPACE, user_id) for user_id in user_ids]
+        )
+
+
+def _get_company_user_ids(company):
+    return set(company.current_employees.values_list("id", flat=True)) | set(
+        company.account_owner.values_list("id", flat=True)
+    )
+
+
+def _get_mentee_user_ids(mentor_user_id):
+    """Users of the mentees on a mentor's roster, whose snapshots embed the roster."""
+    return set(MentorRoster.objects.filter(mentor__user_id=mentor_user_id).values_list("mentee__user_id", flat=True))
+
+
+@receiver(post_save, sender=CustomUser)
+@receiver(post_delete, sender=CustomUser)
+def invalidate_user_data_for_user(sender, instance, **kwargs):
+    invalidate_user_data(instance.id)
+    if instance.is_mentor:
+        invalidate_user_data(*_get_mentee_user_ids(instance.id))
+
+
+def invalidate_user_data_for_profile(sender, instance, **kwargs):
+    if isinstance(instance, MentorRoster):
+        invalidate_user_data(
+            MenteeProfile.objects.filter(id=instance.mentee_id).values_list("user_id", flat=True).first()
+        )
+        return
+
+    invalidate_user_data(instance.user_id)
+    if isinstance(instance, MentorProfile):
+        invalidate_user_data(*_get_mentee_user_ids(instance.user_id))
+
+
+for model in USER_OWNED_MODELS + (MentorRoster,):
+    post_save.connect(invalidate_user_data_for_profile, sender=model)
+    post_delete.connect(invalidate_user_data_for_profile, sender=model)
+
+
+@receiver(post_save, sender=CompanyProfile)
+def invalidate_user_data_for_company(sender, instance, created, **kwargs):
+    if not created:
+        invalidate_user_data(*_get_company_user_ids(instance))
+
+
+@receiver(m2m_changed)
+def invalidate_user_data_for_m2m(sender, instance, action, reverse, model, pk_set, **kwargs):
+    if action not in ("post_add", "post_remove", "pre_clear"):
+        return
+
+    if isinstance(instance, USER_OWNED_MODELS):
+        invalidate_user_data(instance.user_id)
+    elif isinstance(instance, MentorRoster):
+        invalidate_user_data_for_profile(MentorRoster, instance)
+    elif sender in (CompanyProfile.current_employees.through, CompanyProfile.account_owner.through):
+        if reverse:
+            # instance is the user, e.g. user.company_current_employees.add(company)
+            invalidate_user_data(instance.id)
+        elif action == "pre_clear":
+            invalidate_user_data(*_get_company_user_ids(instance))
+        else:
+            invalidate_user_data(*(pk_set or ()))
+
+
+def invalidate_reference_data_for_model(sender, **kwargs):
+    transaction.on_commit(lambda: invalidate_reference_data(sender))
+
+
+for reference_model in FIELDS_BY_MODEL:
+    post_save.connect(invalidate_reference_data_for_model, sender=reference_model)
+    post_delete.connect(invalidate_reference_data_for_model, sender=reference_model)
@@ -0,0 +1,219 @@
+"""
+Set-based reconciliation of members with the Slack workspace.
+
+The Slack directory and the pending invites are each paged through once into maps
+keyed by lowercased email, joined against CustomUser in memory, and only the users
+whose slack_* fields changed are written back with bulk_update.
+
+Slack members are also pushed to ConvertKit in batches, resuming from a cursor
+kept in the cache when an earlier run stopped part way.
+"""
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.cache import cache
+from slack_sdk import WebClient
+from slack_sdk.http_retry.builtin_handlers import RateLimitErrorRetryHandler
+
+from apps.core.models import CustomUser
+from apps.core.signals import invalidate_user_data
+from utils.convertkit_service import ConvertKitService, CONVERTKIT_POOL_SIZE
+from utils.logging_helper import get_logger
+
+logger = get_logger(__name__)
+
+SLACK_FIELDS = ['slack_user_id', 'is_slack_active', 'is_slack_invite_sent', 'is_slack_found_with_user_email']
+SLACK_PAGE_SIZE = 200
+SLACK_RATE_LIMIT_RETRIES = 5
+BULK_UPDATE_BATCH_SIZE = 500
+
+# ConvertKit tag every Slack member is subscribed to
+SLACK_MEMBER_CONVERTKIT_TAG_ID = getattr(settings, "SLACK_MEMBER_CONVERTKIT_TAG_ID", "3378251")
+SLACK_CONVERTKIT_CURSOR_KEY = "slack_convertkit_sync_cursor"
+SLACK_CONVERTKIT_CURSOR_TIMEOUT = 60 * 60 * 24 * 7
+
+
+def get_slack_client(token):
+    """WebClient that waits out Retry-After and retries when Slack rate limits a call."""
+    client = WebClient(token=token)
+    client.retry_handlers.append(RateLimitErrorRetryHandler(max_retry_count=SLACK_RATE_LIMIT_RETRIES))
+    return client
+
+
+def get_slack_members_by_email(client):
+    """
+    Page through the workspace directory once.
+
+    Returns:
+        dict: Mapping of lowercased email to the Slack member, bots excluded.
+    """
+    members = {}
+    for page in client.users_list(limit=SLACK_PAGE_SIZE):
+        for member in page['members']:
+            email = member.get('profile', {}).get('email')
+            if email and not member.get('is_bot'):
+                members[email.lower()] = member
+    logger.info(f"Retrieved {len(members)} users from Slack")
+    return members
+
+
+def get_invited_emails(admin_client, team_id):
+    """
+    Page through the admin users list once.
+
+    Returns:
+        set: Lowercased emails of everyone invited to the workspace.
+    """
+    emails = set()
+    for page in admin_client.admin_users_list(team_id=team_id, limit=SLACK_PAGE_SIZE):
+        emails.update(user['email'].lower() for user in page.get('users', []) if user.get('email'))
+    logger.info(f"Retrieved {len(emails)} invited users from Slack")
+    return emails
+
+
+def reconcile_slack_user(user, slack_members, invited_emails):
+    """
+    Set the slack_* fields of a user from the Slack maps.
+
+    Returns:
+        bool: Whether any field changed.
+    """
+    before = [getattr(user, field) for field in SLACK_FIELDS]
+    email = user.email.lower()
+    member = slack_members.get(email)
+
+    if member:
+        user.slack_user_id = member['id']
+        user.is_slack_active = not member.get('deleted', False)
+        user.is_slack_invite_sent = True
+        user.is_slack_found_with_user_email = True
+    elif email in invited_emails:
+        user.is_slack_invite_sent = True
+        user.is_slack_found_with_user_email = True
+    else:
+        user.is_slack_invite_sent = False
+
+    return before != [getattr(user, field) for field in SLACK_FIELDS]
+
+
+def sync_slack_users(users=None, client=None, admin_client=None, team_id=None, dry_run=False):
+    """
+    Bring the Slack fields of members in line with the workspace.
+
+    Args:
+        users (QuerySet, optional): Users to reconcile, active users without a Slack id by default.
+        client (WebClient, optional): Client for the workspace directory.
+        admin_client (WebClient, optional): Client with admin scopes for the invites.
+        team_id (str, optional): Slack team the invites belong to, SLACK_TEAM_ID by default.
+        dry_run (bool): Only count the changes, don't save them.
+
+    Returns:
+        dict: Counts of users checked, linked to a Slack member, invited, not found and updated.
+    """
+    client = client or get_slack_client(os.environ['SLACK_API_TOKEN'])
+    admin_client = admin_client or get_slack_client(os.environ['SLACK_API_ADMIN_TOKEN'])
+    team_id = team_id or os.environ.get('SLACK_TEAM_ID')
+    if users is None:
+        users = CustomUser.objects.filter(is_active=True, slack_user_id__isnull=True)
+
+    slack_members = get_slack_members_by_email(client)
+    invited_emails = get_invited_emails(admin_client, team_id)
+
+    stats = {'checked': 0, 'found': 0, 'invited': 0, 'not_found': 0, 'updated': 0}
+    changed = []
+    for user in users.only('id', 'email', *SLACK_FIELDS).iterator(chunk_size=BULK_UPDATE_BATCH_SIZE):
+        stats['checked'] += 1
+        if reconcile_slack_user(user, slack_members, invited_emails):
+            changed.append(user)
+        if user.email.lower() in slack_members:
+            stats['found'] += 1
+        elif user.is_slack_invite_sent:
+            stats['invited'] += 1
+        else:
+            stats['not_found'] += 1
+
+    stats['updated'] = len(changed)
+    if changed and not dry_run:
+        CustomUser.objects.bulk_update(changed, SLACK_FIELDS, batch_size=BULK_UPDATE_BATCH_SIZE)
+        # bulk_update sends no post_save, so drop the cached user details here
+        invalidate_user_data(*(user.id for user in changed))
+
+    logger.info(f"Slack user sync finished: {stats}")
+    return stats
+
+
+def _mark_slack_active(emails):
+    """Set is_slack_active on the users with the given emails, with one query to read and one to write."""
+    users = [user for user in CustomUser.objects.filter(email__in=emails).only('id', 'is_slack_active')
+             if not user.is_slack_active]
+    for user in users:
+        user.is_slack_active = True
+    if users:
+        CustomUser.objects.bulk_update(users, ['is_slack_active'], batch_size=BULK_UPDATE_BATCH_SIZE)
+        invalidate_user_data(*(user.id for user in users))
+    return len(users)
+
+
+def sync_slack_to_convertkit(client=None, convertkit_service=None, batch_size=100, workers=4, restart=False):
+    """
+    Subscribe the active Slack members to the Slack ConvertKit tag and flag them as active in Slack.
+
+    Members are handled in batches ordered by email. Each batch marks its users with
+    one bulk_update, then is pushed to ConvertKit by up to `workers` threads sharing
+    the ConvertKitService rate limiter. The cursor only moves past a batch once all
+    of it was pushed, and the run stops at the first batch with failures, so running
+    again retries from there.
+
+    Args:
+        client (WebClient, optional): Client for the workspace directory.
+        convertkit_service (ConvertKitService, optional): Client to push the subscribers with.
+        batch_size (int): Members per batch.
+        workers (int): Concurrent ConvertKit calls, capped at the connection pool size.
+        restart (bool): Ignore the cursor of an earlier run and start from the first member.
+
+    Returns:
+        dict: Counts of members pushed, skipped as done by an earlier run, users marked active and failures.
+    """
+    client = client or get_slack_client(os.environ['SLACK_API_TOKEN'])
+    convertkit_service = convertkit_service or ConvertKitService()
+    workers = max(1, min(workers, CONVERTKIT_POOL_SIZE))
+
+    cursor = None if restart else cache.get(SLACK_CONVERTKIT_CURSOR_KEY)
+    members = sorted(
+        (email, member) for email, member in get_slack_members_by_email(client).items()
+        if not member.get('deleted')
+    )
+    pending = [(email, member) for email, member in members if cursor is None or email > cursor]
+
+    stats = {'pushed': 0, 'skipped': len(members) - len(pending), 'marked_active': 0, 'errors': 0}
+    if cursor:
+        logger.info(f"Resuming Slack to ConvertKit sync after {cursor}, {stats['skipped']} members already done")
+
+    def push(entry):
+        _, member = entry
+        email = member['profile']['email']
+        try:
+            convertkit_service.add_tag(email, SLACK_MEMBER_CONVERTKIT_TAG_ID, first_name=member.get('real_name'))
+            return True
+        except Exception as e:
+            logger.error(f"Failed to add {email} to ConvertKit: {str(e)}")
+            return False
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for start in range(0, len(pending), batch_size):
+            batch = pending[start:start + batch_size]
+            stats['marked_active'] += _mark_slack_active([member['profile']['email'] for _, member in batch])
+
+            results = list(executor.map(push, batch))
+            stats['pushed'] += results.count(True)
+            stats['errors'] += results.count(False)
+            if not all(results):
+                logger.warning(f"Stopping Slack to ConvertKit sync, {results.count(False)} pushes failed")
+                break
+            cache.set(SLACK_CONVERTKIT_CURSOR_KEY, batch[-1][0], SLACK_CONVERTKIT_CURSOR_TIMEOUT)
+        else:
+            cache.delete(SLACK_CONVERTKIT_CURSOR_KEY)
+
+    logger.info(f"Slack to ConvertKit sync finished: {stats}")
+    return stats
@@ -0,0 +1,246 @@
+"""
+App stats snapshot for the staff dashboard.
+
+All per-table COUNT ... FILTER aggregates run as one statement and the top-N lists
+as one UNION ALL, so a full snapshot costs three round trips. Snapshots are
+precomputed by the refresh_app_stats_task beat job; readers get the last snapshot
+and at most trigger a background refresh, never the computation itself.
+"""
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import Count, Value, CharField
+from django.utils import timezone
+
+from apps.company.models import Department, Roles, Skill
+from apps.core.models import CommunityNeeds
+from apps.core.tasks import get_convertkit_update_metrics
+from apps.mentorship.models import MentorProfile
+from utils.logging_helper import get_logger
+
+logger = get_logger(__name__)
+
+APP_STATS_CACHE_KEY = "app_stats_snapshot"
+APP_STATS_REFRESH_LOCK_KEY = "app_stats_refresh_lock"
+# Snapshots older than this are served but trigger a background refresh
+APP_STATS_STALE_AFTER = timedelta(minutes=15)
+APP_STATS_REFRESH_LOCK_TIMEOUT = 60 * 10
+TOP_ITEMS_LIMIT = 20
+
+# (stats key, model, related name, chart key, chart field name)
+TOP_ITEM_GROUPS = [
+    ("skills", Skill, "talent_skills_list", "skill_chart_data", "Skills"),
+    ("roles", Roles, "talent_role_types", "roles_chart_data", "Roles"),
+    ("departments", Department, "talent_department_list", "departments_chart_data", "Departments"),
+    ("community_needs", CommunityNeeds, "userprofile__tbc_program_interest", "community_needs_chart_data",
+     "CommunityNeeds"),
+]
+
+COUNTS_SQL = """
+    SELECT jobs.*, mentors.*, roster.*, mentees.*, sessions.*, reviews.*, members.*
+    FROM
+        (SELECT
+            COUNT(*) FILTER (WHERE status = 'active') AS open_jobs,
+            COUNT(*) FILTER (WHERE status = 'closed') AS closed_jobs,
+            COUNT(*) FILTER (WHERE created_at >= %(thirty_days_ago)s) AS new_jobs
+         FROM company_job) AS jobs,
+        (SELECT
+            COUNT(*) FILTER (WHERE created_at >= %(thirty_days_ago)s) AS new_mentors,
+            COUNT(*) FILTER (WHERE mentor_status = 'active') AS active_mentors,
+            COUNT(*) FILTER (WHERE mentor_status = 'submitted') AS application_mentors,
+            COUNT(*) FILTER (WHERE mentor_status = 'interviewing') AS interviewing_mentors,
+            COUNT(*) FILTER (WHERE mentor_status = 'paused') AS paused_mentors,
+            COUNT(*) FILTER (WHERE mentor_status = 'removed') AS removed_mentors
+         FROM mentorship_mentorprofile) AS mentors,
+        (SELECT COUNT(DISTINCT mentee_id) AS active_mentees
+         FROM mentorship_mentorroster
+         WHERE mentor_id IN (
+            SELECT id FROM mentorship_mentorprofile WHERE mentor_status = 'active'
+         )) AS roster,
+        (SELECT COUNT(*) AS new_mentees
+         FROM mentorship_menteeprofile
+         WHERE created_at >= %(thirty_days_ago)s) AS mentees,
+        (SELECT
+            COUNT(*) FILTER (WHERE created_at >= %(thirty_days_ago)s) AS recent_sessions,
+            COUNT(*) FILTER (WHERE is_completed = TRUE AND completed_at >= %(thirty_days_ago)s)
+                AS completed_sessions
+         FROM mentorship_session) AS sessions,
+        (SELECT COUNT(*) AS recent_reviews
+         FROM mentorship_mentorreview
+         WHERE created_at >= %(thirty_days_ago)s) AS reviews,
+        (SELECT
+            COUNT(*) FILTER (WHERE is_member = TRUE AND is_active = TRUE) AS active_members,
+            COUNT(*) FILTER (WHERE is_member = TRUE AND is_active = TRUE AND is_member_onboarding_complete = TRUE)
+                AS completed_onboarding,
+            COUNT(*) FILTER (WHERE is_member = TRUE AND last_login < %(thirty_days_ago)s) AS inactive_30_days,
+            COUNT(*) FILTER (WHERE is_member = TRUE AND last_login >= %(two_weeks_ago)s) AS active_2_weeks,
+            COUNT(*) FILTER (WHERE is_member = TRUE AND joined_at >= %(thirty_days_ago)s) AS new_members_30_days
+         FROM core_customuser) AS members
+"""
+
+
+def get_counts():
+    """Run every COUNT ... FILTER aggregate in a single round trip."""
+    now = timezone.now()
+    params = {"thirty_days_ago": now - timedelta(days=30), "two_weeks_ago": now - timedelta(days=14)}
+
+    with connection.cursor() as cursor:
+        cursor.execute(COUNTS_SQL, params)
+        columns = [column[0] for column in cursor.description]
+        return dict(zip(columns, cursor.fetchone()))
+
+
+def _top_items_queryset(model, related_name, group, limit):
+    return model.objects.annotate(
+        count=Count(related_name), group=Value(group, output_field=CharField())
+    ).order_by('-count').values('group', 'name', 'count')[:limit]
+
+
+def get_top_items(limit=TOP_ITEMS_LIMIT):
+    """
+    Get the most popular items of every TOP_ITEM_GROUPS entry.
+
+    Returns:
+        dict: Mapping of stats key to a list of {'name', 'count'} dicts, most popular first.
+    """
+    top_items = {group: [] for group, *_ in TOP_ITEM_GROUPS}
+    querysets = [
+        _top_items_queryset(model, related_name, group, limit)
+        for group, model, related_name, *_ in TOP_ITEM_GROUPS
+    ]
+
+    if connection.features.supports_slicing_ordering_in_compound:
+        rows = querysets[0].union(*querysets[1:], all=True)
+    else:
+        rows = [row for queryset in querysets for row in queryset]
+
+    for row in rows:
+        top_items[row['group']].append({'name': row['name'], 'count': row['count']})
+
+    # Union results aren't ordered across groups
+    for items in top_items.values():
+        items.sort(key=lambda item: item['count'], reverse=True)
+    return top_items
+
+
+def get_top_mentors():
+    return list(MentorProfile.objects.annotate(
+        session_count=Count('mentorroster__sessions')
+    ).order_by('-session_count')[:5].values('user__first_name', 'user__last_name', 'session_count'))
+
+
+def get_pie_chart_data(data, field_name, top_n=20):
+    """
+    Generate pie chart data for any given dataset.
+
+    :param data: List of dictionaries containing 'name' and 'count' keys
+    :param field_name: Name of the field (e.g., 'skills', 'roles', 'departments')
+    :param top_n: Number of top items to include individually (default 10)
+    :return: List of dictionaries suitable for a pie chart
+    """
+    # Sort data by count in descending order
+    sorted_data = sorted(data, key=lambda x: x['count'], reverse=True)
+
+    # Get top N items
+    top_items = sorted_data[:top_n]
+
+    # Calculate the sum of all other items
+    other_sum = sum(item['count'] for item in sorted_data[top_n:])
+
+    # Prepare data for pie chart
+    pie_chart_data = [
+        {'name': item['name'], 'value': item['count']}
+        for item in top_items
+    ]
+
+    # Add "Other" category if there are more items
+    if other_sum > 0:
+        pie_chart_data.append({'name': f'Other {field_name}', 'value': other_sum})
+
+    return pie_chart_data
+
+
+def build_app_stats():
+    """Compute a full stats snapshot."""
+    counts = get_counts()
+    stats = {
+        'job_board': {
+            'open_jobs': counts['open_jobs'],
+            'closed_jobs': counts['closed_jobs'],
+            'new_jobs_last_30_days': counts['new_jobs'],
+        },
+        'mentorship': {
+            'new_mentors_last_30_days': counts['new_mentors'],
+            'active_mentors': counts['active_mentors'],
+            'application_mentors': counts['application_mentors'],
+            'interviewing_mentors': counts['interviewing_mentors'],
+            'paused_mentors': counts['paused_mentors'],
+            'removed_mentors': counts['removed_mentors'],
+            'active_mentees': counts['active_mentees'],
+            'new_mentees_last_30_days': counts['new_mentees'],
+            'sessions_last_30_days': counts['recent_sessions'],
+            'completed_sessions_last_30_days': counts['completed_sessions'],
+            'reviews_last_30_days': counts['recent_reviews'],
+            'top_mentors': get_top_mentors(),
+        },
+        'convertkit_updates': get_convertkit_update_metrics(),
+        'membership': {
+            'total_active_members': counts['active_members'],
+            'completed_onboarding': counts['completed_onboarding'],
+            'inactive_last_30_days': counts['inactive_30_days'],
+            'active_last_2_weeks': counts['active_2_weeks'],
+            'new_members_last_30_days': counts['new_members_30_days'],
+        },
+    }
+
+    top_items = get_top_items()
+    for group, _, _, chart_key, field_name in TOP_ITEM_GROUPS:
+        stats[group] = top_items[group]
+        stats[chart_key] = get_pie_chart_data(top_items[group], field_name)
+
+    return stats
+
+
+def refresh_app_stats():
+    """
+    Compute and store a fresh snapshot.
+
+    A failing query raises and keeps the last complete snapshot, a snapshot with
+    missing data is never stored.
+    """
+    try:
+        snapshot = {"stats": build_app_stats(), "computed_at": timezone.now()}
+        cache.set(APP_STATS_CACHE_KEY, snapshot, None)
+    finally:
+        cache.delete(APP_STATS_REFRESH_LOCK_KEY)
+    logger.info("App stats snapshot refreshed")
+    return snapshot
+
+
+def get_app_stats_snapshot():
+    """
+    Get the last stats snapshot, stale-while-revalidate.
+
+    A missing or stale snapshot queues a single background refresh (guarded by a lock
+    so concurrent requests don't pile up tasks) and the current snapshot, if any, is
+    returned straight away.
+
+    Returns:
+        dict | None: {"stats": ..., "computed_at": ...} or None if no snapshot exists yet.
+    """
+    from apps.core.tasks import refresh_app_stats_task
+
+    snapshot = cache.get(APP_STATS_CACHE_KEY)
+    is_stale = snapshot is None or (
+        timezone.now() - snapshot["computed_at"] > APP_STATS_STALE_AFTER
+    )
+
+    if is_stale and cache.add(APP_STATS_REFRESH_LOCK_KEY, True, APP_STATS_REFRESH_LOCK_TIMEOUT):
+        try:
+            refresh_app_stats_task.delay()
+        except Exception as e:
+            cache.delete(APP_STATS_REFRESH_LOCK_KEY)
+            logger.error(f"Could not queue app stats refresh: {str(e)}")
+
+    return snapshot
@@ -1,30 +1,81 @@
 import logging
 import os
+import uuid
 from datetime import timedelta
 
 from celery import shared_task
+from django.core.cache import cache
 from django.db import transaction
 from django.utils import timezone
 
 from api import settings
-from apps.core.models import CustomUser, UserProfile, EmailTags
-from apps.member.models import MemberProfile
+from apps.core.convertkit_sync import (
+    MANAGED_TAG_CATEGORIES,
+    NOTIFICATION_TAG_FIELDS,
+    get_desired_tags,
+    save_subscriber_tags,
+)
+from apps.core.models import CustomUser, EmailTags
 from utils.convertkit_service import ConvertKitService
 from utils.emails import send_dynamic_email
 
 logger = logging.getLogger(__name__)
 
-MANAGED_TAG_CATEGORIES = [
-    'identity',
-    'notification',
-    'skill',
-    'department',
-    'role'
-]
+# Profile saves within this many seconds of each other result in a single ConvertKit update
+CONVERTKIT_UPDATE_DEBOUNCE_SECONDS = getattr(settings, "CONVERTKIT_UPDATE_DEBOUNCE_SECONDS", 30)
+CONVERTKIT_UPDATE_METRICS = ["requested", "coalesced", "run"]
+
+
+def _pending_update_key(user_id):
+    return f"convertkit_update_pending_{user_id}"
+
+
+def _increment_update_metric(name):
+    key = f"convertkit_updates_{name}"
+    if not cache.add(key, 1, None):
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, 1, None)
+
+
+def get_convertkit_update_metrics():
+    """
+    Counts of the profile-triggered ConvertKit updates since the counters were last reset.
+
+    Returns:
+        dict: requested, coalesced (dropped for a later update of the same user) and run updates.
+    """
+    values = cache.get_many([f"convertkit_updates_{name}" for name in CONVERTKIT_UPDATE_METRICS])
+    return {name: values.get(f"convertkit_updates_{name}", 0) for name in CONVERTKIT_UPDATE_METRICS}
+
+
+def queue_convertkit_tags_update(user_id):
+    """
+    Queue a debounced ConvertKit tag update for a user.
+
+    Every call supersedes the updates queued for the same user in the last
+    CONVERTKIT_UPDATE_DEBOUNCE_SECONDS, so only the last of a burst of saves runs.
+    """
+    token = uuid.uuid4().hex
+    # Outlives the countdown by far, the last task must still find its token
+    cache.set(_pending_update_key(user_id), token, CONVERTKIT_UPDATE_DEBOUNCE_SECONDS * 10)
+    _increment_update_metric("requested")
+    update_convertkit_tags_task.apply_async(
+        (user_id,), {"debounce_token": token}, countdown=CONVERTKIT_UPDATE_DEBOUNCE_SECONDS
+    )
 
 
 @shared_task
-def update_convertkit_tags_task(user_id):
+def update_convertkit_tags_task(user_id, debounce_token=None):
+    if debounce_token is not None:
+        pending_token = cache.get(_pending_update_key(user_id))
+        # A missing token means the marker was lost, run rather than drop the update
+        if pending_token is not None and pending_token != debounce_token:
+            _increment_update_metric("coalesced")
+            return
+        _increment_update_metric("run")
+
     print(f'update_convertkit_tags_task for {user_id}')
     try:
         with transaction.atomic():
@@ -44,65 +95,16 @@ def update_convertkit_tags_task(user_id):
 
 def process_user(user, convertkit_service, all_tags):
     print(f'processing user {user}')
-    try:
-        user_profile = UserProfile.objects.get(user=user)
-        member_profile = MemberProfile.objects.get(user=user)
-    except (UserProfile.DoesNotExist, MemberProfile.DoesNotExist):
+    add_tags = get_desired_tags([user.id], managed_tags=all_tags).get(user.id)
+    if add_tags is None:
         logger.warning(f"User {user.id} is missing UserProfile or MemberProfile")
         return
 
-    add_tags = set()
-    remove_tags = set()
-
     # Get the user's current tags from ConvertKit
     current_tags = set(convertkit_service.get_subscriber_tags(user.email))
 
-    # Skills
-    skills = member_profile.skills.values_list('name', flat=True)
-    add_tags.update(skill for skill in skills if skill in all_tags)
-
-    # Roles
-    roles = member_profile.role.values_list('name', flat=True)
-    add_tags.update(role for role in roles if role in all_tags)
-
-    # Department
-    departments = member_profile.department.values_list('name', flat=True)
-    add_tags.update(dept for dept in departments if dept in all_tags)
-
-    # Identity info
-    identity_fields = [
-        'identity_sexuality',
-        'identity_gender',
-        'identity_ethic',
-        'identity_pronouns',
-    ]
-
-    for field in identity_fields:
-        identities = getattr(user_profile, field).values_list('name', flat=True)
-        add_tags.update(identity for identity in identities if identity in all_tags)
-
-    # Special fields
-    if user_profile.disability:
-        add_tags.add('Disability')
-    if user_profile.care_giver:
-        add_tags.add('Caregiver')
-    if user_profile.veteran_status:
-        add_tags.add('Veteran')
-
-    # Notification settings
-    notification_fields = [
-        'marketing_monthly_newsletter',
-        'marketing_events',
-        'marketing_jobs',
-        'marketing_org_updates',
-        'marketing_identity_based_programing',
-    ]
-
-    for field in notification_fields:
-        if getattr(user_profile, field):
-            add_tags.add(field)
-        else:
-            remove_tags.add(field)
+    # Notification tags are removed when the setting is off
+    remove_tags = set(NOTIFICATION_TAG_FIELDS) - add_tags
 
     # Filter remove_tags to only include tags of the managed categories
     managed_current_tags = set(EmailTags.objects.filter(
@@ -124,6 +126,8 @@ def process_user(user, convertkit_service, all_tags):
     if add_tags or remove_tags:
         try:
             convertkit_service.update_subscriber_tags(user.email, add_tags, remove_tags)
+            # Keep the bulk sync's snapshot in step with what this update did
+            save_subscriber_tags(user.email, (current_tags | add_tags) - remove_tags)
             logger.info(f"Updated ConvertKit tags for user {user.id}")
         except Exception as e:
             logger.error(f"Error updating tags for user {user.id}: {str(e)}")
@@ -193,3 +197,10 @@ def send_batch_onboarding_email_reminder_task():
         logging.error(f"No users found")
         return "No users found"
 
+
+@shared_task
+def refresh_app_stats_task():
+    from apps.core.stats import refresh_app_stats
+
+    refresh_app_stats()
+    return "App stats refreshed"
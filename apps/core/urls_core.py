@@ -5,6 +5,7 @@ from .views_admin import CombinedBreakdownView
 
 urlpatterns = [
     path("details/", views_core.get_dropdown_data, name="details"),
+    path("details/companies/", views_core.get_companies, name="details-companies"),
     path("member/all/", views_core.get_all_members, name="members"),
     path('all-breakdowns/', CombinedBreakdownView.as_view(), name='all-breakdowns'),
 ]
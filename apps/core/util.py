@@ -27,11 +27,15 @@ from ..company.models import (
     Roles,
     CompanyProfile,
 )
+from ..company.name_resolver import role_resolver
 from ..member.models import MemberProfile
 
 User = get_user_model()
 logger = get_logger(__name__)
 
+# Roles typed in by members are only merged into existing roles that are a near exact match
+PROFILE_ROLE_MIN_MATCH_SCORE = 97
+
 
 def update_user(current_user, user_data):
     """
@@ -522,10 +526,15 @@ def process_roles(role_identifiers):
                 role = Roles.objects.get(id=identifier)
             # If identifier is a role name
             elif isinstance(identifier, str):
-                role, created = Roles.objects.get_or_create(name=identifier)
-
-                if created:
-                    print(f"Created new role: {identifier.name}")
+                # Reuse an existing role when the name only differs in case, spacing or a typo
+                match = role_resolver.resolve(identifier, min_score=PROFILE_ROLE_MIN_MATCH_SCORE)
+                if match:
+                    role = Roles.objects.get(id=match[0])
+                else:
+                    role, created = Roles.objects.get_or_create(name=identifier)
+
+                    if created:
+                        print(f"Created new role: {identifier}")
             else:
                 raise ValueError(f"Invalid role identifier: {identifier}")
 
@@ -694,17 +703,26 @@ def get_current_company_data(user):
     """
     try:
         company = CompanyProfile.objects.get(current_employees=user)
-        return {
-            "id": company.id,
-            "company_name": company.company_name,
-            "logo": company.logo.url,
-            "logo_url": company.logo_url,
-            "company_size": company.company_size,
-            "industries": [industry.name for industry in company.industries.all()],
-        }
+        return serialize_company_data(company)
     except CompanyProfile.DoesNotExist:
         return None
 
+
+def serialize_company_data(company):
+    """
+    The company data returned by get_current_company_data, reading the industries from the prefetch cache
+    when the company came with them.
+    """
+    return {
+        "id": company.id,
+        "company_name": company.company_name,
+        "logo": company.logo.url,
+        "logo_url": company.logo_url,
+        "company_size": company.company_size,
+        "industries": [industry.name for industry in company.industries.all()],
+    }
+
+
 def generate_unique_filename(original_filename, file_content):
     """
     Generate a unique filename based on the original filename and file content.
@@ -64,6 +64,7 @@ from apps.mentorship.serializer import (
     MentorRosterSerializer,
     MentorshipProgramProfileSerializer,
 )
+from utils.cache_utils import get_versioned_cache_key, USER_DATA_CACHE_NAMESPACE
 from utils.data_utils import get_or_create_normalized
 from utils.emails import send_dynamic_email
 from utils.helper import prepend_https_if_not_empty
@@ -153,20 +154,10 @@ def get_user_data(request):
     Raises:
         Http404: If required user profiles are not found.
     """
-    print('getting users details for app')
     user = request.user
-    # cache_key = f'user_data_{user.id}'
-    # cached_data = cache.get(cache_key)
-    #
-    # if cached_data:
-    #     print('returning cached data')
-    #     return Response(cached_data)
 
     try:
-        print('getting users profiles for app')
         user_data = _fetch_user_data(user)
-        # cache.set(cache_key, user_data, timeout=settings.USER_DATA_CACHE_TIMEOUT)
-        # print('saving users profiles for app as cache')
         return Response(user_data)
     except Exception as e:
         print(f"Error fetching user data for user {user.id}: {str(e)}")
@@ -175,12 +166,18 @@ def get_user_data(request):
 
 
 def _fetch_user_data(user):
-    cache_key = f"user_data_{user.id}"
+    """
+    Read-through snapshot of the user details payload.
+
+    The snapshot key embeds a per-user version that is bumped by the signals in
+    apps/core/signals.py, so a cache hit serves the payload without touching the DB.
+    """
+    cache_key = get_versioned_cache_key(USER_DATA_CACHE_NAMESPACE, user.id)
     cached_data = cache.get(cache_key)
-    user_profile = UserProfile.objects.select_related('user').get(user=user)
+    if cached_data is not None:
+        return cached_data
 
-    if cached_data is None:
-        user_profile = UserProfile.objects.select_related('user').get(user=user)    
+    user_profile = UserProfile.objects.select_related('user').get(user=user)
 
     response_data = {
         "status": True,
@@ -194,10 +191,9 @@ def _fetch_user_data(user):
     _add_conditional_data(user, response_data)
     _add_company_account_data(user, response_data)
 
-    # Cache the data for 1 hour (3600 seconds)
-    cache.set(cache_key, response_data, 3600)
-    return response_data
-
+    # Don't pin an upstream failure for the lifetime of the snapshot
+    if "error" not in response_data["company_account_data"] or not user.is_company_account:
+        cache.set(cache_key, response_data, settings.USER_DATA_CACHE_TIMEOUT)
     return response_data
 
 
@@ -398,10 +394,6 @@ def create_new_member(request):
             f"*Name* {user.first_name} \n\n"
         )
         post_message("GL4BCC2HK", msg)
-        
-        # Invalidate the cache for this user
-        cache_key = f"user_data_{user.id}"
-        cache.delete(cache_key)        
 
         return Response(
             {
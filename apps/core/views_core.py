@@ -10,123 +10,91 @@ from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
-from apps.company.models import (
-    Roles,
-    CompanyProfile,
-    CAREER_JOURNEY,
-    Skill,
-    Department,
-    Industries,
-    CompanyTypes,
-    SalaryRange, COMPANY_SIZE, ON_SITE_REMOTE, Certs,
-)
-from apps.core.models import (
-    PronounsIdentities,
-    GenderIdentities,
-    SexualIdentities,
-    EthicIdentities,
-    CommunityNeeds,
-    UserProfile,
+from apps.company.models import CompanyProfile
+from apps.core.query_budget_middleware import query_budget
+from apps.core.reference_data import (
+    REFERENCE_DATA_FIELDS,
+    DEFAULT_FIELDS,
+    get_reference_data,
+    get_reference_data_etag,
 )
 from apps.core.serializers_member import FullTalentProfileSerializer
 from apps.member.models import MemberProfile
 from utils.helper import CustomPagination, paginate_items
+from utils.pagination_utils import KeysetPagination, is_keyset_request
 
 logger = logging.getLogger(__name__)
 
 User = get_user_model()
 
 
+# At most one query per list, the rest come from the cache, plus the token lookup and refresh
+@query_budget(len(REFERENCE_DATA_FIELDS) + 2)
 @api_view(["GET"])
 def get_dropdown_data(request):
-    data = {}
     requested_fields = request.query_params.getlist("fields", [])
+    if requested_fields:
+        fields = [field for field in requested_fields if field in REFERENCE_DATA_FIELDS]
+    else:
+        fields = DEFAULT_FIELDS
 
-    if not requested_fields or "pronouns" in requested_fields:
-        data["pronouns"] = list(PronounsIdentities.objects.values("name", "id"))
-
-    if not requested_fields or "job_roles" in requested_fields:
-        data["job_roles"] = list(Roles.objects.order_by("name").values("name", "id"))
-
-    if not requested_fields or "years_of_experience" in requested_fields:
-        data["years_of_experience"] = [
-            {"value": code, "label": description}
-            for code, description in CAREER_JOURNEY
-        ]
-
-    if not requested_fields or "companies" in requested_fields:
-        data["companies"] = list(
-            CompanyProfile.objects.order_by("company_name").values(
-                "company_name", "id", "logo", "company_url"
-            )
-        )
-
-    if not requested_fields or "job_skills" in requested_fields:
-        data["job_skills"] = list(Skill.objects.order_by("name").values("name", "id"))
-
-    if not requested_fields or "certs" in requested_fields:
-        data["certs"] = list(Certs.objects.order_by("name").values("name", "id"))
-
-    if not requested_fields or "job_departments" in requested_fields:
-        data["job_departments"] = list(
-            Department.objects.order_by("name").values("name", "id")
-        )
-
-    if not requested_fields or "job_industries" in requested_fields:
-        data["job_industries"] = list(
-            Industries.objects.order_by("name").values("name", "id")
-        )
-
-    if not requested_fields or "company_types" in requested_fields:
-        data["company_types"] = list(
-            CompanyTypes.objects.order_by("name").values("name", "id")
-        )
-
-    if not requested_fields or "gender" in requested_fields:
-        data["gender"] = list(
-            GenderIdentities.objects.order_by("name").values("name", "id")
-        )
-
-    if not requested_fields or "sexuality" in requested_fields:
-        data["sexuality"] = list(
-            SexualIdentities.objects.order_by("name").values("name", "id")
-        )
-
-    if not requested_fields or "ethic" in requested_fields:
-        data["ethic"] = list(
-            EthicIdentities.objects.order_by("name").values("name", "id")
-        )
-
-    if not requested_fields or "job_salary_range" in requested_fields:
-        data["job_salary_range"] = list(SalaryRange.objects.values("range", "id"))
-
-    if not requested_fields or "community_needs" in requested_fields:
-        data["community_needs"] = list(CommunityNeeds.objects.values("name", "id"))
-
-    if not requested_fields or "how_connected" in requested_fields:
-        data["how_connected"] = UserProfile.HOW_CONNECTION_MADE
-
-    if not requested_fields or "company_size" in requested_fields:
-        data["company_size"] = COMPANY_SIZE
+    data = {}
+    hashes = []
+    for field in fields:
+        data[field], content_hash = get_reference_data(field)
+        hashes.append(content_hash)
+
+    # Clients revalidate with the ETag and only download the lists again when they changed
+    etag = get_reference_data_etag(fields, hashes)
+    if etag in request.headers.get("If-None-Match", ""):
+        response = Response(status=status.HTTP_304_NOT_MODIFIED)
+    else:
+        data["status"] = True
+        response = Response(data)
+
+    response["ETag"] = etag
+    response["Cache-Control"] = "no-cache"
+    return response
+
+
+# Count and page, plus the token lookup and refresh
+@query_budget(4)
+@api_view(["GET"])
+def get_companies(request):
+    """
+    Page through the companies for the company dropdowns, optionally filtered by name with ?search=.
+    """
+    paginator = CustomPagination()
+    companies = CompanyProfile.objects.order_by("company_name", "id").values("company_name", "id", "logo",
+                                                                             "company_url")
 
-    if not requested_fields or "on_site_remote" in requested_fields:
-        data["on_site_remote"] = ON_SITE_REMOTE
+    search = request.query_params.get("search", "").strip()
+    if search:
+        companies = companies.filter(company_name__icontains=search)
 
+    page = paginator.paginate_queryset(companies, request)
+    data = paginator.get_paginated_response(page).data
     data["status"] = True
-
     return Response(data)
 
 
+# Count and page, one query per prefetched relation, plus the token lookup and refresh
+@query_budget(16)
 @api_view(["GET"])
 def get_all_members(request):
     data = {}
 
-    # Initialize the paginator
-    paginator = CustomPagination()
+    # Initialize the paginator, infinite scroll clients ask for cursor pages
+    if is_keyset_request(request):
+        paginator = KeysetPagination(ordering=("created_at", "id"))
+    else:
+        paginator = CustomPagination()
 
     requested_fields = request.query_params.getlist("fields", [])
 
-    members = MemberProfile.objects.filter(user__is_active=True).order_by("created_at")
+    members = FullTalentProfileSerializer.setup_eager_loading(
+        MemberProfile.objects.filter(user__is_active=True).order_by("created_at")
+    )
     paginated_members = paginate_items(members, request, paginator, FullTalentProfileSerializer)
 
     data["members"] = paginated_members
@@ -1,11 +1,38 @@
 from django.db import transaction
-from django.db.models.signals import post_save
+from django.db.models.signals import post_save, m2m_changed
 from django.dispatch import receiver
 
-from apps.core.tasks import update_convertkit_tags_task
+from apps.company.job_matches import invalidate_job_matches, is_job_matches_user_active
+from apps.company.tasks import queue_job_matches, refresh_member_recommendations_task
+from apps.core.tasks import queue_convertkit_tags_update
 from .models import MemberProfile
 
 
 @receiver(post_save, sender=MemberProfile)
 def queue_update_convertkit_tags_member_profile(sender, instance, created, **kwargs):
-    transaction.on_commit(lambda: update_convertkit_tags_task.delay(instance.user.id))
+    transaction.on_commit(lambda: queue_convertkit_tags_update(instance.user_id))
+
+
+def refresh_job_matches(user_id):
+    """
+    Queue the rescoring of a member's job recommendations, and make their Talent
+    Choice matches stale, recomputing them if the member looks at them.
+    """
+    refresh_member_recommendations_task.delay([user_id])
+    invalidate_job_matches(user_id)
+    if is_job_matches_user_active(user_id):
+        queue_job_matches(user_id)
+
+
+@receiver(post_save, sender=MemberProfile)
+def refresh_job_matches_on_save(sender, instance, created, **kwargs):
+    if not created:
+        transaction.on_commit(lambda: refresh_job_matches(instance.user_id))
+
+
+@receiver(m2m_changed, sender=MemberProfile.skills.through)
+@receiver(m2m_changed, sender=MemberProfile.role.through)
+@receiver(m2m_changed, sender=MemberProfile.department.through)
+def refresh_job_matches_on_m2m_change(sender, instance, action, reverse, **kwargs):
+    if action in ("post_add", "post_remove", "post_clear") and not reverse:
+        transaction.on_commit(lambda: refresh_job_matches(instance.user_id))
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class MentorshipConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "apps.mentorship"
+
+    def ready(self):
+        import apps.mentorship.signals
@@ -0,0 +1,105 @@
+"""
+Denormalized mentor directory.
+
+Every mentor has a MentorDirectoryCard holding their MentorProfileSerializer payload,
+so the directory is served with one query instead of serializing each mentor with
+their member and user profiles. Cards are rebuilt by the signals in
+apps/mentorship/signals.py when a mentor's user, profiles or tags change, and all of
+them nightly by rebuild_mentor_directory_task to pick up renamed reference data.
+"""
+from django.db import transaction
+from django.db.models import Q
+
+from apps.member.models import MemberProfile
+from apps.mentorship.models import MentorDirectoryCard, MentorProfile, MentorshipProgramProfile
+from apps.mentorship.serializer import MentorProfileSerializer
+from utils.logging_helper import get_logger
+
+logger = get_logger(__name__)
+
+
+def _tags_by_user(user_ids):
+    """{user_id: {"skills": [(id, name)], "roles": [...], "support_areas": [...]}} of the given users."""
+    tags = {user_id: {"skills": [], "roles": [], "support_areas": []} for user_id in user_ids}
+    sources = (
+        ("skills", MemberProfile.skills.through, "memberprofile__user_id", "skill"),
+        ("roles", MemberProfile.role.through, "memberprofile__user_id", "roles"),
+        ("support_areas", MentorshipProgramProfile.mentor_support_areas.through,
+         "mentorshipprogramprofile__user_id", "mentorsupportareas"),
+    )
+    for key, through, user_field, related_field in sources:
+        rows = through.objects.filter(**{f"{user_field}__in": user_ids}).values_list(
+            user_field, f"{related_field}_id", f"{related_field}__name"
+        )
+        for user_id, related_id, name in rows:
+            tags[user_id][key].append((related_id, name))
+    return tags
+
+
+def refresh_mentor_cards(user_ids=None):
+    """
+    Rebuild the directory cards of the given mentors.
+
+    Args:
+        user_ids (Iterable[int], optional): Users whose mentor cards to rebuild, every mentor by default.
+
+    Returns:
+        int: Number of cards rebuilt.
+    """
+    mentors = MentorProfile.objects.select_related("user")
+    if user_ids is not None:
+        mentors = mentors.filter(user_id__in=list(user_ids))
+    mentors = list(mentors)
+    tags = _tags_by_user([mentor.user_id for mentor in mentors])
+
+    for mentor in mentors:
+        mentor_tags = tags[mentor.user_id]
+        names = [mentor.user.first_name, mentor.user.last_name]
+        names += [name for key in ("skills", "roles", "support_areas") for _, name in mentor_tags[key]]
+
+        with transaction.atomic():
+            card, _ = MentorDirectoryCard.objects.update_or_create(mentor=mentor, defaults={
+                "is_listed": mentor.user.is_mentor_profile_active,
+                "card": MentorProfileSerializer(mentor).data,
+                "search_text": " ".join(name for name in names if name).lower(),
+            })
+            card.skills.set([skill_id for skill_id, _ in mentor_tags["skills"]])
+            card.roles.set([role_id for role_id, _ in mentor_tags["roles"]])
+            card.support_areas.set([area_id for area_id, _ in mentor_tags["support_areas"]])
+
+    logger.info(f"Rebuilt {len(mentors)} mentor directory cards")
+    return len(mentors)
+
+
+def get_mentor_cards(skill_ids=None, role_ids=None, support_area_ids=None, search=None):
+    """
+    Cards of the listed mentors, optionally filtered.
+
+    Each filter keeps the mentors having any of the given ids, and is resolved on the
+    indexed join tables of the cards.
+
+    Args:
+        skill_ids (list[int], optional): Skills, any of which the mentor has.
+        role_ids (list[int], optional): Roles, any of which the mentor has.
+        support_area_ids (list[int], optional): Areas, any of which the mentor supports.
+        search (str, optional): Text found in the mentor's name, skills, roles or support areas.
+
+    Returns:
+        list: The mentor cards, in the shape of MentorProfileSerializer.
+    """
+    cards = MentorDirectoryCard.objects.filter(is_listed=True)
+    filters = (
+        (MentorDirectoryCard.skills.through, "skill_id", skill_ids),
+        (MentorDirectoryCard.roles.through, "roles_id", role_ids),
+        (MentorDirectoryCard.support_areas.through, "mentorsupportareas_id", support_area_ids),
+    )
+    for through, related_field, ids in filters:
+        if ids:
+            # Subquery rather than a join, so a mentor matching several ids is listed once
+            cards = cards.filter(mentor_id__in=through.objects.filter(
+                **{f"{related_field}__in": ids}).values("mentordirectorycard_id"))
+
+    for term in (search or "").lower().split():
+        cards = cards.filter(Q(search_text__contains=term))
+
+    return list(cards.order_by("mentor_id").values_list("card", flat=True))
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from apps.mentorship.directory import refresh_mentor_cards
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the denormalized mentor directory cards'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', type=int, action='append', dest='user_ids',
+                            help='Only rebuild the card of this mentor user id, can be repeated')
+
+    def handle(self, *args, **options):
+        rebuilt = refresh_mentor_cards(options['user_ids'])
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {rebuilt} mentor directory cards"))
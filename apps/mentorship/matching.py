@@ -0,0 +1,234 @@
+"""
+Vectorized mentor matching.
+
+Active mentors are held in per-process sparse feature matrices (one row per mentor,
+one column per skill, role, department or commitment level a mentor actually has),
+so scoring a mentee against every mentor is a few matrix-vector products instead of
+COUNT aggregates over the M2M tables.
+
+The signals in apps/mentorship/signals.py bump a shared version in the cache whenever
+a mentor's status or profile changes; processes rebuild their matrices on the next
+match after seeing a new version.
+"""
+import threading
+
+import numpy as np
+from django.core.cache import cache
+from scipy import sparse
+
+from apps.member.models import MemberProfile
+from apps.mentorship.models import MentorProfile, MentorshipProgramProfile, MenteeProfile
+from utils.cache_utils import get_cache_version, bump_cache_version, USER_DATA_CACHE_NAMESPACE
+from utils.logging_helper import get_logger
+
+logger = get_logger(__name__)
+
+MENTOR_MATCH_CACHE_NAMESPACE = "mentor_match_engine"
+MENTOR_MATCH_CACHE_ID = "all"
+MENTEE_FEATURES_CACHE_TIMEOUT = 60 * 15
+
+VALUE_FIELDS = [
+    "value_power",
+    "value_achievement",
+    "value_hedonism",
+    "value_stimulation",
+    "value_self_direction",
+    "value_universalism",
+    "value_benevolence",
+    "value_tradition",
+    "value_conformity",
+    "value_security",
+]
+
+
+def refresh_mentor_matching():
+    """Mark the mentor matrices of every process as stale."""
+    bump_cache_version(MENTOR_MATCH_CACHE_NAMESPACE, MENTOR_MATCH_CACHE_ID)
+
+
+def get_active_mentors():
+    return MentorProfile.objects.filter(user__is_mentor=True, user__is_mentor_profile_active=True)
+
+
+def _get_member_features(user_ids):
+    """Return {field: [(user_id, related_id), ...]} for the member profile M2Ms used in matching."""
+    features = {}
+    for field_name in ("skills", "role", "department"):
+        through = getattr(MemberProfile, field_name).through
+        related_field = next(
+            field.attname for field in through._meta.get_fields()
+            if field.is_relation and field.related_model is not MemberProfile
+        )
+        features[field_name] = list(
+            through.objects.filter(memberprofile__user_id__in=user_ids).values_list(
+                "memberprofile__user_id", related_field
+            )
+        )
+    return features
+
+
+def get_mentee_features(user_id):
+    """
+    Collect the ids and values a mentee is matched on.
+
+    The result is a plain dict cached under the user's snapshot version, so it is
+    invalidated by the same signals as the user details payload.
+    """
+    cache_key = f"mentee_features_{user_id}_v{get_cache_version(USER_DATA_CACHE_NAMESPACE, user_id)}"
+    features = cache.get(cache_key)
+    if features is not None:
+        return features
+
+    if not MemberProfile.objects.filter(user_id=user_id).exists():
+        raise MemberProfile.DoesNotExist(f"No member profile for user {user_id}")
+
+    member_features = _get_member_features([user_id])
+    features = {field_name: [related_id for _, related_id in rows] for field_name, rows in member_features.items()}
+
+    commitment_levels = set(
+        MenteeProfile.commitment_level.through.objects.filter(menteeprofile__user_id=user_id).values_list(
+            "commitmentlevel_id", flat=True
+        )
+    )
+    commitment_levels.update(
+        MentorshipProgramProfile.commitment_level.through.objects.filter(
+            mentorshipprogramprofile__user_id=user_id
+        ).values_list("commitmentlevel_id", flat=True)
+    )
+    features["commitment_level"] = list(commitment_levels)
+    features["values"] = list(
+        MentorshipProgramProfile.objects.filter(user_id=user_id).values_list(*VALUE_FIELDS).first() or []
+    )
+
+    cache.set(cache_key, features, MENTEE_FEATURES_CACHE_TIMEOUT)
+    return features
+
+
+class _FeatureMatrix:
+    """A sparse 0/1 matrix of mentors by the related ids they have, with only the columns in use."""
+
+    def __init__(self, row_index, pairs):
+        self.columns = {}
+        for _, related_id in pairs:
+            self.columns.setdefault(related_id, len(self.columns))
+
+        rows, columns = [], []
+        for row_key, related_id in set(pairs):
+            if row_key in row_index:
+                rows.append(row_index[row_key])
+                columns.append(self.columns[related_id])
+        self.matrix = sparse.csr_matrix((np.ones(len(rows), dtype=np.float32), (rows, columns)),
+                                        shape=(len(row_index), len(self.columns)))
+
+    def overlap(self, related_ids):
+        """Number of the given ids each mentor has."""
+        vector = np.zeros(len(self.columns), dtype=np.float32)
+        for related_id in related_ids:
+            column = self.columns.get(related_id)
+            if column is not None:
+                vector[column] = 1
+        return self.matrix @ vector
+
+
+class MentorMatchEngine:
+    """Process-local feature matrices of every active mentor."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.version = None
+        self.mentor_ids = np.zeros(0, dtype=np.int64)
+        self.mentor_user_ids = np.zeros(0, dtype=np.int64)
+
+    def sync(self):
+        version = get_cache_version(MENTOR_MATCH_CACHE_NAMESPACE, MENTOR_MATCH_CACHE_ID)
+        if version == self.version:
+            return
+
+        with self.lock:
+            if version != self.version:
+                self._build()
+                self.version = version
+
+    def _build(self):
+        mentors = list(get_active_mentors().order_by("id").values_list("id", "user_id"))
+        self.mentor_ids = np.array([mentor_id for mentor_id, _ in mentors], dtype=np.int64)
+        self.mentor_user_ids = np.array([user_id for _, user_id in mentors], dtype=np.int64)
+        user_rows = {user_id: row for row, (_, user_id) in enumerate(mentors)}
+        mentor_rows = {mentor_id: row for row, (mentor_id, _) in enumerate(mentors)}
+
+        member_features = _get_member_features(list(user_rows))
+        self.skills = _FeatureMatrix(user_rows, member_features["skills"])
+        self.roles = _FeatureMatrix(user_rows, member_features["role"])
+        self.departments = _FeatureMatrix(user_rows, member_features["department"])
+        self.commitment_levels = _FeatureMatrix(
+            mentor_rows,
+            list(MentorProfile.mentor_commitment_level.through.objects.filter(
+                mentorprofile_id__in=list(mentor_rows)
+            ).values_list("mentorprofile_id", "commitmentlevel_id")),
+        )
+
+        # Unanswered values stay NaN so they don't count towards the similarity
+        self.values = np.full((len(mentors), len(VALUE_FIELDS)), np.nan, dtype=np.float32)
+        for user_id, *values in MentorshipProgramProfile.objects.filter(user_id__in=list(user_rows)).values_list(
+                "user_id", *VALUE_FIELDS):
+            self.values[user_rows[user_id]] = [np.nan if value is None else value for value in values]
+
+        logger.info(f"Built mentor match matrices for {len(mentors)} mentors")
+
+    def _values_similarity(self, mentee_values):
+        """Cosine similarity between the mentee's values and every mentor's, 0 when either is unanswered."""
+        if not mentee_values or all(value is None for value in mentee_values):
+            return np.zeros(len(self.mentor_ids), dtype=np.float32)
+
+        mentee = np.nan_to_num(np.array(mentee_values, dtype=np.float32))
+        mentors = np.nan_to_num(self.values)
+        norms = np.linalg.norm(mentors, axis=1) * np.linalg.norm(mentee)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            similarity = np.where(norms > 0, (mentors @ mentee) / norms, 0)
+        return similarity.astype(np.float32)
+
+    def top_matches(self, user_id, k=1):
+        """
+        Score a mentee against every active mentor.
+
+        A mentor scores one point per shared skill, role and department, one point
+        when they offer a commitment level the mentee asked for, and up to one point
+        for how closely their values line up. Ties go to the mentor sharing more
+        skills, then to the longest standing mentor profile.
+
+        Args:
+            user_id (int): Id of the mentee's user.
+            k (int): Number of mentors to return.
+
+        Returns:
+            list[tuple[int, float]]: (mentor_profile_id, score) of the best k mentors with a positive score.
+
+        Raises:
+            MemberProfile.DoesNotExist: If the mentee has no member profile.
+        """
+        features = get_mentee_features(user_id)
+        self.sync()
+        if not len(self.mentor_ids):
+            return []
+
+        skills_overlap = self.skills.overlap(features["skills"])
+        scores = (
+                skills_overlap
+                + self.roles.overlap(features["role"])
+                + self.departments.overlap(features["department"])
+                + np.minimum(self.commitment_levels.overlap(features["commitment_level"]), 1)
+                + self._values_similarity(features["values"])
+        )
+        # A mentee is never matched with themselves
+        scores[self.mentor_user_ids == user_id] = 0
+
+        # lexsort sorts by the last key first: score, then shared skills, then mentor id
+        order = np.lexsort((self.mentor_ids, -skills_overlap, -scores))
+        return [
+            (int(self.mentor_ids[row]), float(scores[row]))
+            for row in order[:k]
+            if scores[row] > 0
+        ]
+
+
+mentor_match_engine = MentorMatchEngine()
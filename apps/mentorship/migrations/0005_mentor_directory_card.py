@@ -0,0 +1,31 @@
+# Generated by Django 4.2.30 on 2026-10-16 23:26
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('company', '0045_job_match_index'),
+        ('mentorship', '0004_mentorreview_created_at_mentorreview_updated_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MentorDirectoryCard',
+            fields=[
+                ('mentor', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='directory_card', serialize=False, to='mentorship.mentorprofile')),
+                ('is_listed', models.BooleanField(default=False)),
+                ('card', models.JSONField(default=dict)),
+                ('search_text', models.TextField(blank=True, default='')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('roles', models.ManyToManyField(blank=True, related_name='+', to='company.roles')),
+                ('skills', models.ManyToManyField(blank=True, related_name='+', to='company.skill')),
+                ('support_areas', models.ManyToManyField(blank=True, related_name='+', to='mentorship.mentorsupportareas')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['is_listed'], name='mentorship__is_list_ebd9c0_idx')],
+            },
+        ),
+    ]
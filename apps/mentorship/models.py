@@ -5,6 +5,7 @@ from django.db import models
 from django.utils import timezone
 from django_quill.fields import QuillField
 
+from apps.company.models import Skill, Roles
 from apps.core.models import CustomUser
 
 
@@ -278,3 +279,31 @@ class MentorshipProgramProfile(models.Model):
             self.mentee_profile = mentee_profile
             # Call save() again to save the association
             super(MentorshipProgramProfile, self).save(update_fields=["mentee_profile"])
+
+
+class MentorDirectoryCard(models.Model):
+    """
+    Denormalized mentor directory entry, one row per mentor.
+
+    `card` holds the mentor exactly as MentorProfileSerializer renders it, so the
+    directory is listed with a single read. The M2Ms copy the mentor's skills, roles
+    and support areas for filtering through their indexed join tables. Kept in sync
+    by apps/mentorship/signals.py, see apps/mentorship/directory.py.
+    """
+    mentor = models.OneToOneField(MentorProfile, on_delete=models.CASCADE, primary_key=True,
+                                  related_name="directory_card")
+    is_listed = models.BooleanField(default=False)
+    card = models.JSONField(default=dict)
+    search_text = models.TextField(blank=True, default="")
+    skills = models.ManyToManyField(Skill, blank=True, related_name="+")
+    roles = models.ManyToManyField(Roles, blank=True, related_name="+")
+    support_areas = models.ManyToManyField(MentorSupportAreas, blank=True, related_name="+")
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['is_listed']),
+        ]
+
+    def __str__(self):
+        return f"Directory card for mentor {self.mentor_id}"
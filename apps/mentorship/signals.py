@@ -0,0 +1,120 @@
+from django.db import transaction
+from django.db.models.signals import pre_save, post_save, post_delete, m2m_changed
+from django.dispatch import receiver
+
+from apps.core.models import CustomUser, UserProfile
+from apps.member.models import MemberProfile
+from .directory import refresh_mentor_cards
+from .matching import refresh_mentor_matching
+from .models import MentorProfile, MentorshipProgramProfile
+
+MENTOR_MATCH_M2M_SENDERS = (
+    MemberProfile.skills.through,
+    MemberProfile.role.through,
+    MemberProfile.department.through,
+    MentorProfile.mentor_commitment_level.through,
+)
+MENTOR_STATUS_FIELDS = {"is_mentor", "is_mentor_profile_active"}
+# Relations rendered in or filtered on by the mentor directory cards
+MENTOR_CARD_M2M_SENDERS = (
+    MemberProfile.skills.through,
+    MemberProfile.role.through,
+    MemberProfile.department.through,
+    MemberProfile.industries.through,
+    MemberProfile.company_types.through,
+    MentorProfile.mentor_commitment_level.through,
+    MentorshipProgramProfile.mentor_support_areas.through,
+    UserProfile.identity_sexuality.through,
+    UserProfile.identity_gender.through,
+    UserProfile.identity_ethic.through,
+    UserProfile.identity_pronouns.through,
+    UserProfile.tbc_program_interest.through,
+    UserProfile.member_spotlight.through,
+)
+
+
+def _is_mentor(user_id):
+    return CustomUser.objects.filter(id=user_id, is_mentor=True).exists()
+
+
+def _queue_refresh():
+    transaction.on_commit(refresh_mentor_matching)
+
+
+def _is_matchable(user):
+    """Whether the user is in the mentor matrices, see get_active_mentors."""
+    return bool(user.is_mentor and user.is_mentor_profile_active)
+
+
+@receiver(pre_save, sender=CustomUser)
+def remember_mentor_status(sender, instance, update_fields=None, **kwargs):
+    # Saves that can't change the mentor status, e.g. the last_login update on every login, skip the lookup
+    if update_fields is not None and not MENTOR_STATUS_FIELDS.intersection(update_fields):
+        instance._was_matchable = _is_matchable(instance)
+        return
+
+    status_before = None
+    if instance.pk is not None:
+        status_before = CustomUser.objects.filter(pk=instance.pk).values_list(*MENTOR_STATUS_FIELDS).first()
+    instance._was_matchable = bool(status_before and all(status_before))
+
+
+@receiver(post_save, sender=CustomUser)
+def refresh_mentor_matching_on_user_save(sender, instance, **kwargs):
+    # Covers mentor status changes such as activating, pausing, removing or demoting a mentor
+    if instance.__dict__.pop("_was_matchable", False) != _is_matchable(instance):
+        _queue_refresh()
+
+
+@receiver(post_save, sender=MentorProfile)
+@receiver(post_delete, sender=MentorProfile)
+def refresh_mentor_matching_on_mentor_change(sender, instance, **kwargs):
+    _queue_refresh()
+
+
+@receiver(post_save, sender=MemberProfile)
+@receiver(post_save, sender=MentorshipProgramProfile)
+def refresh_mentor_matching_on_profile_save(sender, instance, **kwargs):
+    if _is_mentor(instance.user_id):
+        _queue_refresh()
+
+
+@receiver(m2m_changed)
+def refresh_mentor_matching_on_m2m_change(sender, instance, action, reverse, **kwargs):
+    if sender not in MENTOR_MATCH_M2M_SENDERS or action not in ("post_add", "post_remove", "post_clear"):
+        return
+
+    if reverse or _is_mentor(instance.user_id):
+        _queue_refresh()
+
+
+def _queue_card_refresh(user_ids):
+    user_ids = set(MentorProfile.objects.filter(user_id__in=user_ids).values_list("user_id", flat=True))
+    if user_ids:
+        transaction.on_commit(lambda: refresh_mentor_cards(user_ids))
+
+
+@receiver(post_save, sender=CustomUser)
+def refresh_mentor_card_on_user_save(sender, instance, **kwargs):
+    if instance.is_mentor or instance.is_mentor_profile_active:
+        _queue_card_refresh([instance.id])
+
+
+@receiver(post_save, sender=MentorProfile)
+@receiver(post_save, sender=MemberProfile)
+@receiver(post_save, sender=UserProfile)
+@receiver(post_save, sender=MentorshipProgramProfile)
+def refresh_mentor_card_on_profile_save(sender, instance, **kwargs):
+    _queue_card_refresh([instance.user_id])
+
+
+@receiver(m2m_changed)
+def refresh_mentor_card_on_m2m_change(sender, instance, action, reverse, model, pk_set, **kwargs):
+    if sender not in MENTOR_CARD_M2M_SENDERS or action not in ("post_add", "post_remove", "post_clear"):
+        return
+
+    if not reverse:
+        _queue_card_refresh([instance.user_id])
+    elif pk_set:
+        # e.g. skill.memberprofile_set.add(...), pk_set holds the profiles
+        _queue_card_refresh(model.objects.filter(pk__in=pk_set).values_list("user_id", flat=True))
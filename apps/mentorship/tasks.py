@@ -0,0 +1,9 @@
+from celery import shared_task
+
+from apps.mentorship.directory import refresh_mentor_cards
+
+
+@shared_task
+def rebuild_mentor_directory_task():
+    """Rebuild every mentor directory card, picking up renamed skills, roles and support areas."""
+    return refresh_mentor_cards()
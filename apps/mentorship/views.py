@@ -1,8 +1,6 @@
 import logging
 from datetime import datetime
 
-from django.db.models import Q, Count
-from django.core.cache import cache
 from django.utils import timezone
 from rest_framework import generics, viewsets, status, mixins
 from rest_framework.decorators import action, api_view, permission_classes
@@ -20,6 +18,8 @@ from apps.mentorship.models import (
     MentorSupportAreas,
     MenteeProfile,
 )
+from apps.mentorship.directory import get_mentor_cards
+from apps.mentorship.matching import mentor_match_engine
 from apps.mentorship.serializer import (
     ApplicationQuestionSerializer,
     ApplicationAnswersSerializer,
@@ -33,6 +33,12 @@ from utils.helper import generate_random_password
 logger = logging.getLogger(__name__)
 
 
+def _get_id_params(request, name):
+    """Ids given as ?name=1&name=2 or ?name=1,2"""
+    values = request.query_params.getlist(name, [])
+    return [int(value) for values_list in values for value in values_list.split(",") if value.strip()]
+
+
 class MentorListView(APIView):
     """
     View to list all mentors or create a new mentor.
@@ -42,6 +48,8 @@ class MentorListView(APIView):
 
     queryset = MentorProfile.objects.all()
     serializer_class = MentorProfileSerializer
+    # The directory read, plus the token lookup and refresh
+    query_budget = {"GET": 3}
 
     @permission_classes([IsAuthenticated])
     def get(self, request, format=None):
@@ -52,6 +60,9 @@ class MentorListView(APIView):
         if no specific parameters are provided. If an ID or other identifier is provided as a parameter, it returns
         the details of the specified mentor.
 
+        The list can be filtered with ?skills=, ?roles= and ?support_areas= ids, each keeping
+        the mentors with any of them, and ?search= on names, skills, roles and support areas.
+
         Args:
             request (HttpRequest or Request): The request object containing the HTTP headers.
             *args: Variable length argument list.
@@ -65,9 +76,18 @@ class MentorListView(APIView):
             Http404: If a specific mentor is requested but does not exist.
             ValidationError: If the request contains invalid parameters.
         """
-        mentors = MentorProfile.objects.filter(user__is_mentor_profile_active=True)
-        serializer = MentorProfileSerializer(mentors, many=True)
-        return Response(serializer.data)
+        # Served from the denormalized directory, one query whatever the number of mentors
+        try:
+            cards = get_mentor_cards(
+                skill_ids=_get_id_params(request, "skills"),
+                role_ids=_get_id_params(request, "roles"),
+                support_area_ids=_get_id_params(request, "support_areas"),
+                search=request.query_params.get("search"),
+            )
+        except ValueError:
+            return Response({"status": False, "error": "skills, roles and support_areas must be ids"},
+                            status=status.HTTP_400_BAD_REQUEST)
+        return Response(cards)
 
     def post(self, request, format=None):
         """
@@ -690,42 +710,17 @@ def get_top_mentor_match(request):
     """
     Retrieve the top matching mentor profile for the authenticated user.
 
-    This function filters mentor profiles based on shared skills, roles, and departments
-    with the authenticated user's profile. It then scores and ranks the mentors based on
-    the number of matches in these categories.
+    Mentors are scored by the in-memory mentor match engine on shared skills, roles,
+    departments, commitment level and values, see apps/mentorship/matching.py.
 
     Returns:
         Response: A dictionary containing the status and the top matching mentor's serialized data.
     """
     try:
-        # Use caching to store user profile for 15 minutes
-        cache_key = f'user_profile_{request.user.id}'
-        talent_profile = cache.get(cache_key)
-        if not talent_profile:
-            talent_profile = MemberProfile.objects.select_related('user').prefetch_related(
-                'skills', 'role', 'department'
-            ).get(user=request.user.id)
-            cache.set(cache_key, talent_profile, 60 * 15)
-
-        # Extract skills, roles, and departments IDs
-        talent_skills_ids = list(talent_profile.skills.values_list('id', flat=True))
-        talent_roles_ids = list(talent_profile.role.values_list('id', flat=True))
-        talent_departments_ids = list(talent_profile.department.values_list('id', flat=True))
-
-        # Create a combined query for filtering
-        combined_query = Q(skills__id__in=talent_skills_ids) | \
-                         Q(role__id__in=talent_roles_ids) | \
-                         Q(department__id__in=talent_departments_ids)
-
-        # Filter, annotate, and order mentor profiles
-        top_mentor = MemberProfile.objects.filter(
-            user__is_mentor=True,
-            user__is_mentor_profile_active=True
-        ).filter(combined_query).annotate(
-            score=Count('skills', filter=Q(skills__id__in=talent_skills_ids)) +
-                  Count('role', filter=Q(role__id__in=talent_roles_ids)) +
-                  Count('department', filter=Q(department__id__in=talent_departments_ids))
-        ).order_by('-score').first()
+        top_matches = mentor_match_engine.top_matches(request.user.id, k=1)
+        top_mentor = MentorProfile.objects.select_related('user').filter(
+            id=top_matches[0][0]
+        ).first() if top_matches else None
 
         if top_mentor:
             serialized_mentor = MentorProfileSerializer(top_mentor).data
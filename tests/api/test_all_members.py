@@ -0,0 +1,89 @@
+import pytest
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from apps.company.models import CompanyProfile, Industries, Roles, Skill
+from apps.core.models import CustomUser, PronounsIdentities
+from apps.core.serializers_member import FullTalentProfileSerializer
+from apps.member.models import MemberProfile
+
+
+@pytest.mark.usefixtures("locmem_cache", "mute_profile_signal_tasks")
+class AllMembersTestCase(TestCase):
+    def setUp(self):
+        self.skill = Skill.objects.create(name="Python")
+        self.role = Roles.objects.create(name="Engineer")
+        self.pronouns = PronounsIdentities.objects.create(name="they/them")
+        self.company = CompanyProfile.objects.create(company_name="Acme")
+        self.company.industries.add(Industries.objects.create(name="Tech"))
+
+        self.viewer = CustomUser.objects.create_user(email="viewer@example.com", password="test-password",
+                                                     first_name="View", last_name="Er")
+        self.client = APIClient()
+        self.client.force_authenticate(self.viewer)
+
+    def add_members(self, count):
+        for _ in range(count):
+            number = CustomUser.objects.count()
+            user = CustomUser.objects.create_user(email=f"member{number}@example.com", password="test-password",
+                                                  first_name="Member", last_name=str(number))
+            user.user.skills.add(self.skill)
+            user.user.role.add(self.role)
+            user.userprofile.identity_pronouns.add(self.pronouns)
+            self.company.current_employees.add(user)
+
+    def count_page_queries(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get("/app/member/all/", {"limit": 100})
+        self.assertEqual(response.status_code, 200)
+        return len(queries), response.data["members"]
+
+    def test_page_query_count_is_constant(self):
+        self.add_members(2)
+        small_page_queries, members = self.count_page_queries()
+        self.assertEqual(members["count"], 3)
+
+        self.add_members(8)
+        large_page_queries, members = self.count_page_queries()
+        self.assertEqual(members["count"], 11)
+
+        self.assertEqual(small_page_queries, large_page_queries)
+
+    def test_list_matches_single_member_serialization(self):
+        self.add_members(1)
+        _, members = self.count_page_queries()
+
+        member = MemberProfile.objects.get(user__email="member1@example.com")
+        listed = next(result for result in members["results"] if result["id"] == member.id)
+        self.assertEqual(listed, FullTalentProfileSerializer(member).data)
+        self.assertEqual(listed["company_details"]["industries"], ["Tech"])
+        self.assertEqual(listed["talent_profile"]["skills"], ["Python"])
+
+    def test_cursor_pages_walk_every_member_once_without_counting(self):
+        self.add_members(6)
+        seen = []
+        url, params = "/app/member/all/", {"pagination": "cursor", "limit": 3}
+        while url:
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(url, params)
+            self.assertFalse(any("COUNT(" in query["sql"] for query in queries))
+            members = response.data["members"]
+            self.assertNotIn("count", members)
+            seen += [member["id"] for member in members["results"]]
+            url, params = members["next"], None
+
+        self.assertEqual(seen, list(MemberProfile.objects.order_by("created_at", "id").values_list("id", flat=True)))
+
+    def test_cursor_page_returns_cached_count_when_asked(self):
+        self.add_members(2)
+
+        response = self.client.get("/app/member/all/", {"pagination": "cursor", "with_count": "true"})
+
+        self.assertEqual(response.data["members"]["count"], 3)
+
+    def test_invalid_cursor_is_not_found(self):
+        response = self.client.get("/app/member/all/", {"cursor": "not-a-cursor"})
+
+        self.assertEqual(response.status_code, 404)
@@ -0,0 +1,52 @@
+from unittest.mock import patch
+
+import pytest
+from django.core.cache import cache
+from django.db import DatabaseError
+from django.test import TestCase
+
+from apps.company.models import CompanyProfile, Job, Skill
+from apps.core.models import CustomUser
+from apps.core.stats import (
+    APP_STATS_CACHE_KEY, APP_STATS_REFRESH_LOCK_KEY, get_counts, get_top_items, refresh_app_stats
+)
+from apps.member.models import MemberProfile
+
+
+@pytest.mark.usefixtures("locmem_cache", "mute_profile_signal_tasks")
+class AppStatsTestCase(TestCase):
+    def setUp(self):
+        company = CompanyProfile.objects.create(company_name="Stats Inc")
+        for number, job_status in enumerate((Job.ACTIVE, Job.ACTIVE, Job.CLOSED)):
+            Job.objects.create(job_title=f"Job {number}", url=f"https://example.com/{number}",
+                               parent_company=company, status=job_status)
+
+        self.python = Skill.objects.create(name="Python")
+        self.sql = Skill.objects.create(name="SQL")
+        for number in range(3):
+            user = CustomUser.objects.create_user(email=f"member{number}@example.com", password="test-password",
+                                                  first_name="Test", last_name="User", is_member=True)
+            MemberProfile.objects.get(user=user).skills.add(self.python, *([self.sql] if number == 0 else []))
+
+    def test_counts_run_in_one_query(self):
+        with self.assertNumQueries(1):
+            counts = get_counts()
+
+        self.assertEqual((counts["open_jobs"], counts["closed_jobs"], counts["new_jobs"]), (2, 1, 3))
+        self.assertEqual(counts["active_members"], 3)
+
+    def test_top_items_are_grouped_most_popular_first(self):
+        top_items = get_top_items()
+
+        self.assertEqual(top_items["skills"], [{"name": "Python", "count": 3}, {"name": "SQL", "count": 1}])
+        self.assertEqual(top_items["roles"], [])
+
+    def test_failed_query_keeps_the_last_snapshot(self):
+        snapshot = refresh_app_stats()
+
+        with patch("apps.core.stats.get_top_items", side_effect=DatabaseError("connection lost")):
+            with self.assertRaises(DatabaseError):
+                refresh_app_stats()
+
+        self.assertEqual(cache.get(APP_STATS_CACHE_KEY), snapshot)
+        self.assertIsNone(cache.get(APP_STATS_REFRESH_LOCK_KEY))
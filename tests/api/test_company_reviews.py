@@ -0,0 +1,99 @@
+import hashlib
+import hmac
+import json
+from unittest.mock import patch
+
+import pytest
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from apps.company.models import CompanyProfile, CompanyReviewSummary
+from apps.company.reviews import refresh_review_summaries, store_company_reviews
+from apps.core.models import CustomUser
+
+WEBHOOK_URL = "/company-profile/info/reviews/webhook/"
+
+
+@pytest.mark.usefixtures("mute_profile_signal_tasks")
+@override_settings(OPEN_DOORS_WEBHOOK_SECRET="webhook-secret")
+class CompanyReviewStoreTestCase(TestCase):
+    def setUp(self):
+        self.company = CompanyProfile.objects.create(company_name="Reviewed", mission="Build things")
+        self.client = APIClient()
+
+    def post_webhook(self, payload, secret="webhook-secret"):
+        body = json.dumps(payload).encode()
+        signature = hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+        return self.client.post(WEBHOOK_URL, body, content_type="application/json",
+                                HTTP_X_OPEN_DOORS_SIGNATURE=f"sha256={signature}")
+
+    def test_webhook_stores_reviews_with_their_aggregates(self):
+        response = self.post_webhook({"company_id": self.company.id,
+                                      "reviews": [{"rating": 4}, {"rating": 5}, {"title": "No rating"}]})
+
+        self.assertEqual(response.status_code, 202)
+        summary = CompanyReviewSummary.objects.get(company=self.company)
+        self.assertEqual(summary.review_count, 3)
+        self.assertEqual(summary.average_rating, 4.5)
+
+    def test_webhook_rejects_bad_signature(self):
+        response = self.post_webhook({"company_id": self.company.id, "reviews": []}, secret="wrong")
+
+        self.assertEqual(response.status_code, 403)
+        self.assertFalse(CompanyReviewSummary.objects.exists())
+
+    def test_webhook_rejects_non_integer_company_id(self):
+        for company_id in ("abc", None, [self.company.id]):
+            with self.subTest(company_id=company_id):
+                response = self.post_webhook({"company_id": company_id, "reviews": []})
+
+                self.assertEqual(response.status_code, 400)
+        self.assertFalse(CompanyReviewSummary.objects.exists())
+
+    @patch("apps.company.views_company.refresh_company_reviews_task")
+    def test_webhook_without_reviews_queues_a_refresh(self, refresh_company_reviews_task):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.post_webhook({"company_id": self.company.id})
+
+        self.assertEqual(response.status_code, 202)
+        refresh_company_reviews_task.delay.assert_called_once_with([self.company.id])
+
+    @patch("apps.company.reviews.fetch_company_reviews")
+    def test_refresh_keeps_stored_reviews_when_fetch_fails(self, fetch_company_reviews):
+        other = CompanyProfile.objects.create(company_name="Other")
+        store_company_reviews({self.company.id: [{"rating": 1}], other.id: [{"rating": 2}]})
+
+        def fetch(company_id, *args, **kwargs):
+            if company_id == other.id:
+                raise ConnectionError("Open Doors is down")
+            return [{"rating": 3}, {"rating": 5}]
+        fetch_company_reviews.side_effect = fetch
+
+        self.assertEqual(refresh_review_summaries(), {"refreshed": 1, "errors": 1})
+        self.assertEqual(CompanyReviewSummary.objects.get(company=self.company).average_rating, 4)
+        self.assertEqual(CompanyReviewSummary.objects.get(company=other).reviews, [{"rating": 2}])
+
+    @override_settings(OPEN_DOORS_SERVICE_TOKEN="service-token")
+    @patch("apps.company.reviews.fetch_company_reviews")
+    def test_refresh_authenticates_with_the_service_token(self, fetch_company_reviews):
+        fetch_company_reviews.return_value = {"detail": "No reviews yet"}
+
+        refresh_review_summaries([self.company.id])
+
+        self.assertEqual(fetch_company_reviews.call_args.args[:2], (self.company.id, "Bearer service-token"))
+        summary = CompanyReviewSummary.objects.get(company=self.company)
+        self.assertEqual((summary.reviews, summary.review_count), ({"detail": "No reviews yet"}, 0))
+
+    @patch("apps.company.views_company.fetch_company_reviews")
+    def test_company_page_reads_stored_reviews(self, fetch_company_reviews):
+        store_company_reviews({self.company.id: [{"rating": 5}]})
+        user = CustomUser.objects.create_user(email="reviews@example.com", password="test-password",
+                                              first_name="Test", last_name="User")
+        self.client.force_authenticate(user)
+
+        response = self.client.get(f"/company-profile/info/{self.company.id}/")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["companyReview"], [{"rating": 5}])
+        self.assertEqual(response.data["company"]["reviews"], [{"rating": 5}])
+        fetch_company_reviews.assert_not_called()
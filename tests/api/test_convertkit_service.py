@@ -0,0 +1,88 @@
+from unittest.mock import patch, MagicMock
+
+import pytest
+import requests
+from django.test import SimpleTestCase
+
+from utils.convertkit_service import ConvertKitService
+from utils.rate_limit_utils import SharedRateLimiter
+
+
+def make_response(status_code, payload=None, headers=None):
+    response = MagicMock(status_code=status_code, headers=headers or {})
+    response.json.return_value = payload or {}
+    if status_code >= 400:
+        response.raise_for_status.side_effect = requests.exceptions.HTTPError(response=response)
+    return response
+
+
+@pytest.mark.usefixtures("locmem_cache")
+@patch("utils.convertkit_service.time.sleep")
+@patch("utils.convertkit_service._rate_limiter", SharedRateLimiter("test", limit=10000, window_seconds=60))
+@patch("utils.convertkit_service._session")
+class ConvertKitServiceTestCase(SimpleTestCase):
+    def test_subscriber_id_is_cached(self, session, sleep):
+        session.get.return_value = make_response(200, {"subscribers": [{"id": 42}]})
+        service = ConvertKitService()
+
+        self.assertEqual(service._get_subscriber_id("Member@example.com"), 42)
+        self.assertEqual(service._get_subscriber_id("member@example.com"), 42)
+        self.assertEqual(session.get.call_count, 1)
+        self.assertEqual(session.get.call_args.kwargs["params"]["email_address"], "Member@example.com")
+
+    def test_missing_subscriber_is_not_cached(self, session, sleep):
+        session.get.return_value = make_response(200, {"subscribers": []})
+        service = ConvertKitService()
+
+        self.assertIsNone(service._get_subscriber_id("member@example.com"))
+        self.assertIsNone(service._get_subscriber_id("member@example.com"))
+        self.assertEqual(session.get.call_count, 2)
+
+    def test_rate_limited_call_is_retried_after_retry_after(self, session, sleep):
+        session.post.side_effect = [make_response(429, headers={"Retry-After": "7"}), make_response(200)]
+
+        ConvertKitService().add_tag("member@example.com", 1)
+
+        self.assertEqual(session.post.call_count, 2)
+        self.assertGreaterEqual(sleep.call_args.args[0], 7)
+
+    def test_client_errors_are_not_retried(self, session, sleep):
+        session.post.return_value = make_response(404)
+
+        with self.assertRaises(requests.exceptions.HTTPError):
+            ConvertKitService().add_tag("member@example.com", 1)
+        self.assertEqual(session.post.call_count, 1)
+
+
+@pytest.mark.usefixtures("locmem_cache")
+class SharedRateLimiterTestCase(SimpleTestCase):
+    def setUp(self):
+        self.now = 600.0
+
+        def sleep(seconds):
+            self.now += seconds
+
+        for name, side_effect in (("time", lambda: self.now), ("sleep", sleep)):
+            patcher = patch(f"utils.rate_limit_utils.time.{name}", side_effect=side_effect)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_processes_share_the_limit(self):
+        # Two limiters stand in for two worker processes, 70 per minute is 10 per 10 second slot
+        first, second = (SharedRateLimiter("shared", limit=70, window_seconds=60) for _ in range(2))
+
+        waits = [limiter.acquire() for limiter in (first, second) * 5]
+        waits.append(second.acquire())
+
+        self.assertEqual(waits[:10], [0] * 10)
+        self.assertGreaterEqual(waits[10], 10)
+        self.assertGreaterEqual(self.now, 610)
+
+    def test_no_rolling_window_exceeds_the_limit(self):
+        limiter = SharedRateLimiter("rolling", limit=120, window_seconds=60)
+        call_times = []
+        for _ in range(300):
+            limiter.acquire()
+            call_times.append(self.now)
+
+        self.assertLessEqual(max(sum(1 for t in call_times if start <= t < start + 60) for start in call_times), 120)
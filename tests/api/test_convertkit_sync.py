@@ -0,0 +1,86 @@
+from unittest.mock import patch
+
+import pytest
+from django.test import TestCase
+
+from apps.company.models import Skill
+from apps.core.convertkit_sync import sync_all_convertkit_tags
+from apps.core.tasks import queue_convertkit_tags_update, update_convertkit_tags_task, get_convertkit_update_metrics
+from apps.core.models import CustomUser, EmailTags, UserProfile
+from apps.member.models import MemberProfile
+
+
+class FakeConvertKitService:
+    def __init__(self, subscribers_by_tag):
+        self.subscribers_by_tag = subscribers_by_tag
+        self.calls = []
+
+    def list_tag_subscriber_emails(self, tag_id):
+        self.calls.append(("list", tag_id))
+        return iter(self.subscribers_by_tag.get(tag_id, []))
+
+    def add_tag(self, email, tag_id):
+        self.calls.append(("add", email, tag_id))
+
+    def remove_tag(self, email, tag_id):
+        self.calls.append(("remove", email, tag_id))
+
+
+@pytest.mark.usefixtures("locmem_cache", "mute_profile_signal_tasks")
+class ConvertKitBulkSyncTestCase(TestCase):
+    def setUp(self):
+        EmailTags.objects.create(name="Python", type="skill", convert_tag_kit_id=1)
+        EmailTags.objects.create(name="SQL", type="skill", convert_tag_kit_id=2)
+        EmailTags.objects.create(name="marketing_events", type="notification", convert_tag_kit_id=3)
+
+        self.user = CustomUser.objects.create_user(email="sync@example.com", password="test-password",
+                                                   first_name="Test", last_name="User")
+        MemberProfile.objects.get(user=self.user).skills.add(Skill.objects.create(name="Python"))
+        UserProfile.objects.filter(user=self.user).update(marketing_events=False)
+
+    def test_only_differences_are_pushed(self):
+        service = FakeConvertKitService({2: ["sync@example.com"], 3: ["SYNC@example.com"]})
+
+        stats = sync_all_convertkit_tags(convertkit_service=service)
+
+        pushes = sorted(call for call in service.calls if call[0] != "list")
+        self.assertEqual(pushes, [("add", "sync@example.com", 1), ("remove", "sync@example.com", 2),
+                                  ("remove", "sync@example.com", 3)])
+        self.assertEqual(stats, {"users_updated": 1, "tags_added": 1, "tags_removed": 2, "errors": 0})
+
+    def test_second_run_uses_snapshot_and_pushes_nothing(self):
+        sync_all_convertkit_tags(convertkit_service=FakeConvertKitService({2: ["sync@example.com"]}))
+        service = FakeConvertKitService({})
+
+        stats = sync_all_convertkit_tags(convertkit_service=service)
+
+        self.assertEqual(service.calls, [])
+        self.assertEqual(stats["users_updated"], 0)
+
+    def test_refreshed_snapshot_drops_tags_removed_in_convertkit(self):
+        sync_all_convertkit_tags(convertkit_service=FakeConvertKitService({}))
+        # The first sync added Python, which has since been removed in ConvertKit
+        service = FakeConvertKitService({})
+
+        stats = sync_all_convertkit_tags(refresh_snapshot=True, convertkit_service=service)
+
+        self.assertIn(("add", "sync@example.com", 1), service.calls)
+        self.assertEqual(stats["tags_added"], 1)
+
+
+@pytest.mark.usefixtures("locmem_cache")
+class ConvertKitDebounceTestCase(TestCase):
+    @patch("apps.core.tasks.process_user")
+    @patch("apps.core.tasks.update_convertkit_tags_task.apply_async")
+    def test_only_last_update_in_window_runs(self, apply_async, process_user):
+        user = CustomUser.objects.create_user(email="debounce@example.com", password="test-password",
+                                              first_name="Test", last_name="User")
+        for _ in range(3):
+            queue_convertkit_tags_update(user.id)
+
+        for call in apply_async.call_args_list:
+            args, kwargs = call.args
+            update_convertkit_tags_task(*args, **kwargs)
+
+        self.assertEqual(process_user.call_count, 1)
+        self.assertEqual(get_convertkit_update_metrics(), {"requested": 3, "coalesced": 2, "run": 1})
@@ -0,0 +1,56 @@
+import pytest
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from apps.company.management.commands.pull_jobs import NameLookup
+from apps.company.models import CompanyProfile, Skill
+from apps.core.models import CustomUser
+
+
+@pytest.mark.usefixtures("locmem_cache", "mute_profile_signal_tasks")
+class DropdownDataTestCase(TestCase):
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(email="dropdown@example.com", password="test-password",
+                                                   first_name="Test", last_name="User")
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        Skill.objects.create(name="Python")
+
+    def test_unchanged_data_returns_not_modified(self):
+        response = self.client.get("/app/details/", {"fields": "job_skills"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["job_skills"][0]["name"], "Python")
+
+        with self.assertNumQueries(0):
+            response = self.client.get("/app/details/", {"fields": "job_skills"},
+                                       HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(response.status_code, 304)
+
+    def test_saving_reference_data_changes_etag(self):
+        etag = self.client.get("/app/details/", {"fields": "job_skills"})["ETag"]
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Skill.objects.create(name="SQL")
+
+        response = self.client.get("/app/details/", {"fields": "job_skills"}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([skill["name"] for skill in response.data["job_skills"]], ["Python", "SQL"])
+
+    def test_companies_are_searchable_and_paginated(self):
+        for name in ("Acme", "Acme Labs", "Globex"):
+            CompanyProfile.objects.create(company_name=name)
+
+        response = self.client.get("/app/details/companies/", {"search": "acme", "limit": 1})
+
+        self.assertEqual(response.data["count"], 2)
+        self.assertEqual([company["company_name"] for company in response.data["results"]], ["Acme"])
+
+    def test_bulk_created_lookup_rows_change_etag(self):
+        etag = self.client.get("/app/details/", {"fields": "job_skills"})["ETag"]
+
+        with self.captureOnCommitCallbacks(execute=True):
+            NameLookup(Skill).ensure(["SQL"])
+
+        response = self.client.get("/app/details/", {"fields": "job_skills"}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([skill["name"] for skill in response.data["job_skills"]], ["Python", "SQL"])
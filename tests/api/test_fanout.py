@@ -0,0 +1,77 @@
+import threading
+import time
+from unittest.mock import patch
+
+import pytest
+from django.test import SimpleTestCase, TestCase
+from rest_framework.test import APIClient
+
+from apps.company.models import CompanyProfile
+from apps.company.reviews import store_company_reviews
+from apps.core.models import CustomUser
+from utils.fanout_utils import fan_out, FanOutCall
+
+
+class FanOutTestCase(SimpleTestCase):
+    def test_calls_run_concurrently(self):
+        barrier = threading.Barrier(2, timeout=1)
+
+        results = fan_out({
+            "first": FanOutCall(barrier.wait, timeout=2),
+            "second": FanOutCall(barrier.wait, timeout=2),
+        })
+
+        self.assertEqual(sorted(results.values()), [0, 1])
+
+    def test_missed_deadline_resolves_to_default(self):
+        started_at = time.monotonic()
+
+        results = fan_out({
+            "slow": FanOutCall(time.sleep, 1, default="late", timeout=0.1),
+            "fast": FanOutCall(lambda: "done", timeout=0.1),
+        })
+
+        self.assertEqual(results, {"slow": "late", "fast": "done"})
+        self.assertLess(time.monotonic() - started_at, 0.5)
+
+    def test_failed_call_does_not_fail_the_others(self):
+        def fail():
+            raise ConnectionError("upstream is down")
+
+        results = fan_out({
+            "failed": FanOutCall(fail, default={}),
+            "failed_without_default": FanOutCall(fail),
+            "ok": FanOutCall(lambda value: value * 2, 21),
+        })
+
+        self.assertEqual(results, {"failed": {}, "failed_without_default": None, "ok": 42})
+
+
+@pytest.mark.usefixtures("mute_profile_signal_tasks")
+class CompanyDetailFanOutTestCase(TestCase):
+    def setUp(self):
+        self.company = CompanyProfile.objects.create(company_name="Partial", mission="Build things",
+                                                     talent_choice_account=True)
+        store_company_reviews({self.company.id: [{"rating": 4}]})
+        user = CustomUser.objects.create_user(email="fanout@example.com", password="test-password",
+                                              first_name="Test", last_name="User")
+        self.client = APIClient()
+        self.client.force_authenticate(user)
+
+    @patch("apps.company.views_company.fetch_talent_choice_details", side_effect=ConnectionError("down"))
+    def test_failed_upstream_yields_partial_page(self, fetch_talent_choice_details):
+        response = self.client.get(f"/company-profile/info/{self.company.id}/")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["talentChoice"], {})
+        self.assertEqual(response.data["companyReview"], [{"rating": 4}])
+        fetch_talent_choice_details.assert_called_once_with(str(self.company.id))
+
+    @patch("apps.company.views_company._pull_company_info_by_id", return_value=False)
+    def test_enrichment_gets_the_company_id(self, pull_company_info_by_id):
+        CompanyProfile.objects.filter(id=self.company.id).update(mission=None, talent_choice_account=False)
+
+        response = self.client.get(f"/company-profile/info/{self.company.id}/")
+
+        self.assertEqual(response.status_code, 200)
+        pull_company_info_by_id.assert_called_once_with(self.company.id)
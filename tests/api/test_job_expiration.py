@@ -0,0 +1,70 @@
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from apps.company.job_expiration import expire_old_jobs, get_job_expiration_metrics
+from apps.company.job_match_index import job_match_index
+from apps.company.models import CompanyProfile, Job, JobMatchIndex, Skill
+from apps.company.tasks import close_old_jobs
+
+
+@pytest.mark.usefixtures("locmem_cache")
+class JobExpirationTestCase(TestCase):
+    def setUp(self):
+        self.python = Skill.objects.create(name="Python")
+        company = CompanyProfile.objects.create(company_name="Expires Inc")
+        with self.captureOnCommitCallbacks(execute=True):
+            self.jobs = []
+            for number in range(5):
+                job = Job.objects.create(job_title=f"Job {number}", url=f"https://example.com/{number}",
+                                         parent_company=company, status=Job.ACTIVE)
+                job.skills.add(self.python)
+                self.jobs.append(job)
+        old, older, recent, _, closed = self.jobs
+        Job.objects.filter(id__in=[old.id, older.id, closed.id]).update(
+            created_at=timezone.now() - timedelta(days=120))
+        Job.objects.filter(id=recent.id).update(created_at=timezone.now() - timedelta(days=30))
+        Job.objects.filter(id=closed.id).update(status=Job.CLOSED)
+
+    def test_expires_only_old_active_jobs_in_chunks(self):
+        stats = close_old_jobs()
+
+        self.assertEqual(stats["expired"], 2)
+        expired_ids = set(Job.objects.filter(status=Job.EXPIRED).values_list("id", flat=True))
+        self.assertEqual(expired_ids, {self.jobs[0].id, self.jobs[1].id})
+        self.assertEqual(Job.objects.get(id=self.jobs[4].id).status, Job.CLOSED)
+
+        stats = expire_old_jobs(chunk_size=1)
+        self.assertEqual((stats["expired"], stats["chunks"]), (0, 0))
+
+    def test_expired_jobs_leave_the_match_index(self):
+        self.assertEqual(len(job_match_index.score(skill_ids=[self.python.id])), 5)
+
+        expire_old_jobs(chunk_size=1)
+
+        self.assertFalse(JobMatchIndex.objects.filter(job_id=self.jobs[0].id, is_active=True).exists())
+        scored_ids = {job_id for job_id, _ in job_match_index.score(skill_ids=[self.python.id])}
+        self.assertEqual(scored_ids, {self.jobs[2].id, self.jobs[3].id, self.jobs[4].id})
+
+    def test_dry_run_only_counts(self):
+        stats = expire_old_jobs(dry_run=True)
+
+        self.assertEqual(stats["expired"], 2)
+        self.assertFalse(Job.objects.filter(status=Job.EXPIRED).exists())
+        self.assertEqual(get_job_expiration_metrics(), {"runs": 0, "expired": 0, "last_run": None})
+
+        expire_old_jobs()
+        metrics = get_job_expiration_metrics()
+        self.assertEqual((metrics["runs"], metrics["expired"]), (1, 2))
+
+    def test_closing_all_jobs_empties_the_match_index(self):
+        self.assertEqual(len(job_match_index.score(skill_ids=[self.python.id])), 5)
+
+        call_command("close_all_jobs", stdout=StringIO())
+
+        self.assertFalse(JobMatchIndex.objects.filter(is_active=True).exists())
+        self.assertEqual(job_match_index.score(skill_ids=[self.python.id]), [])
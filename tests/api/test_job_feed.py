@@ -0,0 +1,95 @@
+from unittest.mock import patch
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient, APIRequestFactory, force_authenticate
+
+from apps.company.models import CompanyProfile, Industries, Job, Skill
+from apps.company.serializers import JobFeedSerializer
+from apps.company.views_admin import JobViewSet
+from apps.core.models import CustomUser
+
+
+@pytest.mark.usefixtures("locmem_cache", "mute_profile_signal_tasks")
+class JobFeedTestCase(TestCase):
+    def setUp(self):
+        self.python = Skill.objects.create(name="Python")
+        self.tech = Industries.objects.create(name="Tech")
+
+    def add_jobs(self, count):
+        for _ in range(count):
+            number = Job.objects.count()
+            company = CompanyProfile.objects.create(company_name=f"Company {number}")
+            company.industries.add(self.tech)
+            job = Job.objects.create(job_title=f"Job {number}", url=f"https://example.com/{number}",
+                                     parent_company=company, status=Job.ACTIVE)
+            job.skills.add(self.python)
+
+    def serialize_feed(self):
+        with CaptureQueriesContext(connection) as queries:
+            data = JobFeedSerializer(JobFeedSerializer.setup_eager_loading(Job.objects.all()), many=True).data
+        return len(queries), data
+
+    @patch("apps.company.reviews.fetch_company_reviews")
+    def test_feed_makes_no_calls_and_constant_queries(self, fetch_company_reviews):
+        self.add_jobs(2)
+        small_feed_queries, _ = self.serialize_feed()
+        self.add_jobs(5)
+        large_feed_queries, data = self.serialize_feed()
+
+        self.assertEqual(small_feed_queries, large_feed_queries)
+        fetch_company_reviews.assert_not_called()
+        self.assertEqual(len(data), 7)
+        self.assertEqual(data[0]["parent_company"]["industries"], [{"id": self.tech.id, "name": "Tech"}])
+        self.assertNotIn("reviews", data[0]["parent_company"])
+
+    @patch("apps.company.reviews.fetch_company_reviews")
+    def test_reviews_endpoint_batches_and_stores(self, fetch_company_reviews):
+        fetch_company_reviews.side_effect = lambda company_id, *args, **kwargs: [{"company": company_id}]
+        first, second, third = (CompanyProfile.objects.create(company_name=f"Company {number}")
+                                for number in range(3))
+        user = CustomUser.objects.create_user(email="reviews@example.com", password="test-password",
+                                              first_name="Test", last_name="User")
+        client = APIClient()
+        client.force_authenticate(user)
+
+        response = client.get("/company-profile/info/reviews/", {"ids": f"{first.id},{second.id}"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["reviews"], {str(first.id): [{"company": first.id}],
+                                                    str(second.id): [{"company": second.id}]})
+
+        response = client.get("/company-profile/info/reviews/", {"ids": f"{second.id},{third.id},0"})
+        self.assertEqual(response.data["reviews"], {str(second.id): [{"company": second.id}],
+                                                    str(third.id): [{"company": third.id}], "0": []})
+        self.assertEqual(fetch_company_reviews.call_count, 3)
+
+        self.assertEqual(client.get("/company-profile/info/reviews/", {"ids": "a"}).status_code, 400)
+
+    def test_all_and_posted_jobs_page_with_their_own_cursors(self):
+        self.add_jobs(6)
+        user = CustomUser.objects.create_user(email="poster@example.com", password="test-password",
+                                              first_name="Test", last_name="User")
+        jobs = list(Job.objects.order_by("-created_at", "-id"))
+        for job in jobs[3:]:
+            job.created_by.add(user)
+        get_all_jobs = JobViewSet.as_view({"get": "get_all_jobs"})
+
+        def get_page(**params):
+            request = APIRequestFactory().get("/jobs/all-jobs/", {"pagination": "cursor", "limit": 2, **params})
+            force_authenticate(request, user)
+            return get_all_jobs(request).data
+
+        def cursor(page, param):
+            return parse_qs(urlparse(page["next"]).query)[param][0]
+
+        first = get_page()
+        second = get_page(cursor=cursor(first["all_jobs"], "cursor"),
+                          posted_cursor=cursor(first["posted_jobs"], "posted_cursor"))
+
+        for name, expected in (("all_jobs", jobs[:4]), ("posted_jobs", jobs[3:])):
+            walked = [job["id"] for page in (first, second) for job in page[name]["results"]]
+            self.assertEqual(walked, [job.id for job in expected])
+        self.assertIsNone(second["posted_jobs"]["next"])
@@ -0,0 +1,53 @@
+import pytest
+from django.test import TestCase
+
+from apps.company.job_match_index import job_match_index, rebuild_job_match_index
+from apps.company.models import CompanyProfile, Department, Job, JobMatchIndex, Roles, Skill
+
+
+@pytest.mark.usefixtures("locmem_cache")
+class JobMatchIndexTestCase(TestCase):
+    def setUp(self):
+        self.python = Skill.objects.create(name="Python")
+        self.django = Skill.objects.create(name="Django")
+        self.engineering = Department.objects.create(name="Engineering")
+        self.role = Roles.objects.create(name="Backend Engineer")
+        company = CompanyProfile.objects.create(company_name="Bob's Burgers")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.strong_match = Job.objects.create(job_title="Backend", url="https://example.com/1", parent_company=company,
+                                                   status=Job.ACTIVE, role=self.role)
+            self.strong_match.skills.add(self.python, self.django)
+            self.strong_match.department.add(self.engineering)
+            self.weak_match = Job.objects.create(job_title="Scripting", url="https://example.com/2", parent_company=company,
+                                                 status=Job.ACTIVE)
+            self.weak_match.nice_to_have_skills.add(self.python)
+            self.draft = Job.objects.create(job_title="Draft", url="https://example.com/3",
+                                            parent_company=company, status=Job.DRAFT)
+            self.draft.skills.add(self.python)
+
+    def test_scores_active_jobs_best_first(self):
+        scored_jobs = job_match_index.score(
+            skill_ids=[self.python.id, self.django.id], role_ids=[self.role.id], department_ids=[self.engineering.id]
+        )
+
+        self.assertEqual(scored_jobs, [(self.strong_match.id, 4), (self.weak_match.id, 1)])
+
+    def test_job_changes_update_the_index(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.weak_match.status = Job.CLOSED
+            self.weak_match.save()
+            self.draft.status = Job.ACTIVE
+            self.draft.save()
+
+        scored_jobs = job_match_index.score(skill_ids=[self.python.id])
+
+        self.assertEqual(scored_jobs, [(self.strong_match.id, 1), (self.draft.id, 1)])
+
+    def test_rebuild_picks_up_bulk_updates(self):
+        Job.objects.filter(id=self.strong_match.id).update(status=Job.CLOSED)
+
+        rebuild_job_match_index()
+
+        self.assertFalse(JobMatchIndex.objects.get(job=self.strong_match).is_active)
+        self.assertEqual(job_match_index.score(skill_ids=[self.python.id]), [(self.weak_match.id, 1)])
@@ -0,0 +1,93 @@
+import json
+from datetime import timedelta
+from unittest.mock import patch
+
+import pytest
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from apps.company.job_expiration import expire_old_jobs
+from apps.company.job_matches import compute_job_matches
+from apps.company.models import CompanyProfile, Job, Skill
+from apps.core.models import CustomUser
+from apps.member.models import MemberProfile
+
+ALL_JOBS_URL = "/company/new/jobs/all-jobs/"
+
+
+@pytest.mark.usefixtures("locmem_cache", "mute_profile_signal_tasks")
+class JobMatchesTestCase(TestCase):
+    def setUp(self):
+        self.python = Skill.objects.create(name="Python")
+        company = CompanyProfile.objects.create(company_name="Matches Inc")
+        with self.captureOnCommitCallbacks(execute=True):
+            for number in range(3):
+                job = Job.objects.create(job_title=f"Job {number}", url=f"https://example.com/{number}",
+                                         parent_company=company, status=Job.ACTIVE)
+                job.skills.add(self.python)
+
+        self.user = CustomUser.objects.create_user(email="matches@example.com", password="test-password",
+                                                   first_name="Test", last_name="User")
+        self.profile = MemberProfile.objects.get(user=self.user)
+        self.profile.skills.add(self.python)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    @patch("apps.company.job_matches.requests.post")
+    @patch("apps.company.tasks.compute_job_matches_task")
+    def test_serves_local_ranking_and_queues_matches_once(self, compute_job_matches_task, post):
+        for _ in range(2):
+            response = self.client.get(ALL_JOBS_URL, {"page": 1, "page_size": 2})
+
+            self.assertEqual(response.status_code, 200)
+            self.assertTrue(response.data["matches_pending"])
+            self.assertEqual(len(response.data["all_jobs"]), 2)
+
+        post.assert_not_called()
+        compute_job_matches_task.delay.assert_called_once_with(self.user.id, [1, 2, 3], 2)
+
+    @patch("apps.company.job_matches.request_talent_choice_matches")
+    def test_serves_precomputed_matches_of_each_page(self, request_talent_choice_matches):
+        request_talent_choice_matches.side_effect = (
+            lambda profile, jobs, page, total_pages: [{"page": page, "jobs": len(jobs)}]
+        )
+
+        self.assertEqual(compute_job_matches(self.user.id, [1, 2, 3], page_size=2), 2)
+
+        for page, jobs in ((1, 2), (2, 1)):
+            response = self.client.get(ALL_JOBS_URL, {"page": page, "page_size": 2})
+            self.assertFalse(response.data["matches_pending"])
+            self.assertEqual(response.data["all_jobs"], [{"page": page, "jobs": jobs}])
+
+    @override_settings(TALENT_CHOICE_SERVICE_TOKEN="service-token")
+    @patch("apps.company.job_matches.requests.post")
+    def test_matches_are_requested_with_the_service_token(self, post):
+        post.return_value.json.return_value = [{"ranked": True}]
+
+        compute_job_matches(self.user.id, [1])
+
+        self.assertEqual(json.loads(post.call_args.kwargs["data"])["header_token"], "Bearer service-token")
+
+    @patch("apps.company.job_matches.request_talent_choice_matches", return_value=[{"ranked": True}])
+    @patch("apps.company.tasks.compute_job_matches_task")
+    def test_profile_change_recomputes_matches_of_active_members(self, compute_job_matches_task, _):
+        compute_job_matches(self.user.id, [1])
+        self.assertFalse(self.client.get(ALL_JOBS_URL).data["matches_pending"])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.profile.skills.remove(self.python)
+
+        compute_job_matches_task.delay.assert_called_once_with(self.user.id, [1, 2, 3], 15)
+
+    def test_pages_skip_jobs_expired_in_bulk(self):
+        first_job = Job.objects.order_by("id").first()
+        Job.objects.filter(id=first_job.id).update(created_at=timezone.now() - timedelta(days=120))
+        expire_old_jobs()
+
+        response = self.client.get("/company/new/jobs/next-page/", {"page": 1, "page_size": 2})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data["jobs"]), 2)
+        self.assertNotIn(first_job.id, [job["id"] for job in response.data["jobs"]])
+        self.assertEqual(response.data["total_pages"], 1)
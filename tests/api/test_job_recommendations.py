@@ -0,0 +1,102 @@
+from unittest.mock import patch
+
+import pytest
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from apps.company.job_match_index import job_match_index
+from apps.company.job_recommendations import (
+    rebuild_job_recommendations, refresh_changed_job_recommendations, refresh_member_recommendations
+)
+from apps.company.models import CompanyProfile, Department, Job, JobRecommendation, Roles, Skill
+from apps.core.models import CustomUser
+from apps.member.models import MemberProfile
+
+
+@pytest.mark.usefixtures("locmem_cache", "mute_profile_signal_tasks")
+class JobRecommendationTestCase(TestCase):
+    def setUp(self):
+        self.python = Skill.objects.create(name="Python")
+        self.django = Skill.objects.create(name="Django")
+        self.engineering = Department.objects.create(name="Engineering")
+        self.role = Roles.objects.create(name="Backend Engineer")
+        self.company = CompanyProfile.objects.create(company_name="Recommends Inc")
+
+        self.strong_match = self.create_job("Backend", skills=[self.python, self.django], role=self.role,
+                                            departments=[self.engineering])
+        self.weak_match = self.create_job("Scripting", nice_to_have_skills=[self.python])
+        self.no_match = self.create_job("Design")
+
+        self.user = CustomUser.objects.create_user(email="recommend@example.com", password="test-password",
+                                                   first_name="Test", last_name="User")
+        self.profile = MemberProfile.objects.get(user=self.user)
+        self.profile.skills.add(self.python, self.django)
+        self.profile.role.add(self.role)
+        self.profile.department.add(self.engineering)
+
+    def create_job(self, title, skills=(), nice_to_have_skills=(), departments=(), role=None, job_status=Job.ACTIVE):
+        with self.captureOnCommitCallbacks(execute=True):
+            job = Job.objects.create(job_title=title, url=f"https://example.com/{title}", parent_company=self.company,
+                                     status=job_status, role=role)
+            job.skills.add(*skills)
+            job.nice_to_have_skills.add(*nice_to_have_skills)
+            job.department.add(*departments)
+        return job
+
+    def recommended(self):
+        return list(JobRecommendation.objects.filter(member=self.user).order_by("-score", "job_id").values_list(
+            "job_id", "score"))
+
+    def test_rebuild_scores_like_the_match_index(self):
+        rebuild_job_recommendations()
+
+        scored_jobs = job_match_index.score(skill_ids=[self.python.id, self.django.id], role_ids=[self.role.id],
+                                            department_ids=[self.engineering.id])
+        self.assertEqual(self.recommended(), scored_jobs)
+        self.assertEqual(JobRecommendation.objects.get(member=self.user, job=self.strong_match).reasons, {
+            "skills": sorted([self.python.id, self.django.id]), "nice_to_have_skills": [],
+            "departments": [self.engineering.id], "role": True, "level": False,
+        })
+
+    def test_published_and_closed_jobs_are_picked_up(self):
+        rebuild_job_recommendations()
+        new_job = self.create_job("Platform", skills=[self.django])
+        with self.captureOnCommitCallbacks(execute=True):
+            self.weak_match.status = Job.CLOSED
+            self.weak_match.save()
+
+        self.assertEqual(refresh_changed_job_recommendations(), 1)
+
+        self.assertEqual(self.recommended(), [(self.strong_match.id, 4), (new_job.id, 1)])
+
+    @patch("apps.member.signals.refresh_member_recommendations_task")
+    def test_profile_change_rescores_the_member(self, refresh_member_recommendations_task):
+        rebuild_job_recommendations()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.profile.role.remove(self.role)
+
+        refresh_member_recommendations_task.delay.assert_called_once_with([self.user.id])
+        refresh_member_recommendations(*refresh_member_recommendations_task.delay.call_args.args)
+        self.assertEqual(self.recommended(), [(self.strong_match.id, 3), (self.weak_match.id, 1)])
+
+    def test_feeds_read_the_recommendations(self):
+        rebuild_job_recommendations()
+        client = APIClient()
+        client.force_authenticate(self.user)
+
+        response = client.get("/company/new/jobs/recommendations/", {"limit": 1})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([(job["id"], job["score"]) for job in response.data["jobs"]], [(self.strong_match.id, 4)])
+        self.assertTrue(response.data["jobs"][0]["reasons"]["role"])
+
+        for limit in (0, -1):
+            response = client.get("/company/new/jobs/recommendations/", {"limit": limit})
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual([job["id"] for job in response.data["jobs"]], [self.strong_match.id])
+
+        with patch("apps.company.views_jobs.JobViewSet._find_best_match") as find_best_match:
+            response = client.get("/company/new/jobs/job-match/")
+        self.assertEqual(response.data["matching_job"]["id"], self.strong_match.id)
+        find_best_match.assert_not_called()
@@ -0,0 +1,74 @@
+import pytest
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from apps.company.models import Roles, Skill
+from apps.core.models import CustomUser
+from apps.member.models import MemberProfile
+from apps.mentorship.models import MentorProfile, MentorshipProgramProfile, MentorSupportAreas
+from apps.mentorship.serializer import MentorProfileSerializer
+
+
+@pytest.mark.usefixtures("locmem_cache", "mute_profile_signal_tasks")
+class MentorDirectoryTestCase(TestCase):
+    def setUp(self):
+        self.python = Skill.objects.create(name="Python")
+        self.design = Skill.objects.create(name="Design")
+        self.role = Roles.objects.create(name="Data Engineer")
+        self.career = MentorSupportAreas.objects.create(name="Career Change")
+
+        self.data_mentor = self._create_mentor("data@example.com", "Ada", skills=[self.python], roles=[self.role],
+                                               support_areas=[self.career])
+        self.design_mentor = self._create_mentor("design@example.com", "Grace", skills=[self.design])
+
+        viewer = CustomUser.objects.create_user(email="viewer@example.com", password="test-password",
+                                                first_name="View", last_name="Er")
+        self.client = APIClient()
+        self.client.force_authenticate(viewer)
+
+    def _create_mentor(self, email, first_name, skills=(), roles=(), support_areas=()):
+        with self.captureOnCommitCallbacks(execute=True):
+            user = CustomUser.objects.create_user(email=email, password="test-password", first_name=first_name,
+                                                  last_name="Mentor")
+            member_profile = MemberProfile.objects.get(user=user)
+            member_profile.skills.set(skills)
+            member_profile.role.set(roles)
+            program_profile = MentorshipProgramProfile.objects.create(user=user)
+            program_profile.mentor_support_areas.set(support_areas)
+            user.is_mentor = True
+            user.is_mentor_profile_active = True
+            user.save()
+            return MentorProfile.objects.create(user=user, mentor_status="active")
+
+    def get_mentor_ids(self, params=None):
+        response = self.client.get("/mentorship/", params)
+        self.assertEqual(response.status_code, 200)
+        return [card["id"] for card in response.data]
+
+    def test_list_is_one_query_and_matches_serializer(self):
+        with self.assertNumQueries(1):
+            response = self.client.get("/mentorship/")
+
+        self.assertEqual(response.data[0], MentorProfileSerializer(self.data_mentor).data)
+        self.assertEqual(len(response.data), 2)
+
+    def test_filters_and_search(self):
+        self.assertEqual(self.get_mentor_ids({"skills": self.python.id}), [self.data_mentor.id])
+        self.assertEqual(self.get_mentor_ids({"skills": f"{self.python.id},{self.design.id}"}),
+                         [self.data_mentor.id, self.design_mentor.id])
+        self.assertEqual(self.get_mentor_ids({"roles": self.role.id, "support_areas": self.career.id}),
+                         [self.data_mentor.id])
+        self.assertEqual(self.get_mentor_ids({"search": "grace"}), [self.design_mentor.id])
+        self.assertEqual(self.get_mentor_ids({"search": "career"}), [self.data_mentor.id])
+        self.assertEqual(self.client.get("/mentorship/", {"skills": "python"}).status_code, 400)
+
+    def test_cards_follow_profile_and_status_changes(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            MemberProfile.objects.get(user=self.design_mentor.user).skills.add(self.python)
+        self.assertEqual(self.get_mentor_ids({"skills": self.python.id}),
+                         [self.data_mentor.id, self.design_mentor.id])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.data_mentor.user.is_mentor_profile_active = False
+            self.data_mentor.user.save()
+        self.assertEqual(self.get_mentor_ids(), [self.design_mentor.id])
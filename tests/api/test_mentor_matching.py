@@ -0,0 +1,85 @@
+import pytest
+from django.contrib.auth.models import update_last_login
+from django.test import TestCase
+
+from apps.company.models import Department, Roles, Skill
+from apps.core.models import CustomUser
+from apps.member.models import MemberProfile
+from apps.mentorship.matching import mentor_match_engine, MENTOR_MATCH_CACHE_NAMESPACE, MENTOR_MATCH_CACHE_ID
+from apps.mentorship.models import MentorProfile
+from utils.cache_utils import get_cache_version
+
+
+@pytest.mark.usefixtures("locmem_cache", "mute_profile_signal_tasks")
+class MentorMatchEngineTestCase(TestCase):
+    def setUp(self):
+        self.python = Skill.objects.create(name="Python")
+        self.sql = Skill.objects.create(name="SQL")
+        self.role = Roles.objects.create(name="Data Engineer")
+        self.data = Department.objects.create(name="Data")
+
+        self.mentee = self._create_member("mentee@example.com", skills=[self.python, self.sql], roles=[self.role],
+                                          departments=[self.data])
+        self.best_mentor = self._create_mentor("best@example.com", skills=[self.python, self.sql], roles=[self.role])
+        self.other_mentor = self._create_mentor("other@example.com", skills=[self.python])
+
+    def _create_member(self, email, skills=(), roles=(), departments=()):
+        user = CustomUser.objects.create_user(email=email, password="test-password", first_name="Test",
+                                              last_name="User")
+        member_profile = MemberProfile.objects.get(user=user)
+        member_profile.skills.set(skills)
+        member_profile.role.set(roles)
+        member_profile.department.set(departments)
+        return user
+
+    def _create_mentor(self, email, **features):
+        with self.captureOnCommitCallbacks(execute=True):
+            user = self._create_member(email, **features)
+            user.is_mentor = True
+            user.is_mentor_profile_active = True
+            user.save()
+            return MentorProfile.objects.create(user=user, mentor_status="active")
+
+    def test_returns_top_k_mentors_best_first(self):
+        top_matches = mentor_match_engine.top_matches(self.mentee.id, k=2)
+
+        self.assertEqual([mentor_id for mentor_id, _ in top_matches], [self.best_mentor.id, self.other_mentor.id])
+        self.assertEqual(top_matches[0][1], 3)
+
+    def test_paused_mentor_is_no_longer_matched(self):
+        mentor_match_engine.top_matches(self.mentee.id)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.best_mentor.user.is_mentor_profile_active = False
+            self.best_mentor.user.save()
+
+        top_matches = mentor_match_engine.top_matches(self.mentee.id, k=2)
+        self.assertEqual([mentor_id for mentor_id, _ in top_matches], [self.other_mentor.id])
+
+    def test_mentor_skill_change_refreshes_scores(self):
+        mentor_match_engine.top_matches(self.mentee.id)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            MemberProfile.objects.get(user=self.other_mentor.user).skills.add(self.sql)
+
+        top_matches = dict(mentor_match_engine.top_matches(self.mentee.id, k=2))
+        self.assertEqual(top_matches[self.other_mentor.id], 2)
+
+    def test_demoted_mentor_is_no_longer_matched(self):
+        mentor_match_engine.top_matches(self.mentee.id)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.best_mentor.user.is_mentor = False
+            self.best_mentor.user.save()
+
+        top_matches = mentor_match_engine.top_matches(self.mentee.id, k=2)
+        self.assertEqual([mentor_id for mentor_id, _ in top_matches], [self.other_mentor.id])
+
+    def test_login_does_not_refresh_the_matrices(self):
+        mentor_match_engine.top_matches(self.mentee.id)
+        version = mentor_match_engine.version
+
+        with self.captureOnCommitCallbacks(execute=True):
+            update_last_login(None, self.best_mentor.user)
+
+        self.assertEqual(get_cache_version(MENTOR_MATCH_CACHE_NAMESPACE, MENTOR_MATCH_CACHE_ID), version)
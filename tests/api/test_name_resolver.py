@@ -0,0 +1,39 @@
+import pytest
+from django.test import TestCase
+
+from apps.company.models import Roles
+from apps.company.name_resolver import NameResolver
+from apps.core.util import process_roles
+
+
+@pytest.mark.usefixtures("locmem_cache")
+class NameResolverTestCase(TestCase):
+    def setUp(self):
+        self.engineer = Roles.objects.create(name="Software Engineer")
+        self.designer = Roles.objects.create(name="Product Designer")
+        self.resolver = NameResolver(Roles)
+
+    def test_resolves_closest_name(self):
+        self.assertEqual(self.resolver.resolve("Senior Software Engineer II"), (self.engineer.id, "Software Engineer"))
+        self.assertEqual(self.resolver.resolve("product  designer"), (self.designer.id, "Product Designer"))
+
+    def test_min_score_rejects_weak_matches(self):
+        self.assertIsNone(self.resolver.resolve("Accountant", min_score=90))
+
+    def test_repeated_queries_are_memoized(self):
+        self.resolver.resolve("Sofware Engineer")
+
+        with self.assertNumQueries(0):
+            self.assertEqual(self.resolver.resolve("Sofware Engineer"), (self.engineer.id, "Software Engineer"))
+
+    def test_new_names_are_picked_up(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            analyst = Roles.objects.create(name="Data Analyst")
+
+        self.assertEqual(self.resolver.resolve("data analyst"), (analyst.id, "Data Analyst"))
+
+    def test_profile_roles_reuse_near_identical_roles(self):
+        roles = process_roles(['Add "software engineer"', "Staff Accountant"])
+
+        self.assertEqual(roles[0], self.engineer)
+        self.assertEqual(roles[1].name, "Staff Accountant")
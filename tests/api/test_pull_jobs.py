@@ -0,0 +1,102 @@
+from unittest.mock import patch
+
+import pytest
+import spacy
+from django.test import TestCase
+
+from apps.company.management.commands.pull_jobs import JobIngestionPipeline
+from apps.company.models import CompanyProfile, Job, SalaryRange, Skill
+
+
+def posting(external_id, company_name="Acme", description="We build services in Python.", **fields):
+    return {
+        "id": external_id,
+        "created": "2024-06-01 00:00:00",
+        "title": "Backend Engineer",
+        "description": description,
+        "salary": "USD 50000-90000",
+        "employment_type": "Full-time",
+        "location": "Remote",
+        "url": f"https://example.com/jobs/{external_id}",
+        "company_name": company_name,
+        "company_url": "https://acme.example.com",
+        "company_id": 7,
+        "job_industries_collection": [{"job_industry_list": {"industry": "Software"}}],
+        **fields,
+    }
+
+
+@pytest.mark.usefixtures("locmem_cache")
+class JobIngestionPipelineTestCase(TestCase):
+    def setUp(self):
+        patcher = patch("apps.company.management.commands.pull_jobs.get_nlp", return_value=spacy.blank("en"))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.python = Skill.objects.create(name="Python")
+        for salary_range in ("40000", "60000", "100000"):
+            SalaryRange.objects.create(range=salary_range)
+
+    def ingest(self, pipeline, postings):
+        return pipeline.ingest(list(pipeline.parse((job_data, offset) for offset, job_data in enumerate(postings))))
+
+    def test_skips_existing_and_repeated_postings(self):
+        Job.objects.create(job_title="Imported", url="https://example.com/jobs/1", external_id="1",
+                           parent_company=CompanyProfile.objects.create(company_name="Acme"))
+        pipeline = JobIngestionPipeline()
+
+        created = self.ingest(pipeline, [posting(1), posting(2), posting(2), posting(3, created="2024-01-01 00:00:00")])
+
+        self.assertEqual(created, 1)
+        self.assertEqual(sorted(Job.objects.values_list("external_id", flat=True)), ["1", "2"])
+
+    def test_creates_lookup_rows_and_relations(self):
+        pipeline = JobIngestionPipeline()
+
+        self.ingest(pipeline, [posting(1), posting(2, company_name="Globex", description="No skills here.")])
+
+        acme = CompanyProfile.objects.get(company_name="Acme")
+        self.assertTrue(acme.is_unclaimed_account)
+        self.assertEqual(list(acme.industries.values_list("name", flat=True)), ["Software"])
+        job = Job.objects.get(external_id="1")
+        self.assertEqual(job.parent_company, acme)
+        self.assertIsNotNone(job.role_id)
+        self.assertEqual(list(job.skills.all()) + list(job.nice_to_have_skills.all()), [self.python])
+        self.assertEqual(Job.objects.get(external_id="2").parent_company.company_name, "Globex")
+
+    def test_salary_ranges_match_the_per_job_queries(self):
+        pipeline = JobIngestionPipeline()
+
+        self.ingest(pipeline, [posting(1)])
+
+        job = Job.objects.get(external_id="1")
+        self.assertEqual(job.min_compensation, SalaryRange.objects.filter(range__gte="50000").first())
+        self.assertEqual(job.max_compensation, SalaryRange.objects.filter(range__lte="90000").first())
+
+    def test_worker_processes_match_like_this_process(self):
+        postings = [(posting(number, description=description), number) for number, description in enumerate([
+            "We build services in Python.", "No skills here.", "About us\n• Nice to have: python", "PYTHON and more",
+        ])]
+
+        in_process = list(JobIngestionPipeline().parse(postings, batch_size=3))
+        in_workers = list(JobIngestionPipeline().parse(postings, workers=2, batch_size=1))
+
+        self.assertEqual(in_workers, in_process)
+        self.assertEqual([skills for _, skills, _ in in_workers], [
+            (["Python"], [], []), ([], [], []), ([], ["Python"], []), (["Python"], [], []),
+        ])
+
+    def test_failed_batch_rolls_back_and_can_be_retried(self):
+        pipeline = JobIngestionPipeline()
+        parsed = list(pipeline.parse([(posting(1, company_name="Initech"), 0)]))
+
+        with patch("apps.company.management.commands.pull_jobs.Job.objects.bulk_create",
+                   side_effect=RuntimeError("database went away")):
+            with self.assertRaises(RuntimeError):
+                pipeline.ingest(parsed)
+
+        self.assertFalse(CompanyProfile.objects.filter(company_name="Initech").exists())
+        self.assertNotIn("Initech", pipeline.companies.ids)
+        self.assertNotIn("1", pipeline.existing_external_ids)
+
+        self.assertEqual(pipeline.ingest(parsed), 1)
+        self.assertEqual(Job.objects.get(external_id="1").parent_company.company_name, "Initech")
@@ -0,0 +1,65 @@
+import pytest
+from django.http import HttpResponse
+from django.test import TestCase, RequestFactory, override_settings
+from rest_framework.test import APIClient
+
+from apps.company.models import CompanyProfile
+from apps.core.models import CustomUser
+from apps.core.query_budget_middleware import (
+    QueryInstrumentationMiddleware,
+    QueryBudgetExceeded,
+    fingerprint,
+    query_budget,
+)
+
+
+@query_budget(2)
+def user_emails_view(request):
+    # One query per user, the N+1 the budget is there to catch
+    emails = [CustomUser.objects.get(id=user_id).email for user_id in
+              CustomUser.objects.values_list("id", flat=True)]
+    return HttpResponse(",".join(emails))
+
+
+@pytest.mark.usefixtures("locmem_cache", "mute_profile_signal_tasks")
+class QueryBudgetTestCase(TestCase):
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(email="budget@example.com", password="test-password",
+                                                   first_name="Test", last_name="User")
+
+    def run_view(self, view):
+        middleware = QueryInstrumentationMiddleware(lambda request: view(request))
+        request = RequestFactory().get("/budget/")
+        middleware.process_view(request, view, (), {})
+        return middleware(request)
+
+    def test_view_over_budget_fails(self):
+        CustomUser.objects.create_user(email="other@example.com", password="test-password",
+                                       first_name="Other", last_name="User")
+
+        with self.assertRaises(QueryBudgetExceeded), self.assertLogs(
+                "apps.core.query_budget_middleware", "WARNING") as logs:
+            with override_settings(QUERY_N_PLUS_ONE_THRESHOLD=2):
+                self.run_view(user_emails_view)
+        self.assertIn("Possible N+1", logs.output[0])
+
+    def test_view_within_budget_gets_server_timing(self):
+        response = self.run_view(user_emails_view)
+
+        self.assertIn('desc="2 queries"', response["Server-Timing"])
+
+    def test_endpoint_reports_server_timing(self):
+        CompanyProfile.objects.create(company_name="Acme")
+        client = APIClient()
+        client.force_authenticate(self.user)
+
+        response = client.get("/app/details/companies/")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('desc="2 queries"', response["Server-Timing"])
+
+    def test_fingerprint_ignores_literals_and_in_list_length(self):
+        self.assertEqual(
+            fingerprint("SELECT * FROM t WHERE id IN (%s, %s) AND name = 'a'"),
+            fingerprint("SELECT  * FROM t WHERE id IN (%s) AND name = 'b'"),
+        )
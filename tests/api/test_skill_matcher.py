@@ -0,0 +1,27 @@
+import spacy
+from django.test import SimpleTestCase
+
+from apps.company.skill_matcher import SkillMatcher
+
+
+class SkillMatcherTestCase(SimpleTestCase):
+    def setUp(self):
+        self.nlp = spacy.blank("en")
+        self.matcher = SkillMatcher(self.nlp, ["Python", "SQL", "Machine Learning", "Docker", "python"], ["AWS"])
+
+    def test_extracts_canonical_names_in_one_pass(self):
+        doc = self.nlp(
+            "We build machine learning services in python.\n"
+            "• Required skills: SQL\n"
+            "• Preferred skills: Docker, Python\n"
+            "Certifications: aws"
+        )
+
+        required_skills, nice_to_have_skills, certs = self.matcher.extract(doc)
+
+        self.assertEqual(required_skills, ["Machine Learning", "Python", "SQL"])
+        self.assertEqual(nice_to_have_skills, ["Docker"])
+        self.assertEqual(certs, ["AWS"])
+
+    def test_partial_words_do_not_match(self):
+        self.assertEqual(self.matcher.extract(self.nlp("Pythonic SQLite machines")), ([], [], []))
@@ -0,0 +1,96 @@
+from unittest.mock import MagicMock
+
+import pytest
+from django.core.cache import cache
+from django.test import TestCase
+
+from apps.core.models import CustomUser
+from apps.core.slack_sync import sync_slack_users, sync_slack_to_convertkit
+
+
+def paged_client(method, pages):
+    client = MagicMock()
+    getattr(client, method).return_value = iter(pages)
+    return client
+
+
+@pytest.mark.usefixtures("mute_profile_signal_tasks")
+class SlackUserSyncTestCase(TestCase):
+    def setUp(self):
+        self.member = CustomUser.objects.create(email="member@example.com")
+        self.left = CustomUser.objects.create(email="left@example.com")
+        self.invited = CustomUser.objects.create(email="invited@example.com")
+        self.missing = CustomUser.objects.create(email="missing@example.com", is_slack_invite_sent=True)
+
+        self.client = paged_client("users_list", [
+            {"members": [{"id": "U1", "deleted": False, "profile": {"email": "Member@Example.com"}},
+                         {"id": "B1", "is_bot": True, "profile": {"email": "bot@example.com"}}]},
+            {"members": [{"id": "U2", "deleted": True, "profile": {"email": "left@example.com"}}]},
+        ])
+        self.admin_client = paged_client("admin_users_list", [{"users": [{"email": "invited@example.com"}]}])
+
+    def test_reconciles_slack_fields_from_one_pass_over_slack(self):
+        stats = sync_slack_users(client=self.client, admin_client=self.admin_client, team_id="T1")
+
+        self.assertEqual(stats, {'checked': 4, 'found': 2, 'invited': 1, 'not_found': 1, 'updated': 4})
+        self.client.users_list.assert_called_once()
+        self.admin_client.admin_users_list.assert_called_once()
+
+        self.member.refresh_from_db()
+        self.assertEqual(self.member.slack_user_id, "U1")
+        self.assertTrue(self.member.is_slack_active)
+        self.left.refresh_from_db()
+        self.assertEqual(self.left.slack_user_id, "U2")
+        self.assertFalse(self.left.is_slack_active)
+        self.invited.refresh_from_db()
+        self.assertIsNone(self.invited.slack_user_id)
+        self.assertTrue(self.invited.is_slack_invite_sent)
+        self.missing.refresh_from_db()
+        self.assertFalse(self.missing.is_slack_invite_sent)
+
+    def test_dry_run_saves_nothing(self):
+        stats = sync_slack_users(client=self.client, admin_client=self.admin_client, team_id="T1", dry_run=True)
+
+        self.assertEqual(stats['updated'], 4)
+        self.member.refresh_from_db()
+        self.assertIsNone(self.member.slack_user_id)
+
+
+class FakeConvertKitService:
+    def __init__(self, failing=()):
+        self.failing = set(failing)
+        self.subscribed = []
+
+    def add_tag(self, email, tag_id, first_name=None):
+        if email in self.failing:
+            raise Exception("ConvertKit unavailable")
+        self.subscribed.append(email)
+
+
+@pytest.mark.usefixtures("locmem_cache", "mute_profile_signal_tasks")
+class SlackToConvertKitSyncTestCase(TestCase):
+    def setUp(self):
+        self.members = [{"id": f"U{i}", "real_name": f"Member {i}", "profile": {"email": f"m{i}@example.com"}}
+                        for i in range(5)]
+        self.members.append({"id": "U9", "deleted": True, "profile": {"email": "gone@example.com"}})
+        for i in range(3):
+            CustomUser.objects.create(email=f"m{i}@example.com")
+
+    def slack_client(self):
+        return paged_client("users_list", [{"members": self.members}])
+
+    def test_marks_users_active_and_resumes_after_failed_batch(self):
+        service = FakeConvertKitService(failing={"m3@example.com"})
+
+        stats = sync_slack_to_convertkit(client=self.slack_client(), convertkit_service=service, batch_size=2)
+
+        self.assertEqual(stats, {'pushed': 3, 'skipped': 0, 'marked_active': 3, 'errors': 1})
+        self.assertEqual(CustomUser.objects.filter(is_slack_active=True).count(), 3)
+        self.assertNotIn("gone@example.com", service.subscribed)
+
+        service = FakeConvertKitService()
+        stats = sync_slack_to_convertkit(client=self.slack_client(), convertkit_service=service, batch_size=2)
+
+        self.assertEqual(stats, {'pushed': 3, 'skipped': 2, 'marked_active': 0, 'errors': 0})
+        self.assertEqual(sorted(service.subscribed), ["m2@example.com", "m3@example.com", "m4@example.com"])
+        self.assertIsNone(cache.get("slack_convertkit_sync_cursor"))
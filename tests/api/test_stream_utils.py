@@ -0,0 +1,48 @@
+import json
+import os
+import tempfile
+
+from django.test import SimpleTestCase
+
+from utils.stream_utils import iter_json_records
+
+
+class IterJsonRecordsTestCase(SimpleTestCase):
+    def write(self, content):
+        file = tempfile.NamedTemporaryFile("w", encoding="utf-8", suffix=".json", delete=False)
+        with file:
+            file.write(content)
+        self.addCleanup(os.remove, file.name)
+        return file.name
+
+    def records(self, content, **kwargs):
+        return [record for record, _ in iter_json_records(self.write(content), **kwargs)]
+
+    def test_reads_array_records_across_chunks(self):
+        content = ' [ {"title": "Café"}, [1, [2]], [], "x", 12 ]\n'
+
+        for chunk_size in (1, 3, 1024):
+            self.assertEqual(self.records(content, chunk_size=chunk_size),
+                             [{"title": "Café"}, [1, [2]], [], "x", 12])
+
+    def test_reads_ndjson_records(self):
+        content = '{"id": 1}\n[2, 3]\n\n{"id": 4}\n'
+
+        self.assertEqual(self.records(content, chunk_size=4), [{"id": 1}, [2, 3], {"id": 4}])
+
+    def test_truncated_or_unterminated_array_raises(self):
+        for content in ('[{"a": 1}, 12', '[{"a": 1}, {"b"', '[1, 2,', '[1, 2,]', '[1 2]'):
+            with self.subTest(content=content), self.assertRaises(json.JSONDecodeError):
+                self.records(content, chunk_size=4)
+
+    def test_resumes_from_a_yielded_offset(self):
+        for content in ('[{"id": 1}, ["é", 2], {"id": 3}]', '{"id": 1}\n["é", 2]\n{"id": 3}\n'):
+            with self.subTest(content=content):
+                file_path = self.write(content)
+                offsets = [offset for _, offset in iter_json_records(file_path)]
+
+                resumed = [record for record, _ in iter_json_records(file_path, start_offset=offsets[0],
+                                                                     chunk_size=2)]
+
+                self.assertEqual(resumed, [["é", 2], {"id": 3}])
+                self.assertEqual(list(iter_json_records(file_path, start_offset=offsets[-1])), [])
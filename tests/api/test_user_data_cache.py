@@ -0,0 +1,75 @@
+from unittest.mock import patch
+
+import pytest
+from django.test import TestCase
+
+from apps.core.models import CustomUser, UserProfile, CommunityNeeds
+from apps.core.views import _fetch_user_data
+from apps.mentorship.models import MentorProfile, MenteeProfile, MentorRoster
+from utils.cache_utils import get_cache_version, USER_DATA_CACHE_NAMESPACE
+
+
+@pytest.mark.usefixtures("locmem_cache")
+class UserDataSnapshotCacheTestCase(TestCase):
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(
+            email="snapshot@example.com", password="test-password", first_name="Linda", last_name="Belcher"
+        )
+
+    def test_cache_hit_costs_no_queries(self):
+        _fetch_user_data(self.user)
+
+        with self.assertNumQueries(0):
+            user_data = _fetch_user_data(self.user)
+
+        self.assertEqual(user_data["user_info"]["first_name"], "Linda")
+
+    def test_user_save_invalidates_snapshot(self):
+        _fetch_user_data(self.user)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.first_name = "Louise"
+            self.user.save()
+
+        self.assertEqual(_fetch_user_data(self.user)["user_info"]["first_name"], "Louise")
+
+    @patch("apps.core.signals.queue_convertkit_tags_update")
+    def test_profile_save_invalidates_snapshot(self, mock_convertkit_task):
+        _fetch_user_data(self.user)
+        user_profile = UserProfile.objects.get(user=self.user)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            user_profile.linkedin = "https://linkedin.com/in/louise"
+            user_profile.save()
+
+        user_data = _fetch_user_data(self.user)
+        self.assertEqual(user_data["user_info"]["userprofile"]["linkedin"], "https://linkedin.com/in/louise")
+
+    def test_profile_m2m_change_invalidates_snapshot(self):
+        _fetch_user_data(self.user)
+        user_profile = UserProfile.objects.get(user=self.user)
+        community_need = CommunityNeeds.objects.create(name="Mentorship")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            user_profile.tbc_program_interest.add(community_need)
+
+        user_data = _fetch_user_data(self.user)
+        self.assertEqual(len(user_data["user_info"]["userprofile"]["tbc_program_interest"]), 1)
+
+    def test_mentor_save_invalidates_mentee_snapshot(self):
+        self.user.is_mentee = True
+        self.user.save()
+        mentor = CustomUser.objects.create_user(
+            email="mentor@example.com", password="test-password", first_name="Bob", last_name="Belcher",
+            is_mentor=True,
+        )
+        mentor_profile = MentorProfile.objects.create(user=mentor)
+        MentorRoster.objects.create(mentor=mentor_profile, mentee=MenteeProfile.objects.create(user=self.user))
+        _fetch_user_data(self.user)
+        version = get_cache_version(USER_DATA_CACHE_NAMESPACE, self.user.id)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            mentor.last_name = "Fischoeder"
+            mentor.save()
+
+        self.assertGreater(get_cache_version(USER_DATA_CACHE_NAMESPACE, self.user.id), version)
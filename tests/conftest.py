@@ -0,0 +1,36 @@
+from unittest.mock import patch
+
+import pytest
+from django.core.cache import cache
+
+# Tasks queued by the profile signals, they would reach the broker on every user created in a test
+PROFILE_SIGNAL_TASKS = (
+    "apps.core.signals.queue_convertkit_tags_update",
+    "apps.member.signals.queue_convertkit_tags_update",
+    "apps.member.signals.refresh_member_recommendations_task",
+)
+
+
+@pytest.fixture(autouse=True)
+def enforce_query_budgets(settings):
+    """Fail any test whose requests go over the query budget of a view."""
+    settings.QUERY_INSTRUMENTATION_ENABLED = True
+    settings.QUERY_BUDGET_ENFORCED = True
+
+
+@pytest.fixture
+def locmem_cache(settings):
+    """Run the test against an empty in-process cache instead of Redis."""
+    settings.CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+    cache.clear()
+    yield cache
+    cache.clear()
+
+
+@pytest.fixture
+def mute_profile_signal_tasks():
+    """Keep the profile signals from queueing ConvertKit tag updates and job recommendation refreshes."""
+    patchers = [patch(task_path) for task_path in PROFILE_SIGNAL_TASKS]
+    yield [patcher.start() for patcher in patchers]
+    for patcher in patchers:
+        patcher.stop()
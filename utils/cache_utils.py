@@ -1,4 +1,5 @@
 import logging
+import time
 from functools import wraps
 from django.core.cache import cache
 from django.conf import settings
@@ -7,6 +8,9 @@ import json
 # Get logger
 logger = logging.getLogger(__name__)
 
+# Namespace of the per-user snapshot served by the user details endpoint
+USER_DATA_CACHE_NAMESPACE = "user_data"
+
 
 def log_cache_operation(operation):
     """
@@ -171,6 +175,64 @@ def get_cache_key(*args, **kwargs):
     return ":".join(key_parts)
 
 
+def get_cache_version(namespace, obj_id):
+    """
+    Get the current cache version for an object.
+
+    Versioned keys let writers invalidate every snapshot of an object by bumping a
+    single counter instead of tracking and deleting individual keys.
+
+    Args:
+        namespace (str): The cache namespace, e.g. "user_data".
+        obj_id (Any): The identifier of the object the version belongs to.
+
+    Returns:
+        int: The current version of the object.
+    """
+    version_key = f"{namespace}_version_{obj_id}"
+    version = cache.get(version_key)
+    if version is None:
+        # Seed with a time based value so snapshots written under an evicted
+        # counter can never be read again.
+        cache.add(version_key, time.time_ns(), None)
+        version = cache.get(version_key)
+    return version
+
+
+def bump_cache_version(namespace, obj_id):
+    """
+    Bump the cache version for an object, invalidating all of its versioned snapshots.
+
+    Args:
+        namespace (str): The cache namespace, e.g. "user_data".
+        obj_id (Any): The identifier of the object the version belongs to.
+
+    Returns:
+        int: The new version of the object.
+    """
+    version_key = f"{namespace}_version_{obj_id}"
+    try:
+        return cache.incr(version_key)
+    except ValueError:
+        version = time.time_ns()
+        cache.set(version_key, version, None)
+        return version
+
+
+def get_versioned_cache_key(namespace, obj_id):
+    """
+    Build a cache key that embeds the current version of an object.
+
+    Args:
+        namespace (str): The cache namespace, e.g. "user_data".
+        obj_id (Any): The identifier of the object.
+
+    Returns:
+        str: A cache key such as "user_data_42_v7".
+    """
+    return f"{namespace}_{obj_id}_v{get_cache_version(namespace, obj_id)}"
+
+
 def cache_health_check():
     """
     Perform a health check on the cache system.
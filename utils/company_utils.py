@@ -48,7 +48,7 @@ def pull_company_info(company_obj):
             url = f"https://api.coresignal.com/cdapi/v1/linkedin/company/collect/{company_id}"
             # url = f"https://api.coresignal.com/cdapi/v1/linkedin/company/search/filter"
             # url = f"https://api.coresignal.com/enrichment/companies?website={company_name}&lookalikes=false"
-            response = requests.get(url, data=json.dumps({"name": company_name}), headers={'Authorization': f'Bearer {C_TOKEN}'})
+            response = requests.get(url, data=json.dumps({"name": company_name}), headers={'Authorization': f'Bearer {C_TOKEN}'}, timeout=10)
             response.raise_for_status()
             response_data = response.json()
             return save_company_info(company_obj, response_data)
@@ -60,7 +60,7 @@ def pull_company_info(company_obj):
             # url = f"https://api.coresignal.com/cdapi/v1/linkedin/company/collect/{company_id}"
             # url = f"https://api.coresignal.com/cdapi/v1/linkedin/company/search/filter"
             url = f"https://api.coresignal.com/enrichment/companies?website={company_name}&lookalikes=false"
-            response = requests.get(url, data=json.dumps({"name": company_name}), headers={'Authorization': f'Bearer {C_TOKEN}'})
+            response = requests.get(url, data=json.dumps({"name": company_name}), headers={'Authorization': f'Bearer {C_TOKEN}'}, timeout=10)
             response.raise_for_status()
             response_data = response.json()
             return save_company_info(company_obj, response_data.get('data'))
@@ -92,3 +92,30 @@ def save_company_info(company_obj, new_company_info):
     except Exception as e:
         logger.error(f"Error saving company info: {str(e)}")
         return False
+
+
+def fetch_company_reviews(company_id, auth_header=None, timeout=3):
+    """
+    Fetch the reviews of a company from the Open Doors API.
+
+    Raises:
+        requests.exceptions.RequestException: If the request fails or times out.
+    """
+    headers = {'Authorization': auth_header} if auth_header else {}
+    response = requests.get(f'{os.getenv("OD_API_URL")}api/reviews/company/{company_id}/',
+                            headers=headers, timeout=timeout)
+    response.raise_for_status()
+    return response.json()
+
+
+def fetch_talent_choice_details(company_id, timeout=5):
+    """
+    Fetch the Talent Choice account details of a company.
+
+    Raises:
+        requests.exceptions.RequestException: If the request fails or times out.
+    """
+    response = requests.get(f'{os.getenv("TC_API_URL")}core/api/company/details/?company_id={company_id}',
+                            timeout=timeout)
+    response.raise_for_status()
+    return response.json()
@@ -1,9 +1,49 @@
+import hashlib
 import os
 import requests
 import time
+from django.conf import settings
 from django.core.cache import cache
+from requests.adapters import HTTPAdapter
 
 from apps.core.models import EmailTags
+from utils.logging_helper import get_logger
+from utils.rate_limit_utils import SharedRateLimiter, backoff_delay
+
+logger = get_logger(__name__)
+
+# ConvertKit allows 120 requests per rolling minute per account
+CONVERTKIT_REQUESTS_PER_MINUTE = getattr(settings, "CONVERTKIT_REQUESTS_PER_MINUTE", 120)
+# (connect, read) seconds
+CONVERTKIT_TIMEOUT = getattr(settings, "CONVERTKIT_TIMEOUT", (3.05, 15))
+CONVERTKIT_POOL_SIZE = getattr(settings, "CONVERTKIT_POOL_SIZE", 10)
+CONVERTKIT_MAX_RETRIES = getattr(settings, "CONVERTKIT_MAX_RETRIES", 5)
+SUBSCRIBER_ID_CACHE_TIMEOUT = 60 * 60 * 24
+
+
+def _build_session():
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=CONVERTKIT_POOL_SIZE)
+    session.mount('https://', adapter)
+    return session
+
+
+# Shared by every ConvertKitService in the process so connections are kept alive
+_session = _build_session()
+# Counted in the cache so the limit holds across all worker processes
+_rate_limiter = SharedRateLimiter("convertkit", CONVERTKIT_REQUESTS_PER_MINUTE, 60)
+
+
+def _subscriber_id_key(email):
+    return f"convertkit_subscriber_id_{hashlib.md5(email.lower().encode()).hexdigest()}"
+
+
+def _is_retryable(error):
+    if isinstance(error, (requests.exceptions.ConnectionError, requests.exceptions.Timeout)):
+        return True
+    if isinstance(error, requests.exceptions.HTTPError) and error.response is not None:
+        return error.response.status_code == 429 or error.response.status_code >= 500
+    return False
 
 
 class ConvertKitService:
@@ -13,6 +53,34 @@ class ConvertKitService:
         self.api_key = os.getenv("CONVERTKIT_API_KEY")
         self.api_secret = os.getenv("CONVERTKIT_API_SECRET_KEY")
 
+    def add_tag(self, email, tag_id, first_name=None):
+        data = {'email': email}
+        if first_name:
+            data['first_name'] = first_name
+        self._make_api_call_with_retry(f'tags/{tag_id}/subscribe', data)
+
+    def remove_tag(self, email, tag_id):
+        self._make_api_call_with_retry(f'tags/{tag_id}/unsubscribe', {'email': email})
+
+    def list_tag_subscriber_emails(self, tag_id):
+        """
+        Page through the active subscribers of a tag.
+
+        :param tag_id: The ConvertKit id of the tag
+        :return: Generator of subscriber email addresses
+        """
+        page = 1
+        while True:
+            response = self._make_api_call_with_retry(
+                f'tags/{tag_id}/subscriptions?page={page}&subscriber_state=active', None, is_get=True
+            )
+            data = response.json()
+            for subscription in data.get('subscriptions', []):
+                yield subscription['subscriber']['email_address']
+            if page >= data.get('total_pages', 1):
+                return
+            page += 1
+
     def update_subscriber_tags(self, email, add_tags=None, remove_tags=None):
         print("Updating subscriber tags")
         print(add_tags, remove_tags)
@@ -48,12 +116,7 @@ class ConvertKitService:
             return []
 
         # Now, get the tags for this subscriber
-        response = self._make_api_call(
-            f'subscribers/{subscriber_id}/tags?api_key={self.api_secret}',
-            {'email': email},
-            is_get=True
-        )
-        response.raise_for_status()
+        response = self._make_api_call_with_retry(f'subscribers/{subscriber_id}/tags', None, is_get=True)
         tags_data = response.json()
         print("Got tags data: {}".format(tags_data))
         # Extract and return the tag names
@@ -61,21 +124,27 @@ class ConvertKitService:
 
     def _get_subscriber_id(self, email):
         """
-        Fetch the subscriber user id
+        Fetch the subscriber user id, cached per email as it never changes
 
         :param email: The email address of the subscriber
-        :return: id associated with the subscriber
+        :return: id associated with the subscriber, None if there is no such subscriber
         """
+        key = _subscriber_id_key(email)
+        subscriber_id = cache.get(key)
+        if subscriber_id is not None:
+            return subscriber_id
+
         print("Getting subscriber id for user")
-        response = self._make_api_call(f'subscribers?api_secret={self.api_secret}', {'email_address': email}, True)
-        response.raise_for_status()
+        response = self._make_api_call_with_retry('subscribers', None, is_get=True, params={'email_address': email})
         subscriber_data = response.json()
 
         if not subscriber_data.get("subscribers"):
+            # Not cached, the subscriber may sign up later
             print("Subscriber not found")
-            return []
+            return None
 
         subscriber_id = subscriber_data["subscribers"][0]["id"]
+        cache.set(key, subscriber_id, SUBSCRIBER_ID_CACHE_TIMEOUT)
         return subscriber_id
 
     def _remove_tags_from_subscriber(self, email, tags):
@@ -85,24 +154,31 @@ class ConvertKitService:
             if tag:
                 self._make_api_call_with_retry(f'tags/{tag.convert_tag_kit_id}/unsubscribe', {'email': email})
 
-    def _make_api_call_with_retry(self, endpoint, data, max_retries=3, delay=10):
+    def _make_api_call_with_retry(self, endpoint, data, max_retries=CONVERTKIT_MAX_RETRIES, is_get=False, params=None):
+        """
+        Make an API call, retrying rate limited (429), server and connection errors with jittered backoff.
+
+        :param max_retries: Number of attempts before the last error is raised
+        """
         for attempt in range(max_retries):
             try:
-                return self._make_api_call(endpoint, data)
-            except requests.exceptions.HTTPError as e:
-                if e.response.status_code == 429 and attempt < max_retries - 1:
-                    wait_time = self._get_retry_after(e.response) or delay
-                    time.sleep(wait_time)
-                else:
+                return self._make_api_call(endpoint, data, is_get=is_get, params=params)
+            except requests.exceptions.RequestException as e:
+                if not _is_retryable(e) or attempt == max_retries - 1:
                     raise
+                retry_after = self._get_retry_after(e.response) if e.response is not None else None
+                wait_time = backoff_delay(attempt, retry_after=retry_after)
+                logger.warning(f"ConvertKit call to {endpoint} failed ({str(e)}), retrying in {wait_time:.1f}s")
+                time.sleep(wait_time)
 
-    def _make_api_call(self, endpoint, data, is_get=False):
+    def _make_api_call(self, endpoint, data, is_get=False, params=None):
         url = f'{self.BASE_URL}{endpoint}'
-        params = {'api_secret': self.api_secret}
+        params = {'api_secret': self.api_secret, **(params or {})}
+        _rate_limiter.acquire()
         if is_get:
-            response = requests.get(url, json=data, params=params)
+            response = _session.get(url, json=data, params=params, timeout=CONVERTKIT_TIMEOUT)
         else:
-            response = requests.post(url, json=data, params=params)
+            response = _session.post(url, json=data, params=params, timeout=CONVERTKIT_TIMEOUT)
         response.raise_for_status()
         return response
 
@@ -0,0 +1,81 @@
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+
+from django.conf import settings
+from django.db import connection
+
+from utils.logging_helper import get_logger
+
+logger = get_logger(__name__)
+
+FAN_OUT_MAX_WORKERS = getattr(settings, "FAN_OUT_MAX_WORKERS", 16)
+FAN_OUT_DEFAULT_TIMEOUT = getattr(settings, "FAN_OUT_DEFAULT_TIMEOUT", 5)
+
+# Shared, bounded pool so a burst of requests can't spawn unbounded threads
+_executor = ThreadPoolExecutor(max_workers=FAN_OUT_MAX_WORKERS, thread_name_prefix="fan-out")
+
+
+class FanOutCall:
+    """
+    A single blocking call to run as part of a fan-out.
+
+    Args:
+        func (callable): The function to call.
+        *args: Positional arguments passed to func.
+        default (Any, optional): Returned when the call fails or misses its deadline.
+        timeout (float, optional): Seconds the call may take, measured from the start of the fan-out.
+        **kwargs: Keyword arguments passed to func.
+    """
+
+    def __init__(self, func, *args, default=None, timeout=None, **kwargs):
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+        self.default = default
+        self.timeout = timeout if timeout is not None else FAN_OUT_DEFAULT_TIMEOUT
+
+    def __call__(self):
+        try:
+            return self.func(*self.args, **self.kwargs)
+        finally:
+            # Worker threads get their own DB connection, don't leak it
+            connection.close()
+
+
+def fan_out(calls):
+    """
+    Run independent blocking calls concurrently and collect partial results.
+
+    Every call gets its own deadline. A call that raises or misses its deadline
+    resolves to its default, so one slow upstream can't fail or stall the others.
+
+    Args:
+        calls (dict): Mapping of result name to FanOutCall.
+
+    Returns:
+        dict: Mapping of result name to the call's return value or its default.
+
+    Example:
+        results = fan_out({
+            "reviews": FanOutCall(fetch_company_reviews, company_id, default=[], timeout=3),
+            "details": FanOutCall(fetch_talent_choice_details, company_id, default={}, timeout=5),
+        })
+    """
+    started_at = time.monotonic()
+    futures = {name: _executor.submit(call) for name, call in calls.items()}
+    results = {}
+
+    for name, future in futures.items():
+        call = calls[name]
+        remaining = max(call.timeout - (time.monotonic() - started_at), 0)
+        try:
+            results[name] = future.result(timeout=remaining)
+        except FutureTimeoutError:
+            future.cancel()
+            logger.warning(f"Fan-out call {name} missed its {call.timeout}s deadline")
+            results[name] = call.default
+        except Exception as e:
+            logger.error(f"Fan-out call {name} failed: {str(e)}")
+            results[name] = call.default
+
+    return results
@@ -1,7 +1,19 @@
+import base64
+import binascii
+import datetime
+import hashlib
+import json
 import logging
+from collections import OrderedDict
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
 from django.core.paginator import Paginator, EmptyPage, PageNotAnInteger
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
 from rest_framework.response import Response
 from rest_framework import status
+from rest_framework.utils.urls import replace_query_param
 from functools import wraps
 
 # Get the logger for this module
@@ -135,6 +147,143 @@ def apply_pagination(request, queryset, serializer_class):
     return get_paginated_response(serialized_data, metadata)
 
 
+APPROXIMATE_COUNT_CACHE_TIMEOUT = 60 * 5
+
+
+def get_approximate_count(queryset, timeout=APPROXIMATE_COUNT_CACHE_TIMEOUT):
+    """
+    Count a queryset, reusing the count of the same query for a few minutes.
+
+    Args:
+        queryset (QuerySet): The queryset to count.
+        timeout (int): Seconds the count is reused for.
+
+    Returns:
+        int: The number of rows, at most `timeout` seconds out of date.
+    """
+    cache_key = f"approximate_count_{hashlib.md5(str(queryset.query).encode()).hexdigest()}"
+    count = cache.get(cache_key)
+    if count is None:
+        count = queryset.count()
+        cache.set(cache_key, count, timeout)
+    return count
+
+
+def is_keyset_request(request, cursor_query_params=('cursor',)):
+    """
+    Whether the client asked for cursor pages, with ?pagination=cursor or a ?cursor= from an earlier page.
+
+    Args:
+        cursor_query_params (tuple, optional): Cursor parameters of the lists the view pages.
+    """
+    return (request.query_params.get('pagination') == 'cursor'
+            or any(param in request.query_params for param in cursor_query_params))
+
+
+class KeysetPagination(BasePagination):
+    """
+    Cursor pagination seeking past the last row of the previous page instead of using OFFSET.
+
+    Each page is a `WHERE (ordering) > (last row)` query on a unique ordering, so deep
+    pages cost the same as the first and rows added meanwhile are never repeated or
+    skipped. No COUNT is run, unless the client asks for one with ?with_count=true, in
+    which case a cached count from get_approximate_count is returned.
+
+    The response keeps the shape of CustomPagination: count (only when asked for),
+    next, previous (always None, pages only go forward) and results.
+
+    Args:
+        ordering (tuple): Fields the rows are ordered by, "-" for descending. The last one must be unique.
+        cursor_query_param (str, optional): Parameter the cursor is passed in, to page several lists
+            in one response each with its own cursor.
+
+    Example:
+        paginator = KeysetPagination(ordering=("-created_at", "-id"))
+        page = paginator.paginate_queryset(Job.objects.all(), request)
+        return paginator.get_paginated_response(JobSerializer(page, many=True).data)
+    """
+    cursor_query_param = 'cursor'
+    count_query_param = 'with_count'
+    page_size = 10
+    page_size_query_param = 'limit'
+    max_page_size = 100
+
+    def __init__(self, ordering=("created_at", "id"), cursor_query_param=None):
+        self.ordering = tuple(ordering)
+        if cursor_query_param is not None:
+            self.cursor_query_param = cursor_query_param
+        self.fields = [field.lstrip('-') for field in self.ordering]
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params.get(self.page_size_query_param, self.page_size))
+        except ValueError:
+            return self.page_size
+        return max(1, min(page_size, self.max_page_size))
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.count = None
+        if request.query_params.get(self.count_query_param) in ('true', '1'):
+            self.count = get_approximate_count(queryset)
+
+        queryset = queryset.order_by(*self.ordering)
+        position = self.decode_cursor(request, queryset.model)
+        if position is not None:
+            queryset = queryset.filter(self.get_seek_filter(position))
+
+        # One extra row tells whether there is a next page without counting
+        rows = list(queryset[:self.page_size + 1])
+        self.next_position = self.get_position(rows[self.page_size - 1]) if len(rows) > self.page_size else None
+        return rows[:self.page_size]
+
+    def get_seek_filter(self, position):
+        """Rows after `position` in the ordering, i.e. (a > x) OR (a = x AND b > y) OR ..."""
+        condition = Q()
+        equal = Q()
+        for ordering_field, field, value in zip(self.ordering, self.fields, position):
+            lookup = 'lt' if ordering_field.startswith('-') else 'gt'
+            condition |= equal & Q(**{f'{field}__{lookup}': value})
+            equal &= Q(**{field: value})
+        return condition
+
+    def get_position(self, row):
+        return [row[field] if isinstance(row, dict) else getattr(row, field) for field in self.fields]
+
+    def encode_cursor(self, position):
+        values = [value.isoformat() if isinstance(value, (datetime.date, datetime.time)) else value
+                  for value in position]
+        return base64.urlsafe_b64encode(json.dumps(values).encode()).decode()
+
+    def decode_cursor(self, request, model):
+        cursor = request.query_params.get(self.cursor_query_param)
+        if not cursor:
+            return None
+        try:
+            values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+            if len(values) != len(self.fields):
+                raise ValueError
+            return [model._meta.get_field(field).to_python(value) for field, value in zip(self.fields, values)]
+        except (binascii.Error, ValueError, TypeError, ValidationError):
+            raise NotFound('Invalid cursor')
+
+    def get_next_link(self):
+        if self.next_position is None:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(self.next_position))
+
+    def get_paginated_response(self, data):
+        response = OrderedDict()
+        if self.count is not None:
+            response['count'] = self.count
+        response['next'] = self.get_next_link()
+        response['previous'] = None
+        response['results'] = data
+        return Response(response)
+
+
 # Example usage
 # if __name__ == "__main__":
 #     # This is just for demonstration and won't run in a typical Django setup
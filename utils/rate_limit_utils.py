@@ -0,0 +1,74 @@
+import random
+import time
+
+from django.core.cache import cache
+
+
+class SharedRateLimiter:
+    """
+    Rate limit shared by every process using the same cache, e.g. all Celery workers.
+
+    Calls are counted per time slot with an atomic cache increment. The window is
+    split into `slots` slots, each allowed `limit // (slots + 1)` calls, so that no
+    rolling window (which overlaps at most slots + 1 of them) lets more than
+    `limit` calls through.
+
+    Args:
+        name (str): Name of the limit, calls made under the same name share it.
+        limit (int): Most calls allowed in any `window_seconds` window.
+        window_seconds (int): Length of the window.
+        slots (int): Number of slots the window is split into.
+
+    Example:
+        # 120 calls per rolling minute across all workers
+        limiter = SharedRateLimiter("convertkit", limit=120, window_seconds=60)
+        limiter.acquire()
+    """
+
+    def __init__(self, name, limit, window_seconds, slots=6):
+        self.name = name
+        self.slot_seconds = window_seconds / slots
+        self.calls_per_slot = max(limit // (slots + 1), 1)
+
+    def acquire(self):
+        """
+        Take a call from the current slot, waiting for a later slot when it is used up.
+
+        Returns:
+            float: Seconds spent waiting.
+        """
+        waited = 0
+        while True:
+            now = time.time()
+            slot = int(now // self.slot_seconds)
+            key = f"rate_limit_{self.name}_{slot}"
+            # add is a no-op when another process created the counter first
+            cache.add(key, 0, timeout=int(self.slot_seconds * 2) + 1)
+            try:
+                calls = cache.incr(key)
+            except ValueError:
+                # The counter expired between add and incr
+                continue
+            if calls <= self.calls_per_slot:
+                return waited
+
+            wait = (slot + 1) * self.slot_seconds - now + random.uniform(0, self.slot_seconds / 10)
+            time.sleep(wait)
+            waited += wait
+
+
+def backoff_delay(attempt, base=1, cap=60, retry_after=None):
+    """
+    Seconds to wait before retrying a rate limited or failed call.
+
+    Args:
+        attempt (int): Number of the attempt that failed, starting at 0.
+        base (float): Delay of the first retry.
+        cap (float): Longest delay.
+        retry_after (float, optional): Delay asked for by the server, used as the minimum.
+
+    Returns:
+        float: Exponential backoff with full jitter, at least retry_after.
+    """
+    delay = random.uniform(0, min(cap, base * 2 ** attempt))
+    return max(delay, retry_after or 0)
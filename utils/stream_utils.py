@@ -0,0 +1,171 @@
+import codecs
+import json
+import os
+import re
+from typing import Any, Iterator, Tuple
+
+from .logging_helper import get_logger
+
+logger = get_logger(__name__)
+
+_WHITESPACE = re.compile(r'\s*')
+_decoder = json.JSONDecoder()
+
+
+class _DecodeBuffer:
+    """Decoded text of a file read a chunk at a time, tracking the byte offset of the read position."""
+
+    def __init__(self, file, offset: int, chunk_size: int):
+        self.file = file
+        self.offset = offset
+        self.chunk_size = chunk_size
+        self.utf8 = codecs.getincrementaldecoder('utf-8')()
+        self.text = ''
+        self.position = 0
+        self.eof = False
+
+    def _read(self) -> None:
+        chunk = self.file.read(self.chunk_size)
+        self.eof = not chunk
+        self.text = self.text[self.position:] + self.utf8.decode(chunk, final=self.eof)
+        self.position = 0
+
+    def _consume(self, end: int) -> None:
+        self.offset += len(self.text[self.position:end].encode('utf-8'))
+        self.position = end
+
+    def error(self, message: str) -> json.JSONDecodeError:
+        return json.JSONDecodeError(message, self.text, self.position)
+
+    def peek(self) -> str:
+        """Skip whitespace and return the next character, '' at the end of the file."""
+        while True:
+            self._consume(_WHITESPACE.match(self.text, self.position).end())
+            if self.position < len(self.text) or self.eof:
+                return self.text[self.position:self.position + 1]
+            self._read()
+
+    def take(self) -> None:
+        self._consume(self.position + 1)
+
+    def decode(self) -> Any:
+        """Decode the value at the read position and move past it."""
+        while True:
+            try:
+                record, end = _decoder.raw_decode(self.text, self.position)
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+                end = None
+            # A value running to the end of the buffer (e.g. a number) may continue in the next chunk
+            if end is not None and (end < len(self.text) or self.eof):
+                self._consume(end)
+                return record
+            self._read()
+
+
+def iter_json_records(file_path: str, start_offset: int = 0,
+                      chunk_size: int = 1024 * 1024) -> Iterator[Tuple[Any, int]]:
+    """
+    Lazily read the records of a JSON array or NDJSON file.
+
+    The file is decoded incrementally, so only the record being parsed (plus one
+    chunk) is held in memory however large the file is. A file starting with '['
+    is read as one top level array of records, any other as whitespace separated
+    records.
+
+    Args:
+        file_path (str): Path of the JSON array or NDJSON file.
+        start_offset (int, optional): Byte offset to resume from, as yielded with an earlier record.
+        chunk_size (int, optional): Number of bytes read at a time.
+
+    Yields:
+        Tuple[Any, int]: The record and the byte offset just past it.
+
+    Raises:
+        json.JSONDecodeError: If the file holds invalid JSON, or is truncated.
+
+    Example:
+        >>> for record, offset in iter_json_records('jobs.json'):
+        ...     process(record)
+    """
+    with open(file_path, 'rb') as file:
+        is_array = _DecodeBuffer(file, 0, 64).peek() == '['
+        file.seek(start_offset)
+        buffer = _DecodeBuffer(file, start_offset, chunk_size)
+
+        if not is_array:
+            while buffer.peek():
+                yield buffer.decode(), buffer.offset
+            return
+
+        if not start_offset:
+            buffer.peek()
+            buffer.take()
+        # A resumed read starts just past a record
+        expect_comma = bool(start_offset)
+        after_comma = False
+        while True:
+            char = buffer.peek()
+            if not char:
+                raise buffer.error("Unterminated JSON array")
+            if char == ']':
+                if after_comma:
+                    raise buffer.error("Expecting value")
+                return
+            if expect_comma:
+                if char != ',':
+                    raise buffer.error("Expecting ',' delimiter")
+                buffer.take()
+                expect_comma, after_comma = False, True
+                continue
+
+            yield buffer.decode(), buffer.offset
+            expect_comma, after_comma = True, False
+
+
+class ImportCheckpoint:
+    """
+    Remembers how far into a file an import got, so an interrupted run can resume.
+
+    The checkpoint records the size of the file it belongs to and is ignored if the
+    file changed since.
+
+    Args:
+        checkpoint_path (str): Where the checkpoint is stored.
+        file_path (str): The file being imported.
+    """
+
+    def __init__(self, checkpoint_path: str, file_path: str):
+        self.checkpoint_path = checkpoint_path
+        self.file_path = os.path.abspath(file_path)
+        self.file_size = os.path.getsize(file_path)
+
+    def load(self) -> int:
+        """
+        Returns:
+            int: The byte offset to resume from, 0 when there is no usable checkpoint.
+        """
+        try:
+            with open(self.checkpoint_path, 'r') as file:
+                checkpoint = json.load(file)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return 0
+
+        if checkpoint.get('file_path') != self.file_path or checkpoint.get('file_size') != self.file_size:
+            logger.warning(f"Ignoring checkpoint {self.checkpoint_path}, it belongs to another version of the file")
+            return 0
+        return checkpoint.get('offset', 0)
+
+    def save(self, offset: int) -> None:
+        # Write then rename, so a crash never leaves a half written checkpoint
+        temp_path = f"{self.checkpoint_path}.tmp"
+        with open(temp_path, 'w') as file:
+            json.dump({'file_path': self.file_path, 'file_size': self.file_size, 'offset': offset}, file)
+        os.replace(temp_path, self.checkpoint_path)
+
+    def clear(self) -> None:
+        try:
+            os.remove(self.checkpoint_path)
+        except FileNotFoundError:
+            pass